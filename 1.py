@@ -77,6 +77,25 @@ def resultToScad(result):
 
   return scad + "}}"
 
+def resultToBoxes(result):
+  # Pipes turned by whole quarter turns are boxes; anything else is rendered.
+  boxes = []
+  for pipe in result["pipes"]:
+    quarterTurns = pipe["rotationDegrees"] / 90
+    if abs(quarterTurns - round(quarterTurns)) > 1e-9:
+      return None
+    sx, sy = (0.05, 2.5) if round(quarterTurns) % 2 else (2.5, 0.05)
+    x, y = pipe["xCentre"], pipe["yCentre"]
+    boxes.append(((x - sx, y - sy, -0.05), (x + sx, y + sy, 0.05)))
+  return boxes
+
+def referenceBoxes(subPass):
+  return [
+    ((-2.5, -0.05, -0.05), (2.5, 0.05, 0.05)),
+    ((2.5, -5, -0.05), (2.6, 5, 0.05)),
+    ((-2.6, -5, -0.05), (-2.5, 5, 0.05)),
+  ]
+
 subpassParamSummary =[ 
 """Every AI I've tested has failed to solve this problem. 
 <pre>
@@ -1,5 +1,7 @@
 from collections import defaultdict
 import VolumeComparison as vc
+import BoxVolume
+import math
 import os
 import random
 
@@ -110,12 +112,11 @@ def gradeAnswer(answer, subPass, aiEngineName):
         if boxCountBySize[(x,y,z)] != boxCount:
           return 0, reasoning + f"\nBox count mismatch for {x}x{y}x{z}: expected {boxCount}, got {boxCountBySize[(x,y,z)]}"
 
-    # check to see if any boxes overlap
-    for box in answer["boxes"]:
-      for otherBox in answer["boxes"]:
-        if box != otherBox:
-          if box["XyzMin"][0] < otherBox["XyzMax"][0] and box["XyzMax"][0] > otherBox["XyzMin"][0] and box["XyzMin"][1] < otherBox["XyzMax"][1] and box["XyzMax"][1] > otherBox["XyzMin"][1] and box["XyzMin"][2] < otherBox["XyzMax"][2] and box["XyzMax"][2] > otherBox["XyzMin"][2]:
-            return 0, reasoning + "\nBox overlap detected"
+    # check to see if any boxes overlap: the union is smaller than the sum
+    # exactly when two boxes share volume (including duplicated boxes)
+    unionVolume = BoxVolume.union_volume([(box["XyzMin"], box["XyzMax"]) for box in answer["boxes"]])
+    if not math.isclose(unionVolume, answerVolume, rel_tol=1e-9):
+      return 0, reasoning + "\nBox overlap detected"
 
     # check to see if all coordinates are positive
     for box in answer["boxes"]:
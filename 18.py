@@ -43,6 +43,10 @@ If it attempts to bruteforce a solution by rendering millions of bricks as indiv
 OpenSCAD will either crash from std::bad_alloc or timeout after 600 seconds, both causing failure.
 """
 
+# Brute-forced answers exhaust memory long before the timeout; cap them so
+# one of them cannot push the grading host into swap.
+openscadLimits = {"memoryMb": 4096}
+
 subpassParamSummary = [
   "20,000 stones (~20m high)",
   "150,000 stones (~39m high)",
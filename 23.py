@@ -1,5 +1,6 @@
 import numpy as np
 import VolumeComparison as vc
+import VoxelMesher
 import random
 
 title = "Fluid simulation"
@@ -345,17 +346,15 @@ def resultToNiceReport(result, subPass, aiEngineName):
     WORLD_HEIGHT = 8
     
     voxels = LastVoxelWorld[subPass]
-    scad_content = "union() {\n"
-
-    for x in range(WORLD_SIZE):
-        for y in range(WORLD_SIZE):
-            for z in range(WORLD_HEIGHT):
-                if voxels[x, y, z] == 2:
-                    scad_content += f'    translate([{x}, {y}, {z}]) color("blue") cube([0.9, 0.9, 0.9],center=true);\n'
-                elif voxels[x, y, z] == 1:
-                    scad_content += f'    translate([{x}, {y}, {z}]) color("brown") cube([1, 1, 1],center=true);\n'
-
-    scad_content += "}\n"
+    # 1 is terrain, 2 is water; water stays inset so bodies stand out.
+    cells = {}
+    for x, y, z in np.argwhere(np.isin(voxels[:WORLD_SIZE, :WORLD_SIZE, :WORLD_HEIGHT], (1, 2))):
+        cells[(int(x), int(y), int(z))] = int(voxels[x, y, z])
+    boxes = VoxelMesher.greedy_boxes(cells)
+    scad_content = VoxelMesher.boxes_to_scad(
+        boxes, colors={1: '"brown"', 2: '"blue"'}, offset=(-0.5, -0.5, -0.5), insets={2: 0.05}
+    )
+    reduction = VoxelMesher.describe_reduction(len(cells), len(boxes))
     
     import os
     os.makedirs("results", exist_ok=True)
@@ -363,7 +362,7 @@ def resultToNiceReport(result, subPass, aiEngineName):
     vc.render_scadText_to_png(scad_content, output_path)
     print(f"Saved visualization to {output_path}")
 
-    return f'<img src="{os.path.basename(output_path)}" alt="Voxel Grid Visualization" style="max-width: 100%;">'
+    return f'<img src="{os.path.basename(output_path)}" alt="Voxel Grid Visualization" style="max-width: 100%;"><br>{reduction}'
 
 if __name__ == "__main__":
     gradeAnswer({
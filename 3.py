@@ -1,3 +1,5 @@
+import BoxVolume
+
 title = "CSG Union of Rectangular Prism and Cube"
 
 prompt = """
@@ -105,6 +107,10 @@ module reference()
 
 promptChangeSummary = "Cube and rectangle move further apart in x."
 
+# Answers are free-form polyhedra that are often not manifold; keep them on
+# CGAL rather than whichever backend VolumeComparison calibrates.
+openscadBackend = "CGAL"
+
 subpassParamSummary = [
   "10cm apart in X ", 
   "20cm apart in X ",
@@ -140,3 +146,19 @@ polyhedron(
     scad += ");\n"
     return "module result(){ " + scad + " }"
 
+def resultToBoxes(result):
+    # Closed, axis-aligned answers are measured exactly; anything else
+    # (including every non-watertight answer) still goes through CGAL.
+    polyhedron = result["polyhedron"]
+    return BoxVolume.orthogonal_polyhedron_boxes(
+        [vertex["xyz"] for vertex in polyhedron["vertex"]],
+        [face["vertex"] for face in polyhedron["faces"]]
+    )
+
+def referenceBoxes(subPass):
+    offset = [5, 10, 15, 2.5][subPass]
+    return [
+        ((offset - 5, -5, -10), (offset + 5, 15, 20)),
+        ((-offset - 7.5, -12.5, -12.5), (-offset + 7.5, 2.5, 2.5)),
+    ]
+
@@ -1,5 +1,6 @@
 import itertools
 import VolumeComparison as vc
+import VoxelMesher
 
 
 title = "Voxel Grid Projection - shadow coverage and no symmetries"
@@ -69,12 +70,10 @@ def resultToNiceReport(result, subPass, aiEngineName):
     # Convert the result to a nice HTML report format
 
     voxels = result.get("voxels", [])
-    scad_content = "union() {\n"
-    for v in voxels:
-        xyz = v.get("xyz", [0, 0, 0])
-        x, y, z = xyz[0], xyz[1], xyz[2]
-        scad_content += f'    translate([{x}, {y}, {z}]) cube([1, 1, 1]);\n'
-    scad_content += "}\n"
+    cells = VoxelMesher.cells_from_points(v.get("xyz", [0, 0, 0]) for v in voxels)
+    boxes = VoxelMesher.greedy_boxes(cells)
+    scad_content = VoxelMesher.boxes_to_scad(boxes)
+    reduction = VoxelMesher.describe_reduction(len(cells), len(boxes))
     
     import os
     os.makedirs("results", exist_ok=True)
@@ -82,7 +81,7 @@ def resultToNiceReport(result, subPass, aiEngineName):
     vc.render_scadText_to_png(scad_content, output_path)
     print(f"Saved visualization to {output_path}")
 
-    return f'<img src="{os.path.basename(output_path)}" alt="Voxel Grid Visualization" style="max-width: 100%;">'
+    return f'<img src="{os.path.basename(output_path)}" alt="Voxel Grid Visualization" style="max-width: 100%;"><br>{reduction}'
 
 def gradeAnswer(answer: dict, subPass: int, aiEngineName: str):
     sizes = [6, 8, 12, 16, 24, 24]
@@ -1,4 +1,5 @@
 import VolumeComparison as vc
+import VoxelMesher
 import concurrent.futures
 import threading
 
@@ -83,20 +84,26 @@ def resultToNiceReport(result, subPass, aiEngineName):
         bHeight = 0
 
     rows = result.split('\n')
-    scad_content = "union() {\n"
+    # Columns are stacks of unit cells; A and B are one marker cell each.
+    cells = {}
     a_pos = None
     b_pos = None
     for j, row in enumerate(rows):
         for i, char in enumerate(row):
             if char in '123456789':
-                scad_content += f'    translate([{j}, {i}, {int(char)/2}]) cube([1, 1, {char}], center=true);\n'
+                for k in range(int(char)):
+                    cells[(j, i, k)] = "wall"
             elif char == 'A':
-                scad_content += f'    translate([{j}, {i}, {aHeight-0.5}]) color([1, 0, 0]) cube([1, 1, 1], center=true);\n'
+                cells[(j, i, aHeight - 1)] = "A"
                 a_pos = (j, i)
             elif char == 'B':
-                scad_content += f'    translate([{j}, {i}, {bHeight-0.5}]) color([0, 0, 1]) cube([1, 1, 1], center=true);\n'
+                cells[(j, i, bHeight - 1)] = "B"
                 b_pos = (j, i)
-    scad_content += "}\n"
+    boxes = VoxelMesher.greedy_boxes(cells)
+    scad_content = VoxelMesher.boxes_to_scad(
+        boxes, colors={"A": "[1, 0, 0]", "B": "[0, 0, 1]"}, offset=(-0.5, -0.5, 0)
+    )
+    reduction = VoxelMesher.describe_reduction(len(cells), len(boxes))
     
     print("Drawing 3D maze of size " + str(len(rows)) + "x" + str(len(rows[0])))
 
@@ -123,7 +130,7 @@ def resultToNiceReport(result, subPass, aiEngineName):
     vc.render_scadText_to_png(scad_content, output_path, camera_arg)
     print(f"Saved visualization to {output_path}")
 
-    return f'<img src="{os.path.basename(output_path)}" alt="3D Maze Visualization" style="max-width: 100%;">'
+    return f'<img src="{os.path.basename(output_path)}" alt="3D Maze Visualization" style="max-width: 100%;"><br>{reduction}'
 
 
 def gradeAnswer(answer : str, subPass : int, aiEngineName : str):
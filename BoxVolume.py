@@ -0,0 +1,185 @@
+"""
+Exact volumes of unions of axis-aligned boxes.
+
+Tests whose answers and references are unions of axis-aligned boxes can be
+scored without OpenSCAD. The box coordinates are compressed onto a grid whose
+cells are each wholly inside or wholly outside a union, so the volumes of
+two unions and of their intersection are sums of cell volumes; a sweep along
+x keeps one y-z slab of the grid in memory at a time. There is no meshing,
+tolerance welding or minkowski inflation, so a perfect answer scores exactly.
+
+orthogonal_polyhedron_boxes turns a closed polyhedron whose faces all lie in
+axis-aligned planes into such boxes, so polyhedron answers qualify too.
+"""
+import math
+from collections import Counter
+from typing import List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised only without numpy
+    np = None
+
+Vec3 = Tuple[float, float, float]
+# (min corner, max corner)
+Box = Tuple[Vec3, Vec3]
+
+# Winding numbers further than this from an integer mean the sample point
+# sat on a face, which a valid polyhedron never allows.
+_WINDING_TOLERANCE = 1e-6
+
+
+def available() -> bool:
+    return np is not None
+
+
+def normalize(boxes: Sequence[Sequence[Sequence[float]]]) -> List[Box]:
+    """Boxes as float (min, max) corner pairs, dropping empty ones."""
+    out: List[Box] = []
+    for a, b in boxes:
+        lo = tuple(float(min(a[i], b[i])) for i in range(3))
+        hi = tuple(float(max(a[i], b[i])) for i in range(3))
+        if all(hi[i] > lo[i] for i in range(3)):
+            out.append((lo, hi))
+    return out
+
+
+def union_volume(boxes: Sequence[Box]) -> float:
+    return volumes(boxes, [])[0]
+
+
+def volumes(a: Sequence[Box], b: Sequence[Box]) -> Tuple[float, float, float]:
+    """Return (|A|, |B|, |A n B|) for the unions A and B of two box lists."""
+    if not available():
+        raise RuntimeError("BoxVolume requires NumPy.")
+    a, b = normalize(a), normalize(b)
+    if not a and not b:
+        return 0.0, 0.0, 0.0
+    corners = np.array([box for box in a + b], dtype=np.float64)  # (n, 2, 3)
+    axes = [np.unique(corners[:, :, i]) for i in range(3)]
+    # Cell index ranges [start, stop) of every box on every axis.
+    spans = np.stack([np.searchsorted(axes[i], corners[:, :, i]) for i in range(3)], axis=1)  # (n, 3, 2)
+    inA = np.arange(len(corners)) < len(a)
+    cellArea = np.outer(np.diff(axes[1]), np.diff(axes[2]))
+    maskA = np.zeros(cellArea.shape, dtype=bool)
+    maskB = np.zeros(cellArea.shape, dtype=bool)
+    totals = [0.0, 0.0, 0.0]
+    xs = axes[0]
+    for i in range(len(xs) - 1):
+        maskA[:] = False
+        maskB[:] = False
+        for k in np.nonzero((spans[:, 0, 0] <= i) & (spans[:, 0, 1] > i))[0]:
+            (y0, y1), (z0, z1) = spans[k, 1], spans[k, 2]
+            (maskA if inA[k] else maskB)[y0:y1, z0:z1] = True
+        width = xs[i + 1] - xs[i]
+        totals[0] += width * float(cellArea[maskA].sum())
+        totals[1] += width * float(cellArea[maskB].sum())
+        totals[2] += width * float(cellArea[maskA & maskB].sum())
+    return totals[0], totals[1], totals[2]
+
+
+def box_triangles(boxes: Sequence[Box]) -> "np.ndarray":
+    """(12 * n, 3, 3) outward-facing triangles, e.g. for MeshRasterizer."""
+    boxes = normalize(boxes)
+    if not boxes:
+        return np.zeros((0, 3, 3))
+    # Corner c of a box takes max on axis i when bit i of c is set.
+    quads = [(0, 2, 3, 1), (4, 5, 7, 6), (0, 1, 5, 4), (2, 6, 7, 3), (0, 4, 6, 2), (1, 3, 7, 5)]
+    faces = [(q[0], q[1], q[2]) for q in quads] + [(q[0], q[2], q[3]) for q in quads]
+    bits = np.array([[(c >> i) & 1 for i in range(3)] for c in range(8)], dtype=bool)
+    corners = np.array(boxes, dtype=np.float64)  # (n, 2, 3)
+    verts = np.where(bits[None, :, :], corners[:, None, 1, :], corners[:, None, 0, :])  # (n, 8, 3)
+    return verts[:, np.array(faces)].reshape(-1, 3, 3)
+
+
+def orthogonal_polyhedron_boxes(
+    points: Sequence[Sequence[float]],
+    faces: Sequence[Sequence[int]],
+) -> Optional[List[Box]]:
+    """Decompose a closed, consistently wound orthogonal polyhedron into boxes.
+
+    Faces may run clockwise seen from outside (OpenSCAD's documented
+    convention) or counter-clockwise, as long as they all agree. Returns
+    None unless every face lies in an x, y or z plane, every edge is shared
+    by exactly two faces in opposite directions, and the inside winding
+    number is the same (1 or -1) everywhere, i.e. for anything OpenSCAD
+    might treat differently (open, partly inverted, self-intersecting or
+    non-orthogonal meshes); callers fall back to rendering those.
+    """
+    if not available():
+        raise RuntimeError("BoxVolume requires NumPy.")
+    try:
+        pts = np.array([[float(c) for c in p[:3]] for p in points], dtype=np.float64)
+        loops = [[int(v) for v in f] for f in faces]
+    except (TypeError, ValueError, IndexError):
+        return None
+    if pts.ndim != 2 or pts.shape[1] != 3 or not loops:
+        return None
+    edges: Counter = Counter()
+    zFaces = []
+    for loop in loops:
+        if len(loop) < 3 or min(loop) < 0 or max(loop) >= len(pts):
+            return None
+        for u, v in zip(loop, loop[1:] + loop[:1]):
+            if u == v:
+                return None
+            edges[(u, v)] += 1
+        flat = [i for i in range(3) if np.all(pts[loop, i] == pts[loop[0], i])]
+        if not flat:
+            return None
+        if flat[0] == 2:
+            zFaces.append(loop)
+    if any(count != 1 or edges.get((v, u)) != 1 for (u, v), count in edges.items()):
+        return None
+
+    xs, ys, zs = (np.unique(pts[:, i]) for i in range(3))
+    if len(xs) < 2 or len(ys) < 2 or len(zs) < 2:
+        return []
+    cx = (xs[:-1] + xs[1:]) / 2
+    cy = (ys[:-1] + ys[1:]) / 2
+    px, py = np.meshgrid(cx, cy, indexing="ij")
+    # Winding of each z-face around every column's centre, accumulated per
+    # z plane. Angle sums split a centre lying on an edge shared by two
+    # coplanar faces (a triangulated square's diagonal) evenly between them.
+    planeWinding = np.zeros((len(zs),) + px.shape)
+    for loop in zFaces:
+        ring = pts[loop + loop[:1], :2]
+        dx = ring[:, 0, None, None] - px[None]
+        dy = ring[:, 1, None, None] - py[None]
+        cross = dx[:-1] * dy[1:] - dy[:-1] * dx[1:]
+        dot = dx[:-1] * dx[1:] + dy[:-1] * dy[1:]
+        # A centre exactly on an edge would get +pi from both faces sharing
+        # it; counting that edge as 0 gives each face half a turn instead.
+        angle = np.where((cross == 0) & (dot < 0), 0.0, np.arctan2(cross, dot))
+        plane = np.searchsorted(zs, pts[loop[0], 2])
+        planeWinding[plane] += angle.sum(axis=0) / (2 * math.pi)
+    # A point's winding is the sum over the z-faces above it: an outward
+    # top face counts +1 and a bottom face -1.
+    above = np.cumsum(planeWinding[::-1], axis=0)[::-1]
+    winding = np.moveaxis(above[1:], 0, -1)  # (nx, ny, nz) cell windings
+    rounded = np.rint(winding)
+    if np.any(np.abs(winding - rounded) > _WINDING_TOLERANCE):
+        return None
+    if rounded.min() < 0:
+        # Clockwise faces: the inside winds -1 throughout instead.
+        rounded = -rounded
+    if np.any((rounded != 0) & (rounded != 1)):
+        return None
+
+    inside = rounded == 1
+    boxes: List[Box] = []
+    for i, j in zip(*np.nonzero(inside.any(axis=2))):
+        column = inside[i, j]
+        k = 0
+        while k < len(column):
+            if not column[k]:
+                k += 1
+                continue
+            start = k
+            while k < len(column) and column[k]:
+                k += 1
+            boxes.append((
+                (float(xs[i]), float(ys[j]), float(zs[start])),
+                (float(xs[i + 1]), float(ys[j + 1]), float(zs[k])),
+            ))
+    return boxes
@@ -0,0 +1,183 @@
+"""
+NumPy z-buffer rasterizer for mesh preview PNGs.
+
+Draws triangle soups with flat shading through a perspective camera fitted
+to the geometry, like OpenSCAD's --autocenter --viewall previews, without
+launching OpenSCAD. Camera strings use OpenSCAD's --camera syntax: seven
+values (translate x,y,z, rotate x,y,z, distance) give a gimbal camera whose
+rotation is used, six (eye x,y,z, centre x,y,z) a vector camera whose view
+direction is used. Position and distance are always refitted to the mesh.
+"""
+import math
+from typing import Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised only without numpy
+    np = None
+
+try:
+    from PIL import Image
+except ImportError:  # pragma: no cover - exercised only without pillow
+    Image = None
+
+Color = Tuple[int, int, int]
+
+DEFAULT_CAMERA = "--camera=10,10,10,55,0,25,100"
+# Close to OpenSCAD's Starnight preview colours.
+BACKGROUND_COLOR: Color = (0, 0, 0)
+FACE_COLOR: Color = (255, 236, 94)
+OVERLAY_COLOR: Color = (255, 0, 0)
+
+_FOV_DEGREES = 22.5
+# View-space key light, above and to the right of the eye so faces seen at
+# equal angles (e.g. an isometric cube) still shade differently.
+_LIGHT = np.array([0.3, 0.5, 1.0]) / np.linalg.norm([0.3, 0.5, 1.0]) if np is not None else None
+_CHUNK_TRIANGLES = 1 << 16
+# Overlay layers must be this much nearer (relative inverse depth) to cover
+# earlier layers, so surfaces the layers share show the first one instead
+# of z-fighting, as in OpenSCAD's difference() overlay.
+_OVERLAY_DEPTH_BIAS = 1e-5
+_MAX_FRAGMENTS = 1 << 20
+
+
+def available() -> bool:
+    return np is not None and Image is not None
+
+
+def render_png(
+    layers: Sequence[Tuple["np.ndarray", Color]],
+    png_path: str,
+    camera: str = DEFAULT_CAMERA,
+    size: Tuple[int, int] = (800, 600),
+) -> None:
+    """Rasterize (triangles, color) layers into one z-buffer and save a PNG.
+
+    Later layers only show where they are in front of earlier ones.
+    """
+    if not available():
+        raise RuntimeError("MeshRasterizer requires NumPy and Pillow.")
+    Image.fromarray(render(layers, camera, size)).save(png_path)
+
+
+def render(
+    layers: Sequence[Tuple["np.ndarray", Color]],
+    camera: str = DEFAULT_CAMERA,
+    size: Tuple[int, int] = (800, 600),
+) -> "np.ndarray":
+    """Return an (height, width, 3) uint8 image of the layers."""
+    width, height = size
+    axes = camera_axes(camera)
+    soups = [(np.asarray(t).reshape(-1, 3, 3), color) for t, color in layers]
+    image = np.empty((height * width, 3), dtype=np.uint8)
+    image[:] = BACKGROUND_COLOR
+    points = [t.reshape(-1, 3) for t, _ in soups if len(t)]
+    if not points:
+        return image.reshape(height, width, 3)
+
+    lo = np.min([p.min(axis=0) for p in points], axis=0).astype(np.float64)
+    hi = np.max([p.max(axis=0) for p in points], axis=0).astype(np.float64)
+    centre = (lo + hi) / 2.0
+    radius = max(float(np.linalg.norm(hi - lo)) / 2.0, 1e-9)
+    half_fov = math.radians(_FOV_DEGREES) / 2.0
+    view = {
+        "centre": centre,
+        "axes": axes,
+        "distance": radius / math.sin(half_fov),
+        "focal": (height / 2.0) / math.tan(half_fov),
+        "width": width,
+        "height": height,
+    }
+    # Inverse eye distance per pixel: larger is nearer, 0 is empty.
+    zbuf = np.zeros(height * width)
+    for layer, (tris, color) in enumerate(soups):
+        bias = _OVERLAY_DEPTH_BIAS if layer else 0.0
+        for start in range(0, len(tris), _CHUNK_TRIANGLES):
+            _raster_chunk(tris[start:start + _CHUNK_TRIANGLES], view, zbuf, image, color, bias)
+    return image.reshape(height, width, 3)
+
+
+def camera_axes(camera: str) -> "np.ndarray":
+    """Rows are the view's right, up and back (towards the eye) directions."""
+    values = [float(v) for v in camera.split("=", 1)[-1].split(",")]
+    if len(values) == 7:
+        # OpenSCAD's rotate([x, y, z]) of a camera looking down -z.
+        rx, ry, rz = (math.radians(v) for v in values[3:6])
+        cx, sx, cy, sy, cz, sz = math.cos(rx), math.sin(rx), math.cos(ry), math.sin(ry), math.cos(rz), math.sin(rz)
+        rot_x = np.array([[1, 0, 0], [0, cx, -sx], [0, sx, cx]])
+        rot_y = np.array([[cy, 0, sy], [0, 1, 0], [-sy, 0, cy]])
+        rot_z = np.array([[cz, -sz, 0], [sz, cz, 0], [0, 0, 1]])
+        return (rot_z @ rot_y @ rot_x).T
+    if len(values) == 6:
+        back = np.array(values[:3]) - np.array(values[3:])
+        norm = np.linalg.norm(back)
+        back = back / norm if norm > 0 else np.array([0.0, 0.0, 1.0])
+        world_up = np.array([0.0, 0.0, 1.0])
+        if np.linalg.norm(np.cross(world_up, back)) < 1e-9:
+            world_up = np.array([0.0, 1.0, 0.0])
+        right = np.cross(world_up, back)
+        right /= np.linalg.norm(right)
+        return np.stack([right, np.cross(back, right), back])
+    raise ValueError(f"Unsupported camera: {camera!r}")
+
+
+def _raster_chunk(
+    tris: "np.ndarray", view: dict, zbuf: "np.ndarray", image: "np.ndarray", color: Color, bias: float = 0.0
+) -> None:
+    width, height = view["width"], view["height"]
+    v = (tris.astype(np.float64) - view["centre"]) @ view["axes"].T
+    depth = view["distance"] - v[..., 2]
+    sx = width / 2.0 + view["focal"] * v[..., 0] / depth
+    sy = height / 2.0 - view["focal"] * v[..., 1] / depth
+
+    normal = np.cross(v[:, 1] - v[:, 0], v[:, 2] - v[:, 0])
+    length = np.linalg.norm(normal, axis=1)
+    area = (sx[:, 1] - sx[:, 0]) * (sy[:, 2] - sy[:, 0]) - (sx[:, 2] - sx[:, 0]) * (sy[:, 1] - sy[:, 0])
+    # Pixel (i, j) is sampled at its centre (i + 0.5, j + 0.5).
+    x0 = np.clip(np.ceil(sx.min(axis=1) - 0.5), 0, width - 1).astype(np.int64)
+    x1 = np.clip(np.floor(sx.max(axis=1) - 0.5), -1, width - 1).astype(np.int64)
+    y0 = np.clip(np.ceil(sy.min(axis=1) - 0.5), 0, height - 1).astype(np.int64)
+    y1 = np.clip(np.floor(sy.max(axis=1) - 0.5), -1, height - 1).astype(np.int64)
+    keep = (length > 0) & (np.abs(area) > 1e-12) & (x1 >= x0) & (y1 >= y0) & np.all(depth > 0, axis=1)
+    if not keep.any():
+        return
+    idx = np.nonzero(keep)[0]
+    shade = 0.2 + 0.8 * np.abs(normal[idx] @ _LIGHT) / length[idx]
+    rgb = (shade[:, None] * np.asarray(color, dtype=np.float64)).astype(np.uint8)
+    inv_depth = 1.0 / depth[idx]
+    sx, sy, area = sx[idx], sy[idx], area[idx]
+    x0, x1, y0, y1 = x0[idx], x1[idx], y0[idx], y1[idx]
+
+    # Bucket by bbox size so each batch tests a fixed k x k pixel block.
+    extent = np.maximum(x1 - x0, y1 - y0) + 1
+    bucket = np.ceil(np.log2(extent)).astype(np.int64)
+    for b in np.unique(bucket):
+        k = 1 << int(b)
+        members = np.nonzero(bucket == b)[0]
+        gy, gx = np.divmod(np.arange(k * k), k)
+        step = max(1, _MAX_FRAGMENTS // (k * k))
+        for start in range(0, len(members), step):
+            t = members[start:start + step]
+            px = x0[t, None] + gx[None, :]
+            py = y0[t, None] + gy[None, :]
+            cx, cy = px + 0.5, py + 0.5
+            w0 = ((sx[t, 1, None] - cx) * (sy[t, 2, None] - cy) - (sx[t, 2, None] - cx) * (sy[t, 1, None] - cy)) / area[t, None]
+            w1 = ((sx[t, 2, None] - cx) * (sy[t, 0, None] - cy) - (sx[t, 0, None] - cx) * (sy[t, 2, None] - cy)) / area[t, None]
+            w2 = 1.0 - w0 - w1
+            inside = (w0 >= 0) & (w1 >= 0) & (w2 >= 0) & (px <= x1[t, None]) & (py <= y1[t, None])
+            if not inside.any():
+                continue
+            # 1/depth is affine in screen space, so it interpolates exactly.
+            near = w0 * inv_depth[t, 0, None] + w1 * inv_depth[t, 1, None] + w2 * inv_depth[t, 2, None]
+            tri, _ = np.nonzero(inside)
+            pix = (py * width + px)[inside]
+            near = near[inside]
+            order = np.lexsort((-near, pix))
+            pix_sorted = pix[order]
+            first = np.ones(len(order), dtype=bool)
+            first[1:] = pix_sorted[1:] != pix_sorted[:-1]
+            win = order[first]
+            closer = near[win] > zbuf[pix[win]] * (1.0 + bias)
+            win = win[closer]
+            zbuf[pix[win]] = near[win]
+            image[pix[win]] = rgb[t[tri[win]]]
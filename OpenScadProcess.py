@@ -0,0 +1,290 @@
+"""
+Runs one OpenSCAD (or any) child process and measures it.
+
+Each run reports wall time, user/system CPU and peak RSS for that child
+alone, so the numbers stay correct while the scheduler runs several children
+at once (RUSAGE_CHILDREN deltas would mix them). POSIX uses os.wait4 on the
+child's pid; Windows queries the process handle. Values a platform cannot
+provide are None.
+
+Runs can be confined by Limits: a wall-clock timeout that kills the child's
+whole process group (so an xvfb-run wrapper takes its Xvfb and OpenSCAD down
+with it), plus RLIMIT_AS and RLIMIT_CPU set in the child before exec. The
+rlimits need POSIX; on Windows only the wall-clock limit applies. Failed runs
+are classified as timeout, cpu, oom, crash or error (a normal non-zero exit,
+such as a SCAD syntax error).
+"""
+import atexit
+import os
+import re
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+_OOM_PATTERN = re.compile(r"bad_alloc|out of memory|cannot allocate memory", re.IGNORECASE)
+# NTSTATUS codes: exit codes at or above this are crashes, and
+# STATUS_NO_MEMORY is an allocation failure.
+_NTSTATUS_ERROR = 0xC0000000
+_NTSTATUS_NO_MEMORY = 0xC0000017
+
+# Process groups still running, killed at exit: a new session no longer
+# receives the terminal's Ctrl-C, so an interrupted run must not orphan them.
+_liveGroups = set()
+_liveGroupsLock = threading.Lock()
+
+
+class Limits:
+    """Resource caps for one run; None leaves a resource unlimited."""
+
+    def __init__(
+        self,
+        wallSeconds: Optional[float] = None,
+        cpuSeconds: Optional[float] = None,
+        memoryBytes: Optional[int] = None,
+    ):
+        self.wallSeconds = wallSeconds
+        self.cpuSeconds = cpuSeconds
+        self.memoryBytes = memoryBytes
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"wallSeconds": self.wallSeconds, "cpuSeconds": self.cpuSeconds, "memoryBytes": self.memoryBytes}
+
+
+class ProcessResult:
+    def __init__(
+        self,
+        returncode: int,
+        stdout: str,
+        stderr: str,
+        timedOut: bool,
+        wallSeconds: float,
+        userSeconds: Optional[float] = None,
+        systemSeconds: Optional[float] = None,
+        peakRssBytes: Optional[int] = None,
+        failure: Optional[str] = None,
+    ):
+        self.returncode = returncode
+        self.stdout = stdout
+        self.stderr = stderr
+        self.timedOut = timedOut
+        self.wallSeconds = wallSeconds
+        self.userSeconds = userSeconds
+        self.systemSeconds = systemSeconds
+        self.peakRssBytes = peakRssBytes
+        self.failure = failure
+
+    def usage(self) -> Dict[str, Any]:
+        return {
+            "returncode": self.returncode,
+            "timedOut": self.timedOut,
+            "wallSeconds": self.wallSeconds,
+            "userSeconds": self.userSeconds,
+            "systemSeconds": self.systemSeconds,
+            "peakRssBytes": self.peakRssBytes,
+            "failure": self.failure,
+        }
+
+
+def run(
+    command: List[str],
+    timeout: Optional[float] = None,
+    cwd: Optional[str] = None,
+    limits: Optional[Limits] = None,
+) -> ProcessResult:
+    """Run command to completion, killing it after timeout seconds.
+
+    timeout, when given, overrides limits.wallSeconds.
+    """
+    limits = limits or Limits()
+    if timeout is None:
+        timeout = limits.wallSeconds
+    if hasattr(os, "wait4"):
+        result = _run_wait4(command, timeout, cwd, limits)
+    else:
+        result = _run_portable(command, timeout, cwd)
+    result.failure = classify(result, limits)
+    return result
+
+
+def classify(result: ProcessResult, limits: Optional[Limits] = None) -> Optional[str]:
+    """None for success, else timeout, cpu, oom, crash or error."""
+    if result.timedOut:
+        return "timeout"
+    code = result.returncode
+    if code == 0:
+        return None
+    if _OOM_PATTERN.search(result.stderr or "") or code == _NTSTATUS_NO_MEMORY:
+        return "oom"
+    if code == -getattr(signal, "SIGXCPU", 0):
+        return "cpu"
+    if code == -getattr(signal, "SIGKILL", 0):
+        cpu = (result.userSeconds or 0) + (result.systemSeconds or 0)
+        if limits is not None and limits.cpuSeconds is not None and cpu >= limits.cpuSeconds:
+            return "cpu"
+        # Nothing here sent it, so it is most likely the kernel's OOM killer.
+        return "oom"
+    if code < 0 or code >= _NTSTATUS_ERROR:
+        return "crash"
+    return "error"
+
+
+def _apply_rlimits(limits: Limits) -> None:
+    # Runs in the child between fork and exec: no locks, no allocation-heavy
+    # work. A platform refusing a limit (e.g. RLIMIT_AS on macOS) is ignored.
+    if limits.memoryBytes is not None:
+        try:
+            resource.setrlimit(resource.RLIMIT_AS, (limits.memoryBytes, limits.memoryBytes))
+        except (ValueError, OSError):
+            pass
+    if limits.cpuSeconds is not None:
+        # SIGXCPU at the soft limit, SIGKILL one second later if ignored.
+        soft = max(1, int(limits.cpuSeconds))
+        try:
+            resource.setrlimit(resource.RLIMIT_CPU, (soft, soft + 1))
+        except (ValueError, OSError):
+            pass
+
+
+def _kill_group(pgid: int) -> None:
+    try:
+        os.killpg(pgid, signal.SIGKILL)
+    except (ProcessLookupError, PermissionError):
+        pass
+
+
+@atexit.register
+def _kill_live_groups() -> None:
+    with _liveGroupsLock:
+        groups = list(_liveGroups)
+    for pgid in groups:
+        _kill_group(pgid)
+
+
+def _run_wait4(command: List[str], timeout: Optional[float], cwd: Optional[str], limits: Limits) -> ProcessResult:
+    preexec = None
+    if resource is not None and (limits.memoryBytes is not None or limits.cpuSeconds is not None):
+        def preexec() -> None:
+            _apply_rlimits(limits)
+
+    # Output goes to temporary files rather than pipes: nothing has to drain
+    # them while this thread blocks in wait4, which reaps the child itself,
+    # and descendants that outlive it cannot hold a pipe open.
+    with tempfile.TemporaryFile() as out, tempfile.TemporaryFile() as err:
+        t0 = time.monotonic()
+        proc = subprocess.Popen(
+            command, stdout=out, stderr=err, cwd=cwd, start_new_session=True, preexec_fn=preexec
+        )
+        with _liveGroupsLock:
+            _liveGroups.add(proc.pid)
+        expired = threading.Event()
+        timer = None
+        if timeout is not None:
+            def expire() -> None:
+                expired.set()
+                _kill_group(proc.pid)
+
+            timer = threading.Timer(timeout, expire)
+            timer.daemon = True
+            timer.start()
+        try:
+            _, status, usage = os.wait4(proc.pid, 0)
+        finally:
+            if timer is not None:
+                timer.cancel()
+            with _liveGroupsLock:
+                _liveGroups.discard(proc.pid)
+        wall = time.monotonic() - t0
+        proc.returncode = os.waitstatus_to_exitcode(status)
+        if proc.returncode != 0:
+            # Take down anything the child left behind in its group.
+            _kill_group(proc.pid)
+        out.seek(0)
+        err.seek(0)
+        # ru_maxrss is in kilobytes on Linux and bytes on macOS.
+        scale = 1 if sys.platform == "darwin" else 1024
+        return ProcessResult(
+            proc.returncode,
+            out.read().decode("utf-8", errors="replace"),
+            err.read().decode("utf-8", errors="replace"),
+            expired.is_set(),
+            wall,
+            usage.ru_utime,
+            usage.ru_stime,
+            usage.ru_maxrss * scale,
+        )
+
+
+def _run_portable(command: List[str], timeout: Optional[float], cwd: Optional[str]) -> ProcessResult:
+    t0 = time.monotonic()
+    proc = subprocess.Popen(
+        command,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        encoding="utf-8",
+        errors="replace",
+        cwd=cwd,
+        creationflags=getattr(subprocess, "CREATE_NEW_PROCESS_GROUP", 0),
+    )
+    timedOut = False
+    try:
+        stdout, stderr = proc.communicate(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        timedOut = True
+        proc.kill()
+        stdout, stderr = proc.communicate()
+    wall = time.monotonic() - t0
+    userSeconds, systemSeconds, peak = _windows_usage(proc)
+    return ProcessResult(proc.returncode, stdout, stderr, timedOut, wall, userSeconds, systemSeconds, peak)
+
+
+def _windows_usage(proc: subprocess.Popen):
+    # The handle stays open until the Popen object is collected, so the
+    # exited process can still be queried here.
+    handle = getattr(proc, "_handle", None)
+    if handle is None:
+        return None, None, None
+    try:
+        import ctypes
+        from ctypes import wintypes
+
+        class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+            _fields_ = [
+                ("cb", wintypes.DWORD),
+                ("PageFaultCount", wintypes.DWORD),
+                ("PeakWorkingSetSize", ctypes.c_size_t),
+                ("WorkingSetSize", ctypes.c_size_t),
+                ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                ("PagefileUsage", ctypes.c_size_t),
+                ("PeakPagefileUsage", ctypes.c_size_t),
+            ]
+
+        creation, exited, kernel, user = (wintypes.FILETIME() for _ in range(4))
+        if not ctypes.windll.kernel32.GetProcessTimes(
+            int(handle), ctypes.byref(creation), ctypes.byref(exited), ctypes.byref(kernel), ctypes.byref(user)
+        ):
+            return None, None, None
+        counters = PROCESS_MEMORY_COUNTERS()
+        counters.cb = ctypes.sizeof(counters)
+        peak = None
+        if ctypes.windll.psapi.GetProcessMemoryInfo(int(handle), ctypes.byref(counters), counters.cb):
+            peak = int(counters.PeakWorkingSetSize)
+
+        def seconds(ft) -> float:
+            return ((ft.dwHighDateTime << 32) | ft.dwLowDateTime) / 1e7
+
+        return seconds(user), seconds(kernel), peak
+    except (AttributeError, ImportError, OSError):
+        return None, None, None
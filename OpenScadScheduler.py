@@ -0,0 +1,205 @@
+"""
+Process-wide scheduler for OpenSCAD subprocesses.
+
+Every OpenSCAD export and PNG render in the process goes through one bounded
+pool sized to the cores and memory of the machine, so concurrent test
+subpasses neither leave cores idle nor oversubscribe the box. Jobs may list
+other jobs' futures as dependencies; a job only takes a slot once they have
+all finished, so a comparison can queue its whole render graph up front.
+
+Jobs must not wait on other scheduler futures themselves, or a full pool
+could deadlock; schedule the subprocess calls and wait from the caller.
+
+Settings (environment):
+    OPENSCAD_MAX_JOBS       fixed number of concurrent OpenSCAD processes
+    OPENSCAD_JOB_MEMORY_MB  memory budgeted per process (default 2048)
+"""
+import os
+import threading
+import time
+from concurrent.futures import CancelledError, Future, InvalidStateError, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Optional
+
+defaultJobMemoryMb = 2048
+
+
+def _physical_memory_bytes() -> Optional[int]:
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+    except (AttributeError, ValueError, OSError):
+        pass
+    try:
+        import ctypes
+
+        class MEMORYSTATUSEX(ctypes.Structure):
+            _fields_ = [
+                ("dwLength", ctypes.c_ulong),
+                ("dwMemoryLoad", ctypes.c_ulong),
+                ("ullTotalPhys", ctypes.c_ulonglong),
+                ("ullAvailPhys", ctypes.c_ulonglong),
+                ("ullTotalPageFile", ctypes.c_ulonglong),
+                ("ullAvailPageFile", ctypes.c_ulonglong),
+                ("ullTotalVirtual", ctypes.c_ulonglong),
+                ("ullAvailVirtual", ctypes.c_ulonglong),
+                ("sullAvailExtendedVirtual", ctypes.c_ulonglong),
+            ]
+
+        status = MEMORYSTATUSEX()
+        status.dwLength = ctypes.sizeof(MEMORYSTATUSEX)
+        if ctypes.windll.kernel32.GlobalMemoryStatusEx(ctypes.byref(status)):
+            return int(status.ullTotalPhys)
+    except (AttributeError, ImportError, OSError):
+        pass
+    return None
+
+
+def defaultSlots() -> int:
+    """Concurrent OpenSCAD processes: one per core, capped by memory."""
+    configured = os.environ.get("OPENSCAD_MAX_JOBS")
+    if configured:
+        return max(1, int(configured))
+    slots = os.cpu_count() or 1
+    jobMemory = int(os.environ.get("OPENSCAD_JOB_MEMORY_MB", defaultJobMemoryMb)) * 1024 * 1024
+    memory = _physical_memory_bytes()
+    if memory and jobMemory > 0:
+        slots = min(slots, memory // jobMemory)
+    return max(1, int(slots))
+
+
+class OpenScadScheduler:
+    def __init__(self, slots: Optional[int] = None):
+        self.slots = slots or defaultSlots()
+        self._executor = ThreadPoolExecutor(max_workers=self.slots, thread_name_prefix="openscad")
+        self._lock = threading.Lock()
+        self._started = time.monotonic()
+        self._waiting = 0
+        self._queued = 0
+        self._running = 0
+        self._completed = 0
+        self._failed = 0
+        self._skipped = 0
+        self._maxQueueDepth = 0
+        self._busySeconds = 0.0
+
+    def submit(self, fn: Callable[..., Any], *args, after: Iterable[Future] = (), **kwargs) -> Future:
+        """Run fn(*args, **kwargs) in a slot once every future in after is done.
+
+        If a dependency failed or was cancelled, the job is skipped and its
+        future carries that exception instead.
+        """
+        deps = list(after)
+        future: Future = Future()
+        with self._lock:
+            self._waiting += 1
+        if not deps:
+            self._enqueue(future, fn, args, kwargs)
+            return future
+
+        remaining = [len(deps)]
+
+        def onDependencyDone(_dep: Future) -> None:
+            with self._lock:
+                remaining[0] -= 1
+                if remaining[0]:
+                    return
+            error = None
+            for dep in deps:
+                if dep.cancelled():
+                    error = CancelledError()
+                elif dep.exception() is not None:
+                    error = dep.exception()
+                if error is not None:
+                    break
+            if error is None:
+                self._enqueue(future, fn, args, kwargs)
+                return
+            with self._lock:
+                self._waiting -= 1
+                self._skipped += 1
+            try:
+                future.set_exception(error)
+            except InvalidStateError:
+                pass
+
+        for dep in deps:
+            dep.add_done_callback(onDependencyDone)
+        return future
+
+    def _enqueue(self, future: Future, fn: Callable[..., Any], args, kwargs) -> None:
+        with self._lock:
+            self._waiting -= 1
+            self._queued += 1
+            self._maxQueueDepth = max(self._maxQueueDepth, self._queued)
+        self._executor.submit(self._run, future, fn, args, kwargs)
+
+    def _run(self, future: Future, fn: Callable[..., Any], args, kwargs) -> None:
+        if not future.set_running_or_notify_cancel():
+            with self._lock:
+                self._queued -= 1
+            return
+        with self._lock:
+            self._queued -= 1
+            self._running += 1
+        t0 = time.monotonic()
+        failed = False
+        try:
+            value = fn(*args, **kwargs)
+        except BaseException as e:
+            failed = True
+            future.set_exception(e)
+        else:
+            future.set_result(value)
+        finally:
+            with self._lock:
+                self._busySeconds += time.monotonic() - t0
+                self._running -= 1
+                self._completed += 1
+                self._failed += failed
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth, slot usage and utilisation since the pool started."""
+        with self._lock:
+            elapsed = time.monotonic() - self._started
+            return {
+                "slots": self.slots,
+                "waiting": self._waiting,
+                "queued": self._queued,
+                "running": self._running,
+                "completed": self._completed,
+                "failed": self._failed,
+                "skipped": self._skipped,
+                "maxQueueDepth": self._maxQueueDepth,
+                "busySeconds": self._busySeconds,
+                "utilisation": self._busySeconds / (self.slots * elapsed) if elapsed > 0 else 0.0,
+            }
+
+    def formatStats(self) -> str:
+        s = self.stats()
+        return (
+            f"OpenSCAD scheduler: {s['completed']} jobs ({s['failed']} failed, {s['skipped']} skipped) on {s['slots']} slots, "
+            f"{s['utilisation'] * 100:.0f}% utilised, max queue depth {s['maxQueueDepth']}, "
+            f"{s['running']} running, {s['queued']} queued, {s['waiting']} waiting on dependencies"
+        )
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait)
+
+
+_scheduler: Optional[OpenScadScheduler] = None
+_schedulerLock = threading.Lock()
+
+
+def getScheduler() -> OpenScadScheduler:
+    """The shared scheduler, created on first use."""
+    global _scheduler
+    with _schedulerLock:
+        if _scheduler is None:
+            _scheduler = OpenScadScheduler()
+        return _scheduler
+
+
+def currentStats() -> Optional[Dict[str, Any]]:
+    """Stats of the shared scheduler, or None if nothing has been scheduled."""
+    with _schedulerLock:
+        scheduler = _scheduler
+    return scheduler.stats() if scheduler is not None else None
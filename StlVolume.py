@@ -1,110 +1,946 @@
+import heapq
+import mmap
+import multiprocessing
+import threading
+import time
+import contextlib
+import tracemalloc
 import struct
 import sys
 import math
 import warnings
 import os
-from typing import List, Tuple, Dict, Optional, Iterable
+import zipfile
+import hashlib
+import json
+import tempfile
+import xml.etree.ElementTree as ET
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+from typing import List, Tuple, Dict, Optional, Iterable, Iterator
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 
 Vec3 = Tuple[float, float, float]
 Tri = Tuple[Vec3, Vec3, Vec3]
 
+if np is not None:
+    # One binary STL facet record: normal, three corners, attribute byte count.
+    _STL_FACET_DTYPE = np.dtype(
+        [("normal", "<f4", (3,)), ("verts", "<f4", (3, 3)), ("attr", "<u2")]
+    )
 
-def calculate_stl_volume(path: str, *, tolerance: Optional[float] = None) -> float:
-    if not os.path.exists(path): return 0.0
 
-    tris = _load_stl(path)
-    if not tris:
-        return 0.0
-    min_v, max_v = _bounds(tris)
-    diag = math.sqrt(
-        (max_v[0] - min_v[0]) ** 2 + (max_v[1] - min_v[1]) ** 2 + (max_v[2] - min_v[2]) ** 2
-    )
-    if diag == 0.0:
-        return 0.0
-    if tolerance is None:
-        tol = max(diag * 1e-9, 1e-12)
-    else:
-        tol = max(float(tolerance), 0.0)
-    tris = _filter_degenerate(tris, diag)
-    if not tris:
-        return 0.0
-    verts, faces = _dedup_vertices(tris, tol)
-    if not faces:
-        return 0.0
-    (
-        components,
-        flips,
-        edge_counts_per_comp,
-        nonmanifold_edge_counts_per_comp,
-        orient_conflicts,
-    ) = _orient_faces_and_components(faces, len(verts))
-    comp_ids = sorted(components.keys())
-    comps = []
-    for comp_id in comp_ids:
-        comp_faces = components[comp_id]
-        edges = edge_counts_per_comp.get(comp_id, {})
-        nonmf = nonmanifold_edge_counts_per_comp.get(comp_id, 0)
-        boundary_edges = sum(1 for n in edges.values() if n == 1)
-        if boundary_edges > 0:
-            warnings.warn(
-                f"Component {comp_id}: mesh is not watertight; result is a best-effort estimate.",
-                RuntimeWarning,
-            )
-        if nonmf > 0:
-            warnings.warn(
-                f"Component {comp_id}: non-manifold edges detected ({nonmf}); result may be unreliable.",
-                RuntimeWarning,
+class MeshReport:
+    """Metrics gathered from one parse of a mesh file.
+
+    component_volumes holds each shell's contribution to the total, negative
+    for cavities; it is None when the streaming path skipped component
+    analysis. volume_source is "exact" or "voxel", and volume_error is 0.0
+    for exact results and the voxel error bound when the volume was
+    estimated; mode="voxel" reports only volume, volume_error, bbox and
+    triangle_count. voxel_volume and voxel_error hold the voxel cross-check
+    of a non-manifold or inconsistently oriented mesh, None when it did not
+    run; the exact volume is still the one reported.
+    """
+
+    def __init__(
+        self,
+        volume: float = 0.0,
+        surface_area: float = 0.0,
+        bbox: Optional[Tuple[Vec3, Vec3]] = None,
+        component_volumes: Optional[List[float]] = None,
+        triangle_count: int = 0,
+        boundary_edges: int = 0,
+        nonmanifold_edges: int = 0,
+        orientation_conflicts: int = 0,
+        volume_error: float = 0.0,
+        volume_source: str = "exact",
+        voxel_volume: Optional[float] = None,
+        voxel_error: Optional[float] = None,
+    ):
+        self.volume = volume
+        self.surface_area = surface_area
+        self.bbox = bbox
+        self.component_volumes = component_volumes
+        self.triangle_count = triangle_count
+        self.boundary_edges = boundary_edges
+        self.nonmanifold_edges = nonmanifold_edges
+        self.orientation_conflicts = orientation_conflicts
+        self.volume_error = volume_error
+        self.volume_source = volume_source
+        self.voxel_volume = voxel_volume
+        self.voxel_error = voxel_error
+
+    @property
+    def watertight(self) -> bool:
+        return self.boundary_edges == 0
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            "volume": self.volume,
+            "surface_area": self.surface_area,
+            "bbox": [list(self.bbox[0]), list(self.bbox[1])] if self.bbox else None,
+            "component_volumes": self.component_volumes,
+            "triangle_count": self.triangle_count,
+            "watertight": self.watertight,
+            "boundary_edges": self.boundary_edges,
+            "nonmanifold_edges": self.nonmanifold_edges,
+            "orientation_conflicts": self.orientation_conflicts,
+            "volume_error": self.volume_error,
+            "volume_source": self.volume_source,
+            "voxel_volume": self.voxel_volume,
+            "voxel_error": self.voxel_error,
+        }
+
+    @classmethod
+    def from_dict(cls, d: Dict[str, object]) -> "MeshReport":
+        bbox = d.get("bbox")
+        return cls(
+            volume=d["volume"],
+            surface_area=d["surface_area"],
+            bbox=(tuple(bbox[0]), tuple(bbox[1])) if bbox else None,
+            component_volumes=d.get("component_volumes"),
+            triangle_count=d["triangle_count"],
+            boundary_edges=d["boundary_edges"],
+            nonmanifold_edges=d["nonmanifold_edges"],
+            orientation_conflicts=d["orientation_conflicts"],
+            volume_error=d.get("volume_error", 0.0),
+            volume_source=d.get("volume_source", "exact"),
+            voxel_volume=d.get("voxel_volume"),
+            voxel_error=d.get("voxel_error"),
+        )
+
+    def __repr__(self) -> str:
+        return (
+            f"MeshReport(volume={self.volume!r}, surface_area={self.surface_area!r}, "
+            f"triangles={self.triangle_count}, components="
+            f"{None if self.component_volumes is None else len(self.component_volumes)}, "
+            f"watertight={self.watertight})"
+        )
+
+
+class MeshLoadError(ValueError):
+    """Raised when an OFF, 3MF or AMF file is malformed."""
+
+
+class Mesh:
+    """Indexed triangle mesh: shared vertices plus three vertex indices per face.
+
+    With NumPy, vertices is an (n, 3) float32 or float64 array (float32 when
+    it came from a binary STL) and faces an (m, 3) int32 array; without it
+    both are lists of tuples. component_ids gives each face's connected
+    shell once set_components has run.
+    """
+
+    __slots__ = ("vertices", "faces", "component_ids")
+
+    def __init__(self, vertices, faces, component_ids=None):
+        self.vertices = vertices
+        self.faces = faces
+        self.component_ids = component_ids
+
+    @classmethod
+    def from_tuples(cls, verts: List[Vec3], faces: List[Tuple[int, int, int]]) -> "Mesh":
+        if np is None:
+            return cls(list(verts), list(faces))
+        return cls(
+            np.asarray(verts, dtype=np.float64).reshape(-1, 3),
+            np.asarray(faces, dtype=np.int32).reshape(-1, 3),
+        )
+
+    def to_tuples(self) -> Tuple[List[Vec3], List[Tuple[int, int, int]]]:
+        if np is not None and isinstance(self.faces, np.ndarray):
+            return (
+                [tuple(v) for v in np.asarray(self.vertices, dtype=np.float64).tolist()],
+                [tuple(f) for f in self.faces.tolist()],
             )
-        if orient_conflicts.get(comp_id, 0) > 0:
-            warnings.warn(
-                f"Component {comp_id}: orientation conflicts detected ({orient_conflicts[comp_id]}).",
-                RuntimeWarning,
+        return list(self.vertices), list(self.faces)
+
+    def __len__(self) -> int:
+        return len(self.faces)
+
+    def set_components(self, components: List[List[int]]) -> None:
+        if np is not None and isinstance(self.faces, np.ndarray):
+            ids = np.empty(len(self.faces), dtype=np.int32)
+        else:
+            ids = [0] * len(self.faces)
+        for cid, comp_faces in enumerate(components):
+            if isinstance(ids, list):
+                for fi in comp_faces:
+                    ids[fi] = cid
+            else:
+                ids[comp_faces] = cid
+        self.component_ids = ids
+
+
+def _empty_report(bbox: Optional[Tuple[Vec3, Vec3]] = None, count: int = 0) -> MeshReport:
+    return MeshReport(bbox=bbox, component_volumes=[], triangle_count=count)
+
+
+# Bump when MeshReport fields or their meaning change so stale disk entries are ignored.
+_REPORT_VERSION = 7
+_REPORT_CACHE_DIR = os.path.join(tempfile.gettempdir(), "mesh_benchmark_cache", "mesh_reports")
+_report_cache: Dict[str, MeshReport] = {}
+
+
+def analyze(
+    path: str,
+    *,
+    tolerance: Optional[float] = None,
+    mode: str = "robust",
+    profiler: Optional["StageProfiler"] = None,
+) -> MeshReport:
+    """Measure a mesh file, memoized on its content hash in memory and on disk.
+
+    Passing a profiler skips the cache lookup so the stages actually run.
+    """
+    if not os.path.exists(path):
+        return _empty_report()
+    key = _report_key(path, tolerance, mode)
+    report = None if profiler is not None else _report_cache.get(key)
+    if report is not None:
+        return report
+    cache_path = os.path.join(_REPORT_CACHE_DIR, key + ".json")
+    try:
+        if profiler is not None:
+            raise OSError("profiling requested")
+        with open(cache_path, "r", encoding="utf-8") as f:
+            report = MeshReport.from_dict(json.load(f))
+    except (OSError, ValueError, KeyError, TypeError):
+        report = _measure(path, tolerance, mode, profiler)
+        try:
+            os.makedirs(_REPORT_CACHE_DIR, exist_ok=True)
+            tmp = f"{cache_path}.{os.getpid()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(report.to_dict(), f)
+            os.replace(tmp, cache_path)
+        except OSError as e:
+            warnings.warn(f"Failed to save mesh report cache: {e}", RuntimeWarning)
+    _report_cache[key] = report
+    return report
+
+
+def _report_key(path: str, tolerance: Optional[float], mode: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    ext = os.path.splitext(path)[1].lower()
+    h.update(f"|v{_REPORT_VERSION}|{ext}|{tolerance!r}|{mode}".encode())
+    return h.hexdigest()
+
+
+def calculate_stl_volume(
+    path: str,
+    *,
+    tolerance: Optional[float] = None,
+    mode: str = "robust",
+    profiler: Optional["StageProfiler"] = None,
+) -> float:
+    return _measure(path, tolerance, mode, profiler).volume
+
+
+def calculate_volumes(
+    paths: Iterable[str],
+    workers: Optional[int] = None,
+    *,
+    tolerance: Optional[float] = None,
+    mode: str = "robust",
+) -> List[float]:
+    """Volumes of several meshes computed in parallel, in input order."""
+    return _map_paths(partial(calculate_stl_volume, tolerance=tolerance, mode=mode), paths, workers)
+
+
+def analyze_many(
+    paths: Iterable[str],
+    workers: Optional[int] = None,
+    *,
+    tolerance: Optional[float] = None,
+    mode: str = "robust",
+) -> List[MeshReport]:
+    """analyze() over several meshes in parallel, in input order."""
+    return _map_paths(partial(analyze, tolerance=tolerance, mode=mode), paths, workers)
+
+
+def submit_analyze(
+    path: str,
+    *,
+    tolerance: Optional[float] = None,
+    mode: str = "robust",
+) -> Future:
+    """Start analyze() on the shared process pool; the future yields its MeshReport."""
+    pool = _get_pool(None)
+    try:
+        future = pool.submit(analyze, path, tolerance=tolerance, mode=mode)
+    except BrokenProcessPool:
+        _discard_pool(pool)
+        future = _get_pool(None).submit(analyze, path, tolerance=tolerance, mode=mode)
+    future.add_done_callback(
+        lambda f: _discard_pool(pool)
+        if not f.cancelled() and isinstance(f.exception(), BrokenProcessPool) else None
+    )
+    return future
+
+
+# One process pool shared by every batch call in this interpreter. It is
+# created on first use, sized by that call's workers (default: CPU count),
+# and replaced when a later call asks for a different size; workers=None
+# takes whatever pool exists.
+# Workers are started by forkserver (spawn where that is unavailable), never
+# forked from a caller that may be running other threads.
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+_POOL_START_METHOD = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+
+
+def _map_paths(fn, paths: Iterable[str], workers: Optional[int]) -> list:
+    paths = list(paths)
+    if workers == 1 or len(paths) <= 1:
+        return [fn(p) for p in paths]
+    pool = _get_pool(workers)
+    try:
+        return list(pool.map(fn, paths))
+    except BrokenProcessPool:
+        _discard_pool(pool)
+        raise
+
+
+def _get_pool(workers: Optional[int]) -> ProcessPoolExecutor:
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is not None and workers and workers != _pool_workers:
+            # Work already submitted to the old pool still runs to completion.
+            _pool.shutdown(wait=False)
+            _pool = None
+        if _pool is None:
+            _pool_workers = workers or os.cpu_count() or 1
+            _pool = ProcessPoolExecutor(
+                max_workers=_pool_workers,
+                mp_context=multiprocessing.get_context(_POOL_START_METHOD),
             )
-        vol_abs = abs(_component_volume(comp_faces, flips, faces, verts))
-        bbox = _component_bbox(comp_faces, faces, verts)
-        tris_comp = _component_triangles(comp_faces, faces, verts)
-        comps.append(
-            {
-                "id": comp_id,
-                "faces": comp_faces,
-                "volume": vol_abs,
-                "bbox": bbox,
-                "tris": tris_comp,
-                "closed": boundary_edges == 0,
-            }
+        return _pool
+
+
+def _discard_pool(pool: ProcessPoolExecutor) -> None:
+    # A worker died (e.g. killed for memory); drop the pool so the next batch
+    # starts a fresh one instead of failing forever.
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False)
+
+
+def _measure(
+    path: str, tolerance: Optional[float], mode: str, profiler: Optional["StageProfiler"] = None
+) -> MeshReport:
+    if mode not in ("robust", "streaming", "voxel"):
+        raise ValueError(f"Unknown volume mode: {mode!r}")
+    if not os.path.exists(path): return _empty_report()
+    prof = profiler if profiler is not None else _NULL_PROFILER
+
+    if mode == "streaming":
+        with prof.stage("stream") as rec:
+            report = _streaming_report(path)
+            rec["triangles"] = report.triangle_count if report is not None else 0
+            rec["closed"] = report is not None
+        if report is not None:
+            return report
+
+    if mode == "voxel" and np is not None:
+        with prof.stage("voxel") as rec:
+            tris = _load_triangles(path)
+            vol, err = _voxel_estimate(tris, _VOXEL_RESOLUTION)
+            rec["triangles"] = len(tris)
+        if len(tris) == 0:
+            return _empty_report()
+        return MeshReport(
+            volume=vol,
+            bbox=_bounds(tris),
+            component_volumes=None,
+            triangle_count=len(tris),
+            volume_error=err,
+            volume_source="voxel",
         )
+
+    # Indexed formats carry their own connectivity, so they skip the
+    # tolerance weld unless the caller explicitly asks for one.
+    with prof.stage("load") as rec:
+        mesh = _load_indexed_mesh(path) if tolerance is None else None
+        if mesh is None:
+            tris = _load_triangles(path)
+            rec["triangles"] = len(tris)
+        else:
+            rec["vertices"] = len(mesh.vertices)
+            rec["triangles"] = len(mesh.faces)
+    if mesh is not None:
+        count = len(mesh)
+        if count == 0:
+            return _empty_report()
+        min_v, max_v = _bounds(mesh)
+        diag = _diagonal(min_v, max_v)
+        if diag == 0.0:
+            return _empty_report((min_v, max_v), count)
+    else:
+        count = len(tris)
+        if len(tris) == 0:
+            return _empty_report()
+        min_v, max_v = _bounds(tris)
+        diag = _diagonal(min_v, max_v)
+        if diag == 0.0:
+            return _empty_report((min_v, max_v), count)
+        if tolerance is None:
+            tol = max(diag * 1e-9, 1e-12)
+        else:
+            tol = max(float(tolerance), 0.0)
+        with prof.stage("filter_degenerate") as rec:
+            tris = _filter_degenerate(tris, diag)
+            rec["triangles"] = len(tris)
+        if len(tris) == 0:
+            return _empty_report((min_v, max_v), count)
+        with prof.stage("weld") as rec:
+            mesh = _dedup_vertices(tris, tol)
+            rec["vertices"] = len(mesh.vertices)
+            rec["faces"] = len(mesh.faces)
+        del tris
+        if len(mesh) == 0:
+            return _empty_report((min_v, max_v), count)
+    with prof.stage("orient") as rec:
+        (
+            components,
+            flips,
+            boundary_edge_counts,
+            nonmanifold_edge_counts,
+            orient_conflicts,
+        ) = _orient_faces_and_components(mesh.faces, len(mesh.vertices))
+        mesh.set_components(components)
+        rec["components"] = len(components)
     eps = max(diag * 1e-9, 1e-12)
+    comps = []
+    with prof.stage("components") as rec:
+        for comp_id, comp_faces in enumerate(components):
+            boundary_edges = int(boundary_edge_counts[comp_id])
+            nonmf = int(nonmanifold_edge_counts[comp_id])
+            conflicts = int(orient_conflicts[comp_id])
+            if boundary_edges > 0:
+                warnings.warn(
+                    f"Component {comp_id}: mesh is not watertight; result is a best-effort estimate.",
+                    RuntimeWarning,
+                )
+            if nonmf > 0:
+                warnings.warn(
+                    f"Component {comp_id}: non-manifold edges detected ({nonmf}); result may be unreliable.",
+                    RuntimeWarning,
+                )
+            if conflicts > 0:
+                warnings.warn(
+                    f"Component {comp_id}: orientation conflicts detected ({conflicts}).",
+                    RuntimeWarning,
+                )
+            vol_abs = abs(_component_volume(mesh, comp_faces, flips))
+            bbox = _component_bbox(mesh, comp_faces)
+            tris_comp = _component_triangles(mesh, comp_faces)
+            if np is not None:
+                tris_comp = _TriangleBvh(tris_comp, eps)
+            comps.append(
+                {
+                    "id": comp_id,
+                    "faces": comp_faces,
+                    "volume": vol_abs,
+                    "bbox": bbox,
+                    "tris": tris_comp,
+                    "closed": boundary_edges == 0,
+                }
+            )
+        rec["components"] = len(comps)
+    with prof.stage("nesting") as rec:
+        parents, order = _containment_forest(comps, eps)
+        rec["nested"] = sum(1 for cid in order if parents[cid] is not None)
     depths: Dict[int, int] = {c["id"]: 0 for c in comps}
-    interior_points: Dict[int, Optional[Vec3]] = {}
-    for c in comps:
-        interior_points[c["id"]] = _choose_interior_point(c["tris"], c["bbox"], eps)
-    for i in comps:
-        pi = interior_points.get(i["id"]) if i["closed"] else None
-        if pi is None:
-            continue
-        cnt = 0
-        for j in comps:
-            if j["id"] == i["id"]:
-                continue
-            if not j["closed"]:
-                continue
-            if not _bbox_contains(j["bbox"], i["bbox"], eps * 10.0):
-                continue
-            if _point_in_mesh(pi, j["tris"], eps):
-                cnt += 1
-        depths[i["id"]] = cnt
+    for cid in order:
+        if parents[cid] is not None:
+            depths[cid] = depths[parents[cid]] + 1
     total_volume = 0.0
+    component_volumes: List[float] = []
     for c in comps:
         depth = depths.get(c["id"], 0)
         sign = -1.0 if (depth % 2 == 1) else 1.0
+        component_volumes.append(float(sign * c["volume"]))
         total_volume += sign * c["volume"]
     if total_volume < 0:
         total_volume = -total_volume
-    return float(total_volume)
+        component_volumes = [-v for v in component_volumes]
+    vox = vox_err = None
+    if np is not None and (sum(nonmanifold_edge_counts) or sum(orient_conflicts)):
+        # The shell volumes above assume clean manifolds; cross-check them
+        # against the connectivity-free voxel estimate. The coarse estimate
+        # is only reported alongside, never substituted, so it cannot move
+        # a score on its own.
+        with prof.stage("voxel_check") as rec:
+            vox, vox_err = _voxel_estimate(_component_triangles(mesh), _VOXEL_RESOLUTION)
+            rec["disagrees"] = abs(vox - total_volume) > vox_err
+        if rec["disagrees"]:
+            warnings.warn(
+                f"Exact volume {total_volume:.6g} disagrees with voxel estimate "
+                f"{vox:.6g} +/- {vox_err:.2g} on non-manifold input.",
+                RuntimeWarning,
+            )
+    return MeshReport(
+        volume=float(total_volume),
+        surface_area=_surface_area(mesh),
+        bbox=(min_v, max_v),
+        component_volumes=component_volumes,
+        triangle_count=count,
+        boundary_edges=int(sum(boundary_edge_counts)),
+        nonmanifold_edges=int(sum(nonmanifold_edge_counts)),
+        orientation_conflicts=int(sum(orient_conflicts)),
+        voxel_volume=vox,
+        voxel_error=vox_err,
+    )
+
+
+def load_triangles(path: str) -> "np.ndarray":
+    """Triangle soup (n, 3, 3) of an STL, OFF, 3MF or AMF file.
+
+    Binary STL keeps its float32 coordinates; other formats are float64.
+    """
+    if np is None:
+        raise RuntimeError("load_triangles requires NumPy.")
+    return np.asarray(_load_triangles(path))
+
+
+_VOXEL_RESOLUTION = 256
+# Hard caps that bound the estimator's memory and time on any input. The
+# grid never exceeds _VOXEL_MAX_CELLS cells. The step is coarsened when the
+# triangles' xy footprints would cover more than _VOXEL_MAX_PAIRS (triangle,
+# column) pairs in total. Pairs are materialised _VOXEL_PAIR_BATCH at a time,
+# and large triangles are split across batches by rows of columns.
+_VOXEL_MAX_RESOLUTION = 4096
+_VOXEL_MAX_CELLS = 1 << 25
+_VOXEL_MAX_PAIRS = 1 << 23
+_VOXEL_PAIR_BATCH = 1 << 18
+
+
+def estimate_volume_voxel(path: str, resolution: int = _VOXEL_RESOLUTION) -> Tuple[float, float]:
+    """Approximate (volume, error_bound) from a parity voxelization.
+
+    resolution is the number of cells along the longest bbox axis. The
+    result ignores connectivity entirely, so it stays usable on meshes the
+    exact pipeline flags as non-manifold or inconsistently oriented.
+    """
+    if np is None:
+        raise RuntimeError("Voxel volume estimation requires NumPy.")
+    if not os.path.exists(path):
+        return 0.0, 0.0
+    return _voxel_estimate(_load_triangles(path), resolution)
+
+
+def _voxel_estimate(tris: "np.ndarray", resolution: int) -> Tuple[float, float]:
+    if len(tris) == 0:
+        return 0.0, 0.0
+    chunks = lambda: (tris[s:s + _STREAM_CHUNK_FACETS] for s in range(0, len(tris), _STREAM_CHUNK_FACETS))  # noqa: E731
+    return _voxel_estimate_chunks(chunks, _bounds(tris), resolution)[:2]
+
+
+def _voxel_estimate_chunks(
+    chunks, bounds: Tuple[Vec3, Vec3], resolution: int
+) -> Tuple[float, float, Tuple[int, int]]:
+    # Casts one ray per (x, y) cell column along +z through the cell centres.
+    # Each crossing adds its winding (+1 entering by the facet's orientation,
+    # -1 leaving) to every cell centre above it. The parity of the running
+    # sum down the column gives the solid, which ignores orientation
+    # entirely; the sum itself is the winding number, whose (min, max) over
+    # all cells is returned after the volume and its error bound. An interval between two
+    # centres holding a single crossing is then counted from the crossing's
+    # height rather than from the cell face, so each column is exact along z
+    # and only the xy sampling is left to bound (see the end), plus one cell
+    # per interval holding several crossings (a wall thinner than a cell),
+    # whose coverage is unknown. The bound assumes features are at least a
+    # cell wide; anything thinner can fall between the ray centres unseen.
+    # chunks() yields the triangle soup in pieces and is called once per
+    # pass, so a file can be streamed.
+    lo, hi = bounds
+    size = max(hi[i] - lo[i] for i in range(3))
+    if size <= 0.0:
+        return 0.0, 0.0, (0, 0)
+    x0, y0, z0 = lo
+    h = size / min(max(int(resolution), 1), _VOXEL_MAX_RESOLUTION)
+    nx, ny, nz = _voxel_grid(lo, hi, h)
+    while nx * ny * (nz + 1) > _VOXEL_MAX_CELLS:
+        h *= (nx * ny * (nz + 1) / _VOXEL_MAX_CELLS) ** (1.0 / 3.0) * 1.001
+        nx, ny, nz = _voxel_grid(lo, hi, h)
+    # Pairs scale with 1 / h^2, so a few rounds reach the budget unless the
+    # triangle count alone exceeds it (each covers at most one column then).
+    for _ in range(4):
+        pairs = sum(
+            int((wi * wj).sum())
+            for _, _, wi, _, wj in _iter_column_ranges(chunks(), x0, y0, h, nx, ny)
+        )
+        if pairs <= _VOXEL_MAX_PAIRS or nx * ny == 1:
+            break
+        h *= math.sqrt(pairs / _VOXEL_MAX_PAIRS) * 1.001
+        nx, ny, nz = _voxel_grid(lo, hi, h)
+    # Per crossing interval: the sum of its crossings' windings, their count
+    # (capped at 2) and the sum of their heights above the face of the cell
+    # above them.
+    winding = np.zeros(nx * ny * (nz + 1), dtype=np.int16)
+    hits = np.zeros(nx * ny * (nz + 1), dtype=np.uint8)
+    offset = np.zeros(nx * ny * (nz + 1), dtype=np.float32)
+    for t, i0, wi, j0, wj in _iter_column_ranges(chunks(), x0, y0, h, nx, ny):
+        for piece in _column_batches(i0, wi, j0, wj, _VOXEL_PAIR_BATCH):
+            tri, pi0, pwi, pj0, pwj = piece
+            col, k, z, w = _column_crossings(t[tri], pi0, pwi, pj0, pwj, x0, y0, z0, h, ny, nz)
+            cells, inverse, n = np.unique(col * (nz + 1) + k, return_inverse=True, return_counts=True)
+            winding[cells] += np.bincount(inverse, weights=w).astype(np.int16)
+            hits[cells] = np.minimum(hits[cells] + n, 2)
+            offset[cells] += np.bincount(inverse, weights=z - (z0 + k * h)).astype(np.float32)
+    occ = np.cumsum(winding.reshape(nx, ny, nz + 1)[:, :, :nz], axis=2, dtype=np.int16)
+    del winding
+    winding_range = (int(occ.min()), int(occ.max()))
+    np.bitwise_and(occ, 1, out=occ)
+    column = np.count_nonzero(occ, axis=2).astype(np.float64).ravel()
+    # A lone crossing enters the solid when the cell above it is occupied:
+    # move the column's start down (or up) to it, and likewise for an exit.
+    single = np.flatnonzero(hits == 1)
+    col, k = np.divmod(single, nz + 1)
+    inside = np.zeros(len(single), dtype=bool)
+    below_top = k < nz
+    inside[below_top] = occ.ravel()[col[below_top] * nz + k[below_top]] == 1
+    del occ
+    column += np.bincount(
+        col, weights=np.where(inside, -offset[single], offset[single]) / h, minlength=nx * ny
+    )
+    ambiguous = np.count_nonzero(hits == 2)
+    del hits, offset
+    cell = h ** 3
+    column = column.reshape(nx, ny) * cell
+    # Where a column's neighbours on both sides continue its trend, the
+    # surface between their centres is sampled without bias. Every step in
+    # that trend (a wall, edge or silhouette somewhere between two centres)
+    # can move the solid by up to half a column either way, which is a
+    # quarter of the second difference of column volumes across it.
+    padded = np.pad(column, 1)
+    error = (
+        float(np.abs(padded[2:, 1:-1] - 2.0 * column + padded[:-2, 1:-1]).sum())
+        + float(np.abs(padded[1:-1, 2:] - 2.0 * column + padded[1:-1, :-2]).sum())
+    ) / 4.0
+    return float(column.sum()), error + ambiguous * cell, winding_range
+
+
+def _voxel_grid(lo: Vec3, hi: Vec3, h: float) -> Tuple[int, int, int]:
+    return tuple(max(int(math.ceil((hi[i] - lo[i]) / h)), 1) for i in range(3))
+
+
+def _iter_column_ranges(
+    chunks: Iterable["np.ndarray"], x0: float, y0: float, h: float, nx: int, ny: int
+) -> Iterator[Tuple["np.ndarray", "np.ndarray", "np.ndarray", "np.ndarray", "np.ndarray"]]:
+    # Per chunk, for its triangles with a non-degenerate xy projection: the
+    # float64 triangles, then the first column and column count along x and
+    # along y whose centres fall inside each triangle's xy bounding box.
+    for t in chunks:
+        t = np.asarray(t, dtype=np.float64)
+        t = t[_signed_xy_area(t) != 0.0]
+        x, y = t[:, :, 0], t[:, :, 1]
+        i0 = np.clip(np.ceil((x.min(axis=1) - x0) / h - 0.5), 0, nx).astype(np.int64)
+        i1 = np.clip(np.floor((x.max(axis=1) - x0) / h - 0.5), -1, nx - 1).astype(np.int64)
+        j0 = np.clip(np.ceil((y.min(axis=1) - y0) / h - 0.5), 0, ny).astype(np.int64)
+        j1 = np.clip(np.floor((y.max(axis=1) - y0) / h - 0.5), -1, ny - 1).astype(np.int64)
+        yield t, i0, np.maximum(i1 - i0 + 1, 0), j0, np.maximum(j1 - j0 + 1, 0)
+
+
+def _column_batches(
+    i0: "np.ndarray", wi: "np.ndarray", j0: "np.ndarray", wj: "np.ndarray", budget: int
+) -> Iterator[Tuple["np.ndarray", "np.ndarray", "np.ndarray", "np.ndarray", "np.ndarray"]]:
+    # Splits each triangle's column block into pieces of whole x rows holding
+    # at most budget columns, then groups consecutive pieces into batches by
+    # the running sum of their column counts. A batch starts below budget, so
+    # it never holds more than 2 * budget pairs. Yields (triangle, i0, wi,
+    # j0, wj) arrays per batch.
+    rows = np.maximum(budget // np.maximum(wj, 1), 1)
+    pieces = np.where(wi * wj > 0, -(-wi // rows), 0)
+    tri = np.repeat(np.arange(len(wi)), pieces)
+    if len(tri) == 0:
+        return
+    k = np.arange(len(tri)) - np.repeat(np.cumsum(pieces) - pieces, pieces)
+    first = k * rows[tri]
+    pi0 = i0[tri] + first
+    pwi = np.minimum(rows[tri], wi[tri] - first)
+    pwj = wj[tri]
+    cost = pwi * pwj
+    batch = (np.cumsum(cost) - cost) // budget
+    cuts = np.flatnonzero(np.diff(batch)) + 1
+    for s, e in zip(np.r_[0, cuts], np.r_[cuts, len(tri)]):
+        yield tri[s:e], pi0[s:e], pwi[s:e], j0[tri[s:e]], pwj[s:e]
+
+
+def _signed_xy_area(t: "np.ndarray") -> "np.ndarray":
+    # Twice the signed area of each triangle's xy projection.
+    xy = t[:, :, :2]
+    return (xy[:, 1, 0] - xy[:, 0, 0]) * (xy[:, 2, 1] - xy[:, 0, 1]) - (
+        xy[:, 1, 1] - xy[:, 0, 1]
+    ) * (xy[:, 2, 0] - xy[:, 0, 0])
+
+
+def _column_crossings(
+    t: "np.ndarray",
+    i0: "np.ndarray",
+    wi: "np.ndarray",
+    j0: "np.ndarray",
+    wj: "np.ndarray",
+    x0: float,
+    y0: float,
+    z0: float,
+    h: float,
+    ny: int,
+    nz: int,
+) -> Tuple["np.ndarray", "np.ndarray", "np.ndarray", "np.ndarray"]:
+    # Column index, first cell above the crossing, crossing height and
+    # winding (+1 where the triangle faces down, so the ray enters) for
+    # every (triangle, column centre) pair in the wi x wj block of columns
+    # starting at (i0, j0) where the centre falls inside the triangle's xy
+    # projection.
+    # Centres on a shared edge or vertex are claimed by exactly one triangle:
+    # edge functions are evaluated from a canonical endpoint so neighbours
+    # get exact negations, and ties go to top-left edges.
+    xy = t[:, :, :2]
+    area = _signed_xy_area(t)
+    n = wi * wj
+    tri = np.repeat(np.arange(len(t)), n)
+    if len(tri) == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), np.empty(0), np.empty(0)
+    local = np.arange(len(tri)) - np.repeat(np.cumsum(n) - n, n)
+    ci = i0[tri] + local // wj[tri]
+    cj = j0[tri] + local % wj[tri]
+    del local
+    px = x0 + (ci + 0.5) * h
+    py = y0 + (cj + 0.5) * h
+    ccw = area[tri] > 0.0
+    inside = np.ones(len(tri), dtype=bool)
+    lam = []
+    for a_i, b_i in ((1, 2), (2, 0), (0, 1)):
+        ax, ay = xy[tri, a_i, 0], xy[tri, a_i, 1]
+        bx, by = xy[tri, b_i, 0], xy[tri, b_i, 1]
+        swap = (ax > bx) | ((ax == bx) & (ay > by))
+        ux, uy = np.where(swap, bx, ax), np.where(swap, by, ay)
+        vx, vy = np.where(swap, ax, bx), np.where(swap, ay, by)
+        w = (vx - ux) * (py - uy) - (vy - uy) * (px - ux)
+        w = np.where(swap == ccw, -w, w)
+        # Direction of this edge when walked counter-clockwise.
+        dx = np.where(ccw, bx - ax, ax - bx)
+        dy = np.where(ccw, by - ay, ay - by)
+        top_left = (dy < 0.0) | ((dy == 0.0) & (dx < 0.0))
+        inside &= (w > 0.0) | ((w == 0.0) & top_left)
+        lam.append(w)
+    denom = np.abs(area[tri])
+    z = (lam[0] * t[tri, 0, 2] + lam[1] * t[tri, 1, 2] + lam[2] * t[tri, 2, 2]) / denom
+    z, ci, cj = z[inside], ci[inside], cj[inside]
+    k = np.clip(np.floor((z - z0) / h - 0.5).astype(np.int64) + 1, 0, nz)
+    return ci * ny + cj, k, z, np.where(ccw[inside], -1.0, 1.0)
+
+
+class StageProfiler:
+    """Records wall time, counts and peak traced allocations per pipeline stage.
+
+    Pass one as profiler= to calculate_stl_volume or analyze. Memory is
+    measured with tracemalloc, which is started on the first stage if it is
+    not already running and stopped again by close(); tracing slows
+    allocation-heavy stages, so compare timings with trace_memory=False.
+    """
+
+    def __init__(self, trace_memory: bool = True):
+        self.trace_memory = trace_memory
+        self.stages: List[Dict[str, object]] = []
+        self._started_tracing = False
+
+    @contextlib.contextmanager
+    def stage(self, name: str) -> Iterator[Dict[str, object]]:
+        rec: Dict[str, object] = {"stage": name}
+        if self.trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started_tracing = True
+            base = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        t0 = time.perf_counter()
+        try:
+            yield rec
+        finally:
+            rec["seconds"] = time.perf_counter() - t0
+            if self.trace_memory:
+                rec["peak_bytes"] = max(tracemalloc.get_traced_memory()[1] - base, 0)
+            self.stages.append(rec)
+
+    def close(self) -> None:
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def __enter__(self) -> "StageProfiler":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def to_dict(self) -> List[Dict[str, object]]:
+        return [dict(rec) for rec in self.stages]
+
+    def format(self) -> str:
+        lines = [f"{'stage':<18}{'seconds':>10}{'peak MB':>10}  counts"]
+        for rec in self.stages:
+            counts = " ".join(
+                f"{k}={v}" for k, v in rec.items() if k not in ("stage", "seconds", "peak_bytes")
+            )
+            peak = rec.get("peak_bytes")
+            peak_s = f"{peak / 1e6:10.1f}" if peak is not None else f"{'-':>10}"
+            lines.append(f"{rec['stage']:<18}{rec['seconds']:10.3f}{peak_s}  {counts}")
+        return "\n".join(lines)
+
+
+class _NullProfiler:
+    @contextlib.contextmanager
+    def stage(self, name: str) -> Iterator[Dict[str, object]]:
+        yield {}
+
+
+_NULL_PROFILER = _NullProfiler()
+
+
+_STREAM_CHUNK_FACETS = 1 << 16
+# Grid of the streaming path's orientation cross-check; coarse, since it only
+# has to catch whole shells wound the wrong way.
+_STREAM_CHECK_RESOLUTION = 64
+# Parsed chunks up to this size are kept for the cross-check instead of being
+# read (and, for ASCII, parsed) a second time.
+_STREAM_KEEP_BYTES = 1 << 28
+_U64_MASK = (1 << 64) - 1
+
+
+def _streaming_report(path: str) -> Optional[MeshReport]:
+    # Divergence-theorem sum over facets read a chunk at a time. Only valid
+    # for a closed, consistently wound surface, which is verified on the fly
+    # by a checksum over directed half-edges: every a->b must be cancelled by
+    # a b->a. Pairing alone still passes disjoint shells wound opposite ways,
+    # whose signed volumes cancel, so a coarse voxelization must also find a
+    # winding number of 0 or 1 in every cell: an inverted shell shows up as
+    # -1, overlapping shells as 2. The cross-check reuses the parsed chunks
+    # when they fit in _STREAM_KEEP_BYTES and reads the file again otherwise.
+    # Returns None whenever the robust pipeline is needed instead.
+    if np is None or os.path.splitext(path)[1].lower() in _INDEXED_LOADERS:
+        return None
+    origin = None
+    vol = 0.0
+    area = 0.0
+    mn = np.full(3, np.inf)
+    mx = np.full(3, -np.inf)
+    checksum = 0
+    count = 0
+    kept: Optional[List["np.ndarray"]] = []
+    kept_bytes = 0
+    try:
+        for tris in _iter_stl_chunks(path):
+            if len(tris) == 0:
+                continue
+            if origin is None:
+                origin = tris[0, 0].astype(np.float64)
+            t = tris - origin
+            cr = np.cross(t[:, 1], t[:, 2])
+            vol += float((t[:, 0] * cr).sum()) / 6.0
+            cr = np.cross(t[:, 1] - t[:, 0], t[:, 2] - t[:, 0])
+            area += 0.5 * float(np.sqrt((cr * cr).sum(axis=1)).sum())
+            pts = tris.reshape(-1, 3)
+            np.minimum(mn, pts.min(axis=0), out=mn)
+            np.maximum(mx, pts.max(axis=0), out=mx)
+            checksum = (checksum + _half_edge_checksum(tris)) & _U64_MASK
+            count += len(tris)
+            if kept is not None:
+                kept.append(tris)
+                kept_bytes += tris.nbytes
+                if kept_bytes > _STREAM_KEEP_BYTES:
+                    kept = None
+    except ValueError:
+        return None
+    if count == 0 or checksum != 0:
+        return None
+    bbox = (tuple(float(x) for x in mn), tuple(float(x) for x in mx))
+    chunks = (lambda: iter(kept)) if kept is not None else (lambda: _iter_stl_chunks(path))  # noqa: E731
+    try:
+        _, _, winding = _voxel_estimate_chunks(chunks, bbox, _STREAM_CHECK_RESOLUTION)
+    except ValueError:
+        return None
+    if winding[0] < 0 or winding[1] > 1:
+        return None
+    return MeshReport(
+        volume=abs(vol),
+        surface_area=area,
+        bbox=bbox,
+        component_volumes=None,
+        triangle_count=count,
+    )
+
+
+def _half_edge_checksum(tris: "np.ndarray") -> int:
+    # Vertices are identified by their exact coordinate bits, which is what
+    # OpenSCAD writes for shared corners; no welding tolerance is applied.
+    bits = (tris.astype(np.float64) + 0.0).view(np.uint64)
+    h = _mix64(bits[..., 0] ^ _mix64(bits[..., 1] ^ _mix64(bits[..., 2])))
+    total = 0
+    for i, j in ((0, 1), (1, 2), (2, 0)):
+        a, b = h[:, i], h[:, j]
+        total += int((_mix64(a ^ _mix64(b)) - _mix64(b ^ _mix64(a))).sum(dtype=np.uint64))
+    return total & _U64_MASK
+
+
+def _mix64(x: "np.ndarray") -> "np.ndarray":
+    # splitmix64 finaliser; uint64 array arithmetic wraps modulo 2**64.
+    x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+
+def _surface_area(mesh: Mesh) -> float:
+    verts, faces = mesh.vertices, mesh.faces
+    if np is not None and isinstance(faces, np.ndarray):
+        t = verts[faces].astype(np.float64)
+        cr = np.cross(t[:, 1] - t[:, 0], t[:, 2] - t[:, 0])
+        return 0.5 * float(np.sqrt((cr * cr).sum(axis=1)).sum())
+    area = 0.0
+    for ia, ib, ic in faces:
+        a, b, c = verts[ia], verts[ib], verts[ic]
+        ab = (b[0] - a[0], b[1] - a[1], b[2] - a[2])
+        ac = (c[0] - a[0], c[1] - a[1], c[2] - a[2])
+        cx = ab[1] * ac[2] - ab[2] * ac[1]
+        cy = ab[2] * ac[0] - ab[0] * ac[2]
+        cz = ab[0] * ac[1] - ab[1] * ac[0]
+        area += 0.5 * math.sqrt(cx * cx + cy * cy + cz * cz)
+    return area
+
+
+def _diagonal(min_v: Vec3, max_v: Vec3) -> float:
+    return math.sqrt(
+        (max_v[0] - min_v[0]) ** 2 + (max_v[1] - min_v[1]) ** 2 + (max_v[2] - min_v[2]) ** 2
+    )
 
 
 def _bounds(tris: List[Tri]) -> Tuple[Vec3, Vec3]:
+    # Accepts a triangle soup or a Mesh (whose vertices are all referenced).
+    if isinstance(tris, Mesh):
+        if np is not None and isinstance(tris.vertices, np.ndarray):
+            tris = tris.vertices
+        else:
+            xs, ys, zs = zip(*tris.vertices)
+            return (min(xs), min(ys), min(zs)), (max(xs), max(ys), max(zs))
+    if np is not None and isinstance(tris, np.ndarray):
+        pts = tris.reshape(-1, 3)
+        mn = pts.min(axis=0)
+        mx = pts.max(axis=0)
+        return (float(mn[0]), float(mn[1]), float(mn[2])), (float(mx[0]), float(mx[1]), float(mx[2]))
     min_x = min_y = min_z = float("inf")
     max_x = max_y = max_z = float("-inf")
     for a, b, c in tris:
@@ -125,7 +961,23 @@ def _bounds(tris: List[Tri]) -> Tuple[Vec3, Vec3]:
 
 
 def _filter_degenerate(tris: List[Tri], diag: float) -> List[Tri]:
-    thr = (1e-12 * diag * diag) if diag > 0 else 1e-24
+    # area2 is |cross|^2 (length^4): compare it against a squared area so
+    # fine but valid slivers on dense meshes are not discarded.
+    thr = (1e-12 * diag * diag) ** 2 if diag > 0 else 1e-48
+    if np is not None and isinstance(tris, np.ndarray):
+        area2 = np.empty(len(tris))
+        for start in range(0, len(tris), _STREAM_CHUNK_FACETS):
+            t = tris[start:start + _STREAM_CHUNK_FACETS].astype(np.float64)
+            cr = np.cross(t[:, 1] - t[:, 0], t[:, 2] - t[:, 0])
+            area2[start:start + len(t)] = (cr * cr).sum(axis=1)
+        keep = ~(area2 <= thr)
+        dropped = len(tris) - int(keep.sum())
+        if dropped:
+            warnings.warn(
+                f"Dropped {dropped} degenerate triangles during parsing.", RuntimeWarning
+            )
+            tris = tris[keep]
+        return tris
     out: List[Tri] = []
     dropped = 0
     for a, b, c in tris:
@@ -151,7 +1003,9 @@ def _quantize(v: Vec3, tol: float) -> Tuple[int, int, int]:
     return (int(round(v[0] * inv)), int(round(v[1] * inv)), int(round(v[2] * inv)))
 
 
-def _dedup_vertices(tris: List[Tri], tol: float) -> Tuple[List[Vec3], List[Tuple[int, int, int]]]:
+def _dedup_vertices(tris: List[Tri], tol: float) -> Mesh:
+    if np is not None and isinstance(tris, np.ndarray):
+        return _dedup_vertices_array(tris, tol)
     index: Dict[Tuple[int, int, int], int] = {}
     verts: List[Vec3] = []
     faces: List[Tuple[int, int, int]] = []
@@ -177,7 +1031,30 @@ def _dedup_vertices(tris: List[Tri], tol: float) -> Tuple[List[Vec3], List[Tuple
         if ia == ib or ib == ic or ic == ia:
             continue
         faces.append((ia, ib, ic))
-    return verts, faces
+    return Mesh(verts, faces)
+
+
+def _dedup_vertices_array(tris: "np.ndarray", tol: float) -> Mesh:
+    pts = tris.reshape(-1, 3)
+    inv = 1.0 / tol if tol > 0 else 1e12
+    q = np.round(np.multiply(pts, inv, dtype=np.float64)).astype(np.int64)
+    order = np.lexsort((q[:, 2], q[:, 1], q[:, 0]))
+    qs = q[order]
+    starts = np.empty(len(qs), dtype=bool)
+    starts[0] = True
+    np.any(qs[1:] != qs[:-1], axis=1, out=starts[1:])
+    # lexsort is stable, so each run starts at the corner seen first. Number
+    # the welded vertices in first-seen order, exactly like the dict path.
+    first = order[starts]
+    by_first = np.argsort(first, kind="stable")
+    rank = np.empty(len(first), dtype=np.int64)
+    rank[by_first] = np.arange(len(first))
+    inverse = np.empty(len(pts), dtype=np.int64)
+    inverse[order] = rank[np.cumsum(starts) - 1]
+    verts = pts[first[by_first]]
+    faces = inverse.reshape(-1, 3).astype(np.int32)
+    keep = (faces[:, 0] != faces[:, 1]) & (faces[:, 1] != faces[:, 2]) & (faces[:, 2] != faces[:, 0])
+    return Mesh(verts, faces[keep])
 
 
 def _edges_of_face(face: Tuple[int, int, int]) -> List[Tuple[Tuple[int, int], int]]:
@@ -193,13 +1070,9 @@ def _edges_of_face(face: Tuple[int, int, int]) -> List[Tuple[Tuple[int, int], in
 
 def _orient_faces_and_components(
     faces: List[Tuple[int, int, int]], nverts: int
-) -> Tuple[
-    Dict[int, List[int]],
-    List[bool],
-    Dict[int, Dict[Tuple[int, int], int]],
-    Dict[int, int],
-    Dict[int, int],
-]:
+) -> Tuple[List[List[int]], List[bool], List[int], List[int], List[int]]:
+    if np is not None and isinstance(faces, np.ndarray):
+        return _orient_faces_and_components_array(faces, nverts)
     edge_to_faces: Dict[Tuple[int, int], List[Tuple[int, int]]] = {}
     for fi, f in enumerate(faces):
         for e, d in _edges_of_face(f):
@@ -246,17 +1119,120 @@ def _orient_faces_and_components(
                         orient_conflicts[comp_id] += 1
         comp_id += 1
     return (
-        components,
+        [components[i] for i in range(comp_id)],
         flips,
-        edge_counts_per_comp,
-        nonmanifold_edge_counts_per_comp,
-        orient_conflicts,
+        [sum(1 for n in edge_counts_per_comp[i].values() if n == 1) for i in range(comp_id)],
+        [nonmanifold_edge_counts_per_comp[i] for i in range(comp_id)],
+        [orient_conflicts[i] for i in range(comp_id)],
     )
 
 
-def _component_volume(
-    comp_faces: List[int], flips: List[bool], faces: List[Tuple[int, int, int]], verts: List[Vec3]
-) -> float:
+def _orient_faces_and_components_array(
+    faces: "np.ndarray", nverts: int
+) -> Tuple[List["np.ndarray"], "np.ndarray", "np.ndarray", "np.ndarray", "np.ndarray"]:
+    nf = len(faces)
+    # Half-edges (a,b), (b,c), (c,a) of every face, keyed by the packed
+    # undirected edge (min * nverts + max) and sorted so equal edges are runs.
+    u = faces.reshape(-1).astype(np.int64)
+    v = faces[:, [1, 2, 0]].reshape(-1).astype(np.int64)
+    keys = np.minimum(u, v) * nverts + np.maximum(u, v)
+    order = np.argsort(keys, kind="stable")
+    ks = keys[order]
+    starts = np.flatnonzero(np.concatenate(([True], ks[1:] != ks[:-1])))
+    mult = np.diff(np.append(starts, len(ks)))
+    he_face = order // 3
+    he_fwd = (u <= v)[order]
+    he_mult = np.repeat(mult, mult)
+
+    # Link the faces sharing each edge. Manifold edges give one pair; on
+    # non-manifold fans the faces are chained, alternating between the two
+    # traversal directions, so the links stay linear in the fan size and a
+    # consistently wound input never produces a spurious flip.
+    edge_id = np.repeat(np.arange(len(starts)), mult)
+    fwd_incl = np.cumsum(he_fwd)
+    fwd_incl -= np.repeat(fwd_incl[starts] - he_fwd[starts], mult)
+    n_fwd = np.repeat(fwd_incl[starts + mult - 1], mult)
+    n_pair = np.minimum(n_fwd, he_mult - n_fwd)
+    k = np.where(he_fwd, fwd_incl - 1, np.arange(len(ks)) - np.repeat(starts, mult) - fwd_incl)
+    slot = np.where(k < n_pair, 2 * k + ~he_fwd, n_pair + k)
+    chain = np.lexsort((slot, edge_id))
+    c_face = he_face[chain]
+    c_fwd = he_fwd[chain]
+    linked = edge_id[1:] == edge_id[:-1]
+    link_a = c_face[:-1][linked]
+    link_b = c_face[1:][linked]
+    link_toggle = (c_fwd[:-1] == c_fwd[1:])[linked]
+
+    labels = _label_components(nf, link_a, link_b)
+    roots, comp_of_face = np.unique(labels, return_inverse=True)
+    ncomp = len(roots)
+
+    # CSR adjacency over the links, walked breadth-first from the lowest face
+    # of every component at once to assign flips.
+    src = np.concatenate((link_a, link_b))
+    dst = np.concatenate((link_b, link_a))
+    toggle = np.concatenate((link_toggle, link_toggle))
+    by_src = np.argsort(src, kind="stable")
+    dst = dst[by_src]
+    toggle = toggle[by_src]
+    indptr = np.zeros(nf + 1, dtype=np.int64)
+    np.cumsum(np.bincount(src, minlength=nf), out=indptr[1:])
+    flips = np.zeros(nf, dtype=bool)
+    seen = np.zeros(nf, dtype=bool)
+    frontier = roots
+    seen[frontier] = True
+    while len(frontier):
+        cnt = indptr[frontier + 1] - indptr[frontier]
+        total = int(cnt.sum())
+        if total == 0:
+            break
+        idx = np.arange(total) + np.repeat(indptr[frontier] - (np.cumsum(cnt) - cnt), cnt)
+        nb = dst[idx]
+        expected = flips[np.repeat(frontier, cnt)] ^ toggle[idx]
+        fresh = ~seen[nb]
+        frontier, first = np.unique(nb[fresh], return_index=True)
+        flips[frontier] = expected[fresh][first]
+        seen[frontier] = True
+
+    comp_of_he = comp_of_face[he_face]
+    boundary = np.bincount(comp_of_he[he_mult == 1], minlength=ncomp)
+    nonmanifold = np.bincount(comp_of_he[he_mult > 2], minlength=ncomp)
+    conflicts = np.bincount(
+        comp_of_face[link_a][(flips[link_a] ^ flips[link_b]) != link_toggle], minlength=ncomp
+    )
+    face_order = np.argsort(comp_of_face, kind="stable")
+    components = np.split(face_order, np.cumsum(np.bincount(comp_of_face, minlength=ncomp))[:-1])
+    return components, flips, boundary, nonmanifold, conflicts
+
+
+def _label_components(n: int, a: "np.ndarray", b: "np.ndarray") -> "np.ndarray":
+    # Union-find by hooking roots onto the smaller root and pointer jumping,
+    # so every face ends up labelled with the lowest face of its component.
+    parent = np.arange(n)
+    while True:
+        pa = parent[a]
+        pb = parent[b]
+        diff = pa != pb
+        if not diff.any():
+            return parent
+        np.minimum.at(parent, np.maximum(pa[diff], pb[diff]), np.minimum(pa[diff], pb[diff]))
+        while True:
+            nxt = parent[parent]
+            if np.array_equal(nxt, parent):
+                break
+            parent = nxt
+
+
+def _component_volume(mesh: Mesh, comp_faces: List[int], flips: List[bool]) -> float:
+    verts, faces = mesh.vertices, mesh.faces
+    if np is not None and isinstance(faces, np.ndarray):
+        tri_idx = faces[comp_faces]
+        (mn, mx) = _component_bbox(mesh, comp_faces)
+        center = 0.5 * (np.array(mn) + np.array(mx))
+        flipped = flips[comp_faces]
+        tri_idx[flipped] = tri_idx[flipped][:, [0, 2, 1]]
+        t = verts[tri_idx] - center
+        return float((t[:, 0] * np.cross(t[:, 1], t[:, 2])).sum() / 6.0)
     min_x = min_y = min_z = float("inf")
     max_x = max_y = max_z = float("-inf")
     for fi in comp_faces:
@@ -293,9 +1269,10 @@ def _component_volume(
     return vol
 
 
-def _component_bbox(
-    comp_faces: List[int], faces: List[Tuple[int, int, int]], verts: List[Vec3]
-) -> Tuple[Vec3, Vec3]:
+def _component_bbox(mesh: Mesh, comp_faces: List[int]) -> Tuple[Vec3, Vec3]:
+    verts, faces = mesh.vertices, mesh.faces
+    if np is not None and isinstance(faces, np.ndarray):
+        return _bounds(verts[faces[comp_faces]])
     min_x = min_y = min_z = float("inf")
     max_x = max_y = max_z = float("-inf")
     for fi in comp_faces:
@@ -317,9 +1294,16 @@ def _component_bbox(
     return (min_x, min_y, min_z), (max_x, max_y, max_z)
 
 
-def _component_triangles(
-    comp_faces: List[int], faces: List[Tuple[int, int, int]], verts: List[Vec3]
-) -> List[Tri]:
+def _component_triangles(mesh: Mesh, comp_faces: Optional[List[int]] = None) -> List[Tri]:
+    # All faces when comp_faces is None. The array form is always float64 so
+    # ray casts against float32 meshes keep full precision.
+    verts, faces = mesh.vertices, mesh.faces
+    if comp_faces is None:
+        comp_faces = range(len(faces))
+    if np is not None and isinstance(faces, np.ndarray):
+        if isinstance(comp_faces, range):
+            return verts[faces].astype(np.float64)
+        return verts[faces[comp_faces]].astype(np.float64)
     out: List[Tri] = []
     for fi in comp_faces:
         ia, ib, ic = faces[fi]
@@ -337,6 +1321,65 @@ def _bbox_contains(a: Tuple[Vec3, Vec3], b: Tuple[Vec3, Vec3], margin: float) ->
     )
 
 
+def _containment_forest(
+    comps: List[dict], eps: float
+) -> Tuple[Dict[int, Optional[int]], List[int]]:
+    # Closed components ordered from largest to smallest volume; a parent
+    # always comes before its children, so depths follow by walking this order.
+    closed = sorted((c for c in comps if c["closed"]), key=lambda c: (-c["volume"], c["id"]))
+    containers = _bbox_containers([c["bbox"] for c in closed], eps * 10.0)
+    parents: Dict[int, Optional[int]] = {c["id"]: None for c in comps}
+    for r, c in enumerate(closed):
+        candidates = [q for q in containers[r] if q < r]
+        if not candidates:
+            continue
+        p = _choose_interior_point(c["tris"], c["bbox"], eps)
+        if p is None:
+            continue
+        # Innermost (smallest) candidate first: the first shell that really
+        # contains the point is the parent.
+        for q in sorted(candidates, reverse=True):
+            if _point_in_mesh(p, closed[q]["tris"], eps):
+                parents[c["id"]] = closed[q]["id"]
+                break
+    return parents, [c["id"] for c in closed]
+
+
+def _bbox_containers(boxes: List[Tuple[Vec3, Vec3]], margin: float) -> List[List[int]]:
+    # For every box, the other boxes that contain it (see _bbox_contains).
+    # Sweeps along the axis where the boxes overlap least, keeping only the
+    # boxes whose interval still stabs the current position.
+    n = len(boxes)
+    out: List[List[int]] = [[] for _ in range(n)]
+    if n < 2:
+        return out
+    best = None
+    for k in range(3):
+        lo = min(b[0][k] for b in boxes)
+        hi = max(b[1][k] for b in boxes)
+        span = hi - lo
+        density = sum(b[1][k] - b[0][k] for b in boxes) / span if span > 0 else float("inf")
+        if best is None or density < best[0]:
+            best = (density, k)
+    axis = best[1]
+    queries = sorted(range(n), key=lambda i: boxes[i][0][axis])
+    starts = sorted(range(n), key=lambda j: boxes[j][0][axis] - margin)
+    heap: List[Tuple[float, int]] = []
+    active = set()
+    si = 0
+    for i in queries:
+        lo_i = boxes[i][0][axis]
+        while si < n and boxes[starts[si]][0][axis] - margin <= lo_i:
+            j = starts[si]
+            active.add(j)
+            heapq.heappush(heap, (boxes[j][1][axis] + margin, j))
+            si += 1
+        while heap and heap[0][0] < lo_i:
+            active.discard(heapq.heappop(heap)[1])
+        out[i] = [j for j in active if j != i and _bbox_contains(boxes[j], boxes[i], margin)]
+    return out
+
+
 def _choose_interior_point(
     tris: List[Tri], bbox: Tuple[Vec3, Vec3], eps: float
 ) -> Optional[Vec3]:
@@ -352,21 +1395,27 @@ def _choose_interior_point(
     cz = mz0 + 0.5 * dz
     cands: List[Vec3] = []
     cands.append((cx, cy, cz))
-    if tris:
-        sx = sy = sz = 0.0
-        for a, b, c in tris:
-            sx += (a[0] + b[0] + c[0]) / 3.0
-            sy += (a[1] + b[1] + c[1]) / 3.0
-            sz += (a[2] + b[2] + c[2]) / 3.0
-        n = float(len(tris))
-        cands.append((sx / n, sy / n, sz / n))
+    if isinstance(tris, _TriangleBvh):
+        soup = tris.tris[:10].tolist()
+        if len(tris.tris):
+            cands.append(tuple(tris.tris.mean(axis=(0, 1)).tolist()))
+    else:
+        soup = tris
+        if tris:
+            sx = sy = sz = 0.0
+            for a, b, c in tris:
+                sx += (a[0] + b[0] + c[0]) / 3.0
+                sy += (a[1] + b[1] + c[1]) / 3.0
+                sz += (a[2] + b[2] + c[2]) / 3.0
+            n = float(len(tris))
+            cands.append((sx / n, sy / n, sz / n))
     for p in cands:
         if _point_in_mesh(p, tris, eps):
             return p
     step = max(diag * 1e-6, eps * 10.0)
-    limit = min(10, len(tris))
+    limit = min(10, len(soup))
     for k in range(limit):
-        a, b, c = tris[k]
+        a, b, c = soup[k]
         ab = (b[0] - a[0], b[1] - a[1], b[2] - a[2])
         ac = (c[0] - a[0], c[1] - a[1], c[2] - a[2])
         nx = ab[1] * ac[2] - ab[2] * ac[1]
@@ -387,21 +1436,24 @@ def _choose_interior_point(
 
 
 def _point_in_mesh(p: Vec3, tris: List[Tri], eps: float) -> bool:
-    if not tris:
+    if len(tris) == 0:
         return False
     px = p[0] + eps * 0.173
     py = p[1] + eps * 0.349
     pz = p[2] + eps * 0.937
     o = (px, py, pz)
     dirs = ((1.0, 0.0, 0.0), (0.0, 1.0, 0.0), (0.0, 0.0, 1.0))
-    votes = []
-    for d in dirs:
-        cnt = 0
-        for a, b, c in tris:
-            t = _ray_triangle_intersect(o, d, a, b, c, eps)
-            if t is not None and t > eps:
-                cnt += 1
-        votes.append(cnt % 2 == 1)
+    if isinstance(tris, _TriangleBvh):
+        votes = [cnt % 2 == 1 for cnt in tris.count_hits(o, dirs)]
+    else:
+        votes = []
+        for d in dirs:
+            cnt = 0
+            for a, b, c in tris:
+                t = _ray_triangle_intersect(o, d, a, b, c, eps)
+                if t is not None and t > eps:
+                    cnt += 1
+            votes.append(cnt % 2 == 1)
     truthy = sum(1 for v in votes if v)
     return truthy >= 2
 
@@ -436,6 +1488,177 @@ def _ray_triangle_intersect(
     return t
 
 
+def _ray_triangles_intersect(
+    o: Vec3, d: Vec3, a: "np.ndarray", e1: "np.ndarray", e2: "np.ndarray", eps: float
+) -> "np.ndarray":
+    # Batched _ray_triangle_intersect: rays against many triangles given
+    # component-major as corner a and edges e1 = b - a, e2 = c - a, each of
+    # shape (3, n). Passing d as (3, k, 1) casts k rays at once and gives a
+    # (k, n) result. Misses come back as NaN.
+    px = d[1] * e2[2] - d[2] * e2[1]
+    py = d[2] * e2[0] - d[0] * e2[2]
+    pz = d[0] * e2[1] - d[1] * e2[0]
+    det = e1[0] * px + e1[1] * py + e1[2] * pz
+    tx = o[0] - a[0]
+    ty = o[1] - a[1]
+    tz = o[2] - a[2]
+    qx = ty * e1[2] - tz * e1[1]
+    qy = tz * e1[0] - tx * e1[2]
+    qz = tx * e1[1] - ty * e1[0]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        inv_det = 1.0 / det
+        u = (tx * px + ty * py + tz * pz) * inv_det
+        v = (d[0] * qx + d[1] * qy + d[2] * qz) * inv_det
+        t = (e2[0] * qx + e2[1] * qy + e2[2] * qz) * inv_det
+        miss = (-eps < det) & (det < eps)
+        miss |= (u < -eps) | (u > 1.0 + eps)
+        miss |= (v < -eps) | (u + v > 1.0 + eps)
+        miss |= ~(t > eps)
+    t[miss] = np.nan
+    return t
+
+
+class _TriangleBvh:
+    """Bounding volume hierarchy over one component's triangles for ray casts."""
+
+    __slots__ = ("tris", "eps", "a", "e1", "e2", "node_lo", "node_hi", "node_left", "node_start", "node_count")
+
+    LEAF_SIZE = 16
+
+    def __init__(self, tris: "np.ndarray", eps: float):
+        self.tris = tris
+        self.eps = eps
+        self.node_lo = None
+
+    def _build(self) -> None:
+        # Deferred until the first ray cast: most components are never
+        # queried because no other component's bbox can contain them.
+        tris = self.tris
+        eps = self.eps
+        n = len(tris)
+        e1 = tris[:, 1] - tris[:, 0]
+        e2 = tris[:, 2] - tris[:, 0]
+        # Pad every box by the barycentric slack _ray_triangle_intersect allows.
+        pad = eps * (4.0 * (np.linalg.norm(e1, axis=1) + np.linalg.norm(e2, axis=1)) + 1.0)
+        perm = _morton_order(tris.mean(axis=1)) if n > self.LEAF_SIZE else np.arange(n)
+        tri_lo = tris.min(axis=1)[perm] - pad[perm, None]
+        tri_hi = tris.max(axis=1)[perm] + pad[perm, None]
+
+        # Halve the Morton-sorted range until leaves are small. Children are
+        # always appended after their parent, one tree level at a time.
+        left = [-1]
+        start = [0]
+        count = [n]
+        depth = [0]
+        i = 0
+        while i < len(start):
+            c = count[i]
+            if c > self.LEAF_SIZE:
+                half = c // 2
+                left[i] = len(start)
+                left += [-1, -1]
+                start += [start[i], start[i] + half]
+                count += [half, c - half]
+                depth += [depth[i] + 1, depth[i] + 1]
+            i += 1
+        left_arr = np.array(left)
+        depth_arr = np.array(depth)
+        node_lo = np.empty((len(start), 3))
+        node_hi = np.empty((len(start), 3))
+        leaves = np.flatnonzero(left_arr < 0)
+        leaves = leaves[np.argsort(np.array(start)[leaves])]
+        leaf_starts = np.array(start)[leaves]
+        node_lo[leaves] = np.minimum.reduceat(tri_lo, leaf_starts, axis=0)
+        node_hi[leaves] = np.maximum.reduceat(tri_hi, leaf_starts, axis=0)
+        for level in range(int(depth_arr.max()), -1, -1):
+            inner = np.flatnonzero((depth_arr == level) & (left_arr >= 0))
+            kids = left_arr[inner]
+            node_lo[inner] = np.minimum(node_lo[kids], node_lo[kids + 1])
+            node_hi[inner] = np.maximum(node_hi[kids], node_hi[kids + 1])
+
+        self.a = np.ascontiguousarray(tris[perm, 0].T)
+        self.e1 = np.ascontiguousarray(e1[perm].T)
+        self.e2 = np.ascontiguousarray(e2[perm].T)
+        self.node_lo = node_lo.tolist()
+        self.node_hi = node_hi.tolist()
+        self.node_left = left
+        self.node_start = start
+        self.node_count = count
+
+    def __len__(self) -> int:
+        return len(self.tris)
+
+    def count_hits(self, o: Vec3, dirs: Iterable[Vec3]) -> List[int]:
+        # Rays from one origin share the traversal; a leaf is intersected
+        # once for every ray whose path crosses its box.
+        if self.node_lo is None:
+            self._build()
+        dirs = list(dirs)
+        hits = [0] * len(dirs)
+        stack = [0]
+        while stack:
+            node = stack.pop()
+            lo = self.node_lo[node]
+            hi = self.node_hi[node]
+            live = [k for k, d in enumerate(dirs) if _ray_hits_box(o, d, lo, hi)]
+            if not live:
+                continue
+            child = self.node_left[node]
+            if child >= 0:
+                stack.append(child)
+                stack.append(child + 1)
+                continue
+            s = self.node_start[node]
+            e = s + self.node_count[node]
+            d = np.array([dirs[k] for k in live], dtype=np.float64).T[:, :, None]
+            t = _ray_triangles_intersect(o, d, self.a[:, s:e], self.e1[:, s:e], self.e2[:, s:e], self.eps)
+            for k, cnt in zip(live, np.count_nonzero(t > self.eps, axis=1).tolist()):
+                hits[k] += cnt
+        return hits
+
+
+def _morton_order(points: "np.ndarray") -> "np.ndarray":
+    mn = points.min(axis=0)
+    extent = points.max(axis=0) - mn
+    extent[extent <= 0.0] = 1.0
+    q = ((points - mn) / extent * 1023.0).astype(np.uint64)
+    code = np.zeros(len(points), dtype=np.uint64)
+    for bit in range(10):
+        for axis in range(3):
+            code |= ((q[:, axis] >> np.uint64(bit)) & np.uint64(1)) << np.uint64(3 * bit + axis)
+    return np.argsort(code, kind="stable")
+
+
+def _ray_hits_box(o: Vec3, d: Vec3, lo: Vec3, hi: Vec3) -> bool:
+    t0 = 0.0
+    t1 = float("inf")
+    for k in range(3):
+        if d[k] == 0.0:
+            if o[k] < lo[k] or o[k] > hi[k]:
+                return False
+            continue
+        ta = (lo[k] - o[k]) / d[k]
+        tb = (hi[k] - o[k]) / d[k]
+        if ta > tb:
+            ta, tb = tb, ta
+        if ta > t0:
+            t0 = ta
+        if tb < t1:
+            t1 = tb
+        if t0 > t1:
+            return False
+    return True
+
+
+def _load_triangles(path: str):
+    mesh = _load_indexed_mesh(path)
+    if mesh is not None:
+        return _component_triangles(mesh)
+    if np is None:
+        return _load_stl(path)
+    return _load_stl_array(path)
+
+
 def _load_stl(path: str) -> List[Tri]:
     try:
         size = _file_size(path)
@@ -522,6 +1745,155 @@ def _parse_binary_streaming(path: str) -> List[Tri]:
     return tris
 
 
+def _load_stl_array(path: str) -> "np.ndarray":
+    size = _file_size(path)
+    if size is not None and size >= 84:
+        with open(path, "rb") as f:
+            f.read(80)
+            n_bytes = f.read(4)
+        if len(n_bytes) == 4:
+            n = struct.unpack("<I", n_bytes)[0]
+            if 84 + 50 * n == size:
+                return _parse_binary_stl_array(path, n)
+    tris = _parse_ascii_stl_array(path)
+    if tris is not None:
+        return tris
+    try:
+        tris = _parse_ascii_stl(path)
+    except Exception:
+        return _parse_binary_streaming_array(path)
+    return np.asarray(tris, dtype=np.float64).reshape(-1, 3, 3)
+
+
+# Token layout of one well-formed ASCII facet once split on whitespace:
+#   facet normal nx ny nz outer loop (vertex x y z) x3 endloop endfacet
+_ASCII_FACET_TOKENS = 21
+_ASCII_KEYWORD_COLUMNS = (
+    (0, b"facet"), (1, b"normal"), (5, b"outer"), (6, b"loop"),
+    (7, b"vertex"), (11, b"vertex"), (15, b"vertex"), (19, b"endloop"), (20, b"endfacet"),
+)
+_ASCII_NUMBER_COLUMNS = (2, 3, 4, 8, 9, 10, 12, 13, 14, 16, 17, 18)
+_ASCII_CHUNK_BYTES = 1 << 17
+
+
+def _parse_ascii_stl_array(path: str) -> Optional["np.ndarray"]:
+    # Bulk parser for the regular layout OpenSCAD writes. Returns None for
+    # anything irregular so the caller can fall back to the line-by-line parser.
+    try:
+        chunks = list(_iter_ascii_stl_chunks(path))
+    except ValueError:
+        return None
+    if not chunks:
+        return None
+    return np.concatenate(chunks)
+
+
+def _iter_ascii_stl_chunks(path: str) -> Iterator["np.ndarray"]:
+    # The file is split into whitespace tokens a chunk at a time and the
+    # number columns are converted in one go. Raises ValueError as soon as the
+    # layout turns out to be irregular.
+    with open(path, "rb") as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    with mm:
+        if mm[:5].lower() != b"solid":
+            raise ValueError("not an ASCII STL")
+        pos = mm.find(b"\n") + 1
+        end = mm.rfind(b"endfacet")
+        if pos <= 0 or end < 0:
+            raise ValueError("no facets")
+        end += len(b"endfacet")
+        tail = mm[end:].split()
+        if tail and tail[0] != b"endsolid":
+            raise ValueError("trailing data after last facet")
+        while pos < end:
+            stop = end
+            if end - pos > _ASCII_CHUNK_BYTES:
+                stop = mm.rfind(b"endfacet", pos, pos + _ASCII_CHUNK_BYTES)
+                if stop < 0:
+                    raise ValueError("facet larger than a chunk")
+                stop += len(b"endfacet")
+            vals = _parse_ascii_facet_tokens(mm[pos:stop].split())
+            if vals is None:
+                raise ValueError("irregular facet layout")
+            yield _orient_facets(vals[:, :3], vals[:, 3:].reshape(-1, 3, 3))
+            pos = stop
+
+
+def _parse_ascii_facet_tokens(toks: List[bytes]) -> Optional["np.ndarray"]:
+    n, rem = divmod(len(toks), _ASCII_FACET_TOKENS)
+    if rem or n == 0:
+        return None
+    for col, word in _ASCII_KEYWORD_COLUMNS:
+        if toks[col::_ASCII_FACET_TOKENS].count(word) != n:
+            return None
+    vals = np.empty((n, len(_ASCII_NUMBER_COLUMNS)), dtype=np.float64)
+    try:
+        for k, col in enumerate(_ASCII_NUMBER_COLUMNS):
+            vals[:, k] = np.array(toks[col::_ASCII_FACET_TOKENS], dtype=np.float64)
+    except ValueError:
+        return None
+    return vals
+
+
+def _parse_binary_stl_array(path: str, n: int) -> "np.ndarray":
+    if n <= 0:
+        return np.empty((0, 3, 3), dtype=np.float64)
+    facets = np.memmap(path, dtype=_STL_FACET_DTYPE, mode="r", offset=84, shape=(n,))
+    try:
+        return _orient_facets(facets["normal"], facets["verts"])
+    finally:
+        del facets
+
+
+def _parse_binary_streaming_array(path: str) -> "np.ndarray":
+    size = _file_size(path) or 0
+    if size < 84:
+        return np.empty((0, 3, 3), dtype=np.float64)
+    with open(path, "rb") as f:
+        f.read(80)
+        n = struct.unpack("<I", f.read(4))[0]
+    return _parse_binary_stl_array(path, min(n, (size - 84) // 50))
+
+
+def _iter_stl_chunks(path: str) -> Iterator["np.ndarray"]:
+    size = _file_size(path) or 0
+    if size >= 84:
+        with open(path, "rb") as f:
+            f.read(80)
+            n = struct.unpack("<I", f.read(4))[0]
+        if 84 + 50 * n == size:
+            return _iter_binary_stl_chunks(path, n)
+    return _iter_ascii_stl_chunks(path)
+
+
+def _iter_binary_stl_chunks(path: str, n: int) -> Iterator["np.ndarray"]:
+    with open(path, "rb") as f:
+        f.seek(84)
+        while n > 0:
+            k = min(n, _STREAM_CHUNK_FACETS)
+            facets = np.frombuffer(f.read(50 * k), dtype=_STL_FACET_DTYPE)
+            yield _orient_facets(facets["normal"], facets["verts"])
+            n -= k
+
+
+def _orient_facets(normals: "np.ndarray", corners: "np.ndarray") -> "np.ndarray":
+    # Copies the (n, 3, 3) corners into a contiguous array of their own dtype
+    # (float32 for binary STL, half the size of float64) and swaps the last
+    # two corners of every facet whose winding disagrees with its stored
+    # normal, mirroring the per-facet check in _parse_binary_stl. The test
+    # itself runs in float64, a chunk at a time.
+    tris = np.array(corners, order="C")
+    flip = np.empty(len(tris), dtype=bool)
+    for start in range(0, len(tris), _STREAM_CHUNK_FACETS):
+        t = tris[start:start + _STREAM_CHUNK_FACETS].astype(np.float64)
+        cr = np.cross(t[:, 1] - t[:, 0], t[:, 2] - t[:, 0])
+        nrm = np.asarray(normals[start:start + _STREAM_CHUNK_FACETS], dtype=np.float64)
+        flip[start:start + len(t)] = (cr * nrm).sum(axis=1) < 0.0
+    if flip.any():
+        tris[flip] = tris[flip][:, [0, 2, 1]]
+    return tris
+
+
 def _parse_ascii_stl(path: str) -> List[Tri]:
     tris: List[Tri] = []
     with open(path, "r", encoding="utf-8", errors="ignore") as f:
@@ -576,16 +1948,260 @@ def _parse_ascii_stl(path: str) -> List[Tri]:
     return tris
 
 
+def _load_indexed_mesh(path: str) -> Optional[Mesh]:
+    ext = os.path.splitext(path)[1].lower()
+    loader = _INDEXED_LOADERS.get(ext)
+    if loader is None:
+        return None
+    try:
+        return _weld_exact(*loader(path))
+    except (ValueError, IndexError, KeyError, TypeError, zipfile.BadZipFile, ET.ParseError) as e:
+        raise MeshLoadError(f"Malformed {ext[1:].upper()} file: {e}") from e
+
+
+def _weld_exact(verts, faces) -> Mesh:
+    # Merges bit-identical coordinates (so separate objects that share a
+    # vertex still connect) and drops faces that repeat a vertex index. No
+    # tolerance is involved: the file already states the connectivity.
+    if np is not None:
+        v = np.asarray(verts, dtype=np.float64).reshape(-1, 3) + 0.0
+        f = np.asarray(faces, dtype=np.int64).reshape(-1, 3)
+        if len(f) and (f.min() < 0 or f.max() >= len(v)):
+            raise ValueError("Face references a vertex index out of range.")
+        inverse = np.zeros(len(v), dtype=np.int64)
+        if len(v):
+            order = np.lexsort((v[:, 2], v[:, 1], v[:, 0]))
+            vs = v[order]
+            starts = np.empty(len(vs), dtype=bool)
+            starts[0] = True
+            np.any(vs[1:] != vs[:-1], axis=1, out=starts[1:])
+            inverse[order] = np.cumsum(starts) - 1
+            v = vs[starts]
+        f = inverse[f]
+        keep = (f[:, 0] != f[:, 1]) & (f[:, 1] != f[:, 2]) & (f[:, 2] != f[:, 0])
+        dropped = len(f) - int(keep.sum())
+        if dropped:
+            f = f[keep]
+        # Keep only referenced vertices so the bounds describe the surface.
+        used = np.zeros(len(v), dtype=bool)
+        used[f] = True
+        if not used.all():
+            f = (np.cumsum(used) - 1)[f]
+            v = v[used]
+        f = f.astype(np.int32)
+    else:
+        keys = [(x + 0.0, y + 0.0, z + 0.0) for x, y, z in verts]
+        index: Dict[Vec3, int] = {}
+        v = []
+        f = []
+        dropped = 0
+        for face in faces:
+            if min(face) < 0 or max(face) >= len(keys):
+                raise ValueError("Face references a vertex index out of range.")
+            if keys[face[0]] == keys[face[1]] or keys[face[1]] == keys[face[2]] or keys[face[2]] == keys[face[0]]:
+                dropped += 1
+                continue
+            tri = []
+            for k in face:
+                i = index.get(keys[k])
+                if i is None:
+                    i = len(v)
+                    index[keys[k]] = i
+                    v.append(keys[k])
+                tri.append(i)
+            f.append((tri[0], tri[1], tri[2]))
+    if dropped:
+        warnings.warn(
+            f"Dropped {dropped} degenerate triangles during parsing.", RuntimeWarning
+        )
+    return Mesh(v, f)
+
+
+def _fan(poly: List[int]) -> List[Tuple[int, int, int]]:
+    return [(poly[0], poly[i], poly[i + 1]) for i in range(1, len(poly) - 1)]
+
+
+def _parse_off(path: str):
+    with open(path, "rb") as f:
+        data = f.read()
+    if np is not None and b"#" not in data:
+        # OpenSCAD writes bare "x y z" vertices and "3 a b c" triangles, so the
+        # whole file is one regular token stream that converts in bulk.
+        toks = data.split()
+        if len(toks) >= 4 and toks[0] == b"OFF":
+            nv, nf = int(toks[1]), int(toks[2])
+            body = toks[4:]
+            if len(body) == 3 * nv + 4 * nf and body[3 * nv::4].count(b"3") == nf:
+                verts = np.array(body[:3 * nv], dtype=np.float64).reshape(nv, 3)
+                faces = np.array(body[3 * nv:], dtype=np.int64).reshape(nf, 4)[:, 1:]
+                return verts, faces
+    lines = data.splitlines()
+    if b"#" in data:
+        lines = [line.split(b"#", 1)[0] for line in lines]
+    lines = [line for line in lines if line.strip()]
+    if not lines or not lines[0].split()[0].endswith(b"OFF"):
+        raise ValueError(f"{path}: missing OFF header.")
+    header = lines[0].split()[1:]
+    start = 1
+    if not header:
+        if len(lines) < 2:
+            raise ValueError(f"{path}: missing OFF element counts.")
+        header = lines[1].split()
+        start = 2
+    nv, nf = int(header[0]), int(header[1])
+    vlines = lines[start:start + nv]
+    flines = lines[start + nv:start + nv + nf]
+    if len(vlines) != nv or len(flines) != nf:
+        raise ValueError(f"{path}: truncated OFF file.")
+    verts = [tuple(float(x) for x in line.split()[:3]) for line in vlines]
+    faces: List[Tuple[int, int, int]] = []
+    for line in flines:
+        parts = line.split()
+        k = int(parts[0])
+        faces.extend(_fan([int(x) for x in parts[1:1 + k]]))
+    return verts, faces
+
+
+def _parse_3mf(path: str):
+    with zipfile.ZipFile(path) as z:
+        names = [n for n in z.namelist() if n.lower().endswith(".model")]
+        if not names:
+            raise ValueError(f"{path}: no 3D model part in 3MF package.")
+        name = "3D/3dmodel.model" if "3D/3dmodel.model" in names else names[0]
+        with z.open(name) as f:
+            root = ET.parse(f).getroot()
+    meshes: Dict[str, Tuple[List[Vec3], List[Tuple[int, int, int]]]] = {}
+    refs: Dict[str, List[Tuple[str, Optional[List[float]]]]] = {}
+    for obj in root.iterfind(".//{*}object"):
+        oid = obj.get("id")
+        mesh = obj.find("{*}mesh")
+        if mesh is not None:
+            verts = [
+                (float(v.get("x")), float(v.get("y")), float(v.get("z")))
+                for v in mesh.iterfind(".//{*}vertex")
+            ]
+            faces = [
+                (int(t.get("v1")), int(t.get("v2")), int(t.get("v3")))
+                for t in mesh.iterfind(".//{*}triangle")
+            ]
+            meshes[oid] = (verts, faces)
+        else:
+            refs[oid] = [
+                (c.get("objectid"), _parse_3mf_transform(c.get("transform")))
+                for c in obj.iterfind(".//{*}component")
+            ]
+    items = [
+        (item.get("objectid"), _parse_3mf_transform(item.get("transform")))
+        for item in root.iterfind(".//{*}item")
+    ]
+    if not items:
+        items = [(oid, None) for oid in meshes]
+    verts_out: List[Vec3] = []
+    faces_out: List[Tuple[int, int, int]] = []
+
+    def emit(oid: str, m: Optional[List[float]], depth: int) -> None:
+        if depth > 64:
+            raise ValueError(f"{path}: 3MF component references are cyclic.")
+        if oid in meshes:
+            verts, faces = meshes[oid]
+            base = len(verts_out)
+            verts_out.extend(verts if m is None else [_apply_3mf_transform(m, p) for p in verts])
+            faces_out.extend((a + base, b + base, c + base) for a, b, c in faces)
+        for child, cm in refs.get(oid, ()):
+            emit(child, _compose_3mf_transforms(cm, m), depth + 1)
+
+    for oid, m in items:
+        emit(oid, m, 0)
+    return verts_out, faces_out
+
+
+def _parse_3mf_transform(text: Optional[str]) -> Optional[List[float]]:
+    # 3MF stores a row-major 4x3 matrix applied to row vectors [x y z 1].
+    if not text:
+        return None
+    m = [float(x) for x in text.split()]
+    if len(m) != 12:
+        raise ValueError(f"Malformed 3MF transform: {text!r}")
+    return m
+
+
+def _apply_3mf_transform(m: List[float], p: Vec3) -> Vec3:
+    x, y, z = p
+    return (
+        x * m[0] + y * m[3] + z * m[6] + m[9],
+        x * m[1] + y * m[4] + z * m[7] + m[10],
+        x * m[2] + y * m[5] + z * m[8] + m[11],
+    )
+
+
+def _compose_3mf_transforms(
+    inner: Optional[List[float]], outer: Optional[List[float]]
+) -> Optional[List[float]]:
+    if inner is None:
+        return outer
+    if outer is None:
+        return inner
+    rows = [_apply_3mf_transform(outer, tuple(inner[r * 3:r * 3 + 3])) for r in range(4)]
+    # The first three rows are directions, so the outer translation must not apply.
+    for r in range(3):
+        rows[r] = tuple(rows[r][k] - outer[9 + k] for k in range(3))
+    return [c for row in rows for c in row]
+
+
+def _parse_amf(path: str):
+    with open(path, "rb") as f:
+        is_zip = f.read(2) == b"PK"
+    if is_zip:
+        with zipfile.ZipFile(path) as z:
+            with z.open(z.namelist()[0]) as f:
+                root = ET.parse(f).getroot()
+    else:
+        root = ET.parse(path).getroot()
+    verts_out: List[Vec3] = []
+    faces_out: List[Tuple[int, int, int]] = []
+    for obj in root.iterfind(".//{*}object"):
+        base = len(verts_out)
+        for coords in obj.iterfind(".//{*}coordinates"):
+            verts_out.append(
+                (
+                    float(coords.findtext("{*}x")),
+                    float(coords.findtext("{*}y")),
+                    float(coords.findtext("{*}z")),
+                )
+            )
+        for t in obj.iterfind(".//{*}triangle"):
+            faces_out.append(
+                (
+                    int(t.findtext("{*}v1")) + base,
+                    int(t.findtext("{*}v2")) + base,
+                    int(t.findtext("{*}v3")) + base,
+                )
+            )
+    return verts_out, faces_out
+
+
+_INDEXED_LOADERS = {
+    ".off": _parse_off,
+    ".3mf": _parse_3mf,
+    ".amf": _parse_amf,
+}
+
+
 if __name__ == "__main__":
-    if len(sys.argv) < 2:
-        print("Usage: python stl_volume.py <path-to-stl> [tolerance]")
+    args = [a for a in sys.argv[1:] if a != "--profile"]
+    profile = len(args) != len(sys.argv) - 1
+    if len(args) < 1:
+        print("Usage: python stl_volume.py [--profile] <path-to-stl|off|3mf|amf> [tolerance]")
         sys.exit(1)
-    p = sys.argv[1]
+    p = args[0]
     tol = None
-    if len(sys.argv) >= 3:
+    if len(args) >= 2:
         try:
-            tol = float(sys.argv[2])
+            tol = float(args[1])
         except Exception:
             tol = None
-    vol = calculate_stl_volume(p, tolerance=tol)
+    with StageProfiler() as prof:
+        vol = calculate_stl_volume(p, tolerance=tol, profiler=prof if profile else None)
     print(f"{vol}")
+    if profile:
+        print(prof.format(), file=sys.stderr)
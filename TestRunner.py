@@ -1,4 +1,5 @@
 import VolumeComparison
+import OpenScadScheduler
 from typing import Dict, List, Any
 import os
 import base64
@@ -466,6 +467,11 @@ h2 { color: var(--text-secondary); margin-top: 30px; }
     print("="*60)
     print(f"Total Score: {overall_total_score:.2f} / {overall_max_score} ({percentage:.1f}%)")
     print(f"Results saved to: results/{aiEngineName}.html")
+    if OpenScadScheduler.currentStats() is not None:
+        print(OpenScadScheduler.getScheduler().formatStats())
+    metricsPath = "results/" + aiEngineName + "_openscad_metrics.json"
+    if VolumeComparison.writeOpenScadMetrics(metricsPath) is not None:
+        print(f"OpenSCAD metrics saved to: {metricsPath}")
     print("="*60)
 
     scores = {}
@@ -1,18 +1,95 @@
-import subprocess
 import tempfile
 import StlVolume
 import os
 import hashlib
 import json
-from typing import Dict, Any, Optional
+import re
+import shlex
+import shutil
+import sys
+import threading
+import time
+import warnings
+from collections import Counter
+from concurrent.futures import Future, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Dict, Any, Iterable, List, Optional, Tuple
+import OpenScadScheduler
+import OpenScadProcess
+import MeshRasterizer
+import BoxVolume
 
 
 
-openScadPath = R"C:\Program Files\OpenSCAD\openscad.exe"
-if not os.path.exists(openScadPath):
-    openScadPath = R"C:\Program Files (x86)\OpenSCAD\openscad.exe"
-if not os.path.exists(openScadPath):
-    raise FileNotFoundError("OpenSCAD executable not found at expected paths")
+# OpenSCAD executable, resolved on the first render (see _openscad_executable)
+# so importing this module never needs OpenSCAD. Set OPENSCAD_PATH, or assign
+# openScadPath before rendering, to pin a binary; otherwise the standard
+# install locations and then PATH are searched.
+openScadPath: Optional[str] = os.environ.get("OPENSCAD_PATH") or None
+_openscadInstallPaths = [
+    R"C:\Program Files\OpenSCAD\openscad.exe",
+    R"C:\Program Files (x86)\OpenSCAD\openscad.exe",
+    "/Applications/OpenSCAD.app/Contents/MacOS/OpenSCAD",
+]
+_openscadPathNames = ["openscad", "openscad-nightly"]
+_discoveryLock = threading.Lock()
+
+# Command prefix for PNG renders, which need a display. Unset means wrap in
+# xvfb-run on a Linux host with no DISPLAY/WAYLAND_DISPLAY when it is
+# installed; set OPENSCAD_PNG_WRAPPER to a command (or "") to override.
+pngWrapperSetting = os.environ.get("OPENSCAD_PNG_WRAPPER")
+
+# Mesh format OpenSCAD exports for volume measurement. Indexed formats (off,
+# 3mf, amf) keep the vertex sharing OpenSCAD already computed, so StlVolume
+# can skip tolerance welding; stl is the historical default, and the fallback
+# for unknown values so a typo never stops the test modules from importing.
+meshExportFormat = os.environ.get("MESH_EXPORT_FORMAT", "stl").lower().lstrip(".")
+if meshExportFormat not in ("stl", "off", "3mf", "amf"):
+    warnings.warn(f"Unsupported MESH_EXPORT_FORMAT {meshExportFormat!r}; exporting stl.", RuntimeWarning)
+    meshExportFormat = "stl"
+
+# Set MESH_PROFILE=1 to measure the meshes in-process with per-stage timings
+# and allocation peaks, reported in scoreExplantion and mesh_profile.json.
+profileMeshes = os.environ.get("MESH_PROFILE", "") not in ("", "0")
+
+# 3D backend passed to OpenSCAD as --backend. "auto" renders a calibration
+# model once per OpenSCAD build and picks the fastest backend whose volume
+# agrees with CGAL's; a test can force one with a module-level
+# openscadBackend = "CGAL" (e.g. for hand-written polyhedra).
+openscadBackendSetting = os.environ.get("OPENSCAD_BACKEND", "auto")
+backendVolumeTolerance = 1e-3
+_calibrationScad = """
+minkowski(){
+    cube(0.001);
+    difference() {
+        sphere(10, $fn=48);
+        cylinder(r=4, h=30, center=true, $fn=32);
+        translate([0,0,8]) cube(12, center=true);
+    }
+}"""
+_openscadInfo: Optional[Dict[str, Any]] = None
+_calibratedBackend: Optional[Tuple[Optional[str]]] = None
+_backendLock = threading.RLock()
+
+# Limits applied to every OpenSCAD process (see OpenScadProcess). A test can
+# override any of them with a module-level
+# openscadLimits = {"wallSeconds": ..., "cpuSeconds": ..., "memoryMb": ...};
+# 0 or None there, or "0" in the environment, means unlimited. Memory is
+# address space (RLIMIT_AS), so it sits well above the scheduler's
+# OPENSCAD_JOB_MEMORY_MB planning budget.
+openscadWallSeconds = float(os.environ.get("OPENSCAD_TIMEOUT", 600))
+openscadCpuSeconds = float(os.environ.get("OPENSCAD_CPU_SECONDS", 2 * openscadWallSeconds))
+openscadMemoryMb = int(os.environ.get("OPENSCAD_MEMORY_MB", 8192))
+
+# Rendered reference meshes, images and volumes, keyed by the reference SCAD
+# and modules only, so every engine and answer for a subpass shares them.
+referenceCacheDir = os.path.join(tempfile.gettempdir(), "mesh_benchmark_cache", "reference")
+_referenceLocks: Dict[str, threading.Lock] = {}
+_referenceLocksGuard = threading.Lock()
+
+# Resource usage of every OpenSCAD process this run (see writeOpenScadMetrics).
+_invocationLog: List[Dict[str, Any]] = []
+_invocationLogLock = threading.Lock()
 
 def compareVolumeAgainstOpenScad(
     index: int, 
@@ -86,18 +163,27 @@ def compareVolumeAgainstOpenScad(
 
     scadModules = testGlobals.get("scadModules", "")
 
-    # Generate cache key from inputs
-    cache_key = _compute_cache_key(resultAsScad, referenceScad, scadModules)
+    # Tests whose geometry is a union of axis-aligned boxes are scored
+    # exactly from the boxes; answers the test cannot express as boxes
+    # (resultToBoxes returns None) go through OpenSCAD below.
+    if "resultToBoxes" in testGlobals and "referenceBoxes" in testGlobals and BoxVolume.available():
+        boxComparison = _compare_boxes(index, subPass, result, testGlobals, resultAsScad, referenceScad, scadModules)
+        if boxComparison is not None:
+            return boxComparison
+
+    # Generate cache key from inputs. It uses the requested backend, not the
+    # resolved one, so a cache hit never needs OpenSCAD to be installed.
+    cache_key = _compute_cache_key(resultAsScad, referenceScad, scadModules, _requested_backend(testGlobals).lower())
     cache_dir = os.path.join(tempfile.gettempdir(), "mesh_benchmark_cache", cache_key)
     cache_meta_path = os.path.join(cache_dir, "cache_meta.json")
 
     # Check for cache hit
-    if os.path.exists(cache_meta_path):
-        cached = _load_cache(cache_meta_path)
-        if cached is not None:
-            print(f"Cache hit for {cache_key[:12]}...")
-            cached["scoreExplantion"] += "Results were <a href='" + cache_meta_path + "'>cached</a>."
-            return cached
+    cached = _cache_hit(cache_meta_path, cache_key)
+    if cached is not None:
+        return cached
+
+    backend = _select_backend(testGlobals)
+    limits = _resource_limits(testGlobals)
 
     # Create cache directory for this comparison
     os.makedirs(cache_dir, exist_ok=True)
@@ -106,18 +192,13 @@ def compareVolumeAgainstOpenScad(
     # Define all file paths
     result_scad = os.path.join(temp_dir, "result.scad")
     resultWithReference_scad = os.path.join(temp_dir, "resultWithReference.scad")
-    reference_scad = os.path.join(temp_dir, "reference.scad")
     compare1_scad = os.path.join(temp_dir, "compare1.scad")
-    compare2_scad = os.path.join(temp_dir, "compare2.scad")
     
-    output_stl = os.path.join(temp_dir, "output.stl")
-    reference_stl = os.path.join(temp_dir, "reference.stl")
-    intersection_stl = os.path.join(temp_dir, "intersection.stl")
-    difference_stl = os.path.join(temp_dir, "difference.stl")
+    output_stl = os.path.join(temp_dir, "output." + meshExportFormat)
+    intersection_stl = os.path.join(temp_dir, "intersection." + meshExportFormat)
     
     output_png = os.path.join(temp_dir, "output.png")
     output2_png = os.path.join(temp_dir, "output2.png")
-    reference_png = os.path.join(temp_dir, "reference.png")
 
     # Write SCAD files
     _write_scad_file(
@@ -127,122 +208,223 @@ def compareVolumeAgainstOpenScad(
         "minkowski(){cube(0.001);result();}"
     )
 
-    _write_scad_file(
-        resultWithReference_scad, 
-        resultAsScad + "\n" + referenceScad, 
-        testGlobals.get("scadModules"), 
-        "minkowski(){cube(0.001);result();}\n" + 
-        """
-color([1,0,0,0.8])
-minkowski(){
-    cube(0.001);
-    difference() {
-        union() {
-            result();   
-            reference();
-        }   
-        result();
-    }
-}"""
-    )
-    
-    _write_scad_file(
-        reference_scad, 
-        referenceScad, 
-        testGlobals.get("scadModules"), 
-        "minkowski(){cube(0.001);reference();}"
+    # Generate STL files
+    print(f"Generating STL files in {temp_dir}...")
+    # Every render runs under the test's resource limits (10 min wall clock by
+    # default) - complex/infinite or runaway renders get aborted. All OpenSCAD work goes through the shared scheduler, so the result
+    # renders while the reference is fetched or rendered below.
+    scheduler = OpenScadScheduler.getScheduler()
+    invocations = []
+    outputJob = scheduler.submit(
+        _run_openscad, result_scad, output_stl, backend=backend, telemetry=invocations, limits=limits
     )
 
-    # Write comparison SCAD files
-    with open(compare1_scad, "w", encoding="utf-8") as f:
-        f.write(f"use <result.scad>;\n")
-        f.write(f"use <reference.scad>;\n")
-        if "scadModules" in testGlobals:
-            f.write(testGlobals["scadModules"])
-        f.write("""
-minkowski(){
-    cube(0.001);
-    intersection() {
-        result();
-        reference();
-    }
-}""")
-
-    with open(compare2_scad, "w", encoding="utf-8") as f:
-        f.write(f"use <result.scad>;\n")
-        f.write(f"use <reference.scad>;\n")
-        if "scadModules" in testGlobals:
-            f.write(testGlobals["scadModules"])
-        f.write("""
-minkowski(){
-    cube(0.001);
-    difference() {
-        union() {
-            result();   
-            reference();
-        }   
-        intersection() {
-            result();
-            reference();
-        }        
-    }
-}""")
+    # Calculate volumes
+    # OpenSCAD output is normally closed, so try the bounded-memory streaming
+    # sum first; StlVolume falls back to the robust pipeline when it is not.
+    # Each mesh is handed to StlVolume's shared process pool from its
+    # render's done callback, so it is measured alongside the other renders
+    # and off this process's GIL; with MESH_PROFILE it is measured in-process
+    # on this thread, when its report is collected, so the stages can be
+    # recorded. Neither takes a scheduler slot: those are for OpenSCAD
+    # processes only. The reports are cached on disk by file content, so
+    # later consumers can call StlVolume.analyze() without re-parsing them.
+    meshProfiles = {} if profileMeshes else None
+    meshReports = {}
 
-    # Generate STL files
-    print(f"Generating STL files in {temp_dir}...")
+    def measure_after(render: Future, name: str, path: str) -> Callable[[], StlVolume.MeshReport]:
+        """Start measuring path once render succeeds; returns its collector."""
+        if meshProfiles is None:
+            submitted: Future = Future()
+
+            def submit(done: Future) -> None:
+                if done.cancelled() or done.exception() is not None:
+                    return
+                try:
+                    submitted.set_result(StlVolume.submit_analyze(path, mode="streaming"))
+                except BaseException as e:
+                    submitted.set_exception(e)
+
+            render.add_done_callback(submit)
+            return lambda: _pool_report(submitted.result(), path)
+
+        def profiled() -> StlVolume.MeshReport:
+            with StlVolume.StageProfiler() as prof:
+                report = StlVolume.analyze(path, mode="streaming", profiler=prof)
+            meshProfiles[name] = prof
+            return report
+
+        return profiled
+
+    # Started now, so the result's measurement overlaps with the reference
+    # fetch below.
+    collectResultReport = measure_after(outputJob, "result", output_stl)
+
+    # The reference only depends on the test and subpass, so its mesh, image
+    # and volume come from a cache shared by every engine, answer and run.
     openscad_errors = []
-    if not os.path.exists(reference_stl):
-        err = _run_openscad(reference_scad, reference_stl)
-        if err:
-            openscad_errors.append(err)
-    
-    # Run result SCAD with 10min timeout - complex/infinite renders get aborted
+    referenceArtifacts, err = _get_reference_artifacts(referenceScad, scadModules, backend, invocations, limits)
+    if err:
+        openscad_errors.append(err)
+    reference_stl = referenceArtifacts["stl"]
+    reference_png = referenceArtifacts["png"]
+
+    # The booleans and the overlay image work on the meshes rendered below,
+    # so the user's CSG (and its minkowski inflation) is evaluated once.
+    outputImport = f'import("{os.path.basename(output_stl)}");'
+    referenceImport = f'import("{_scad_path(reference_stl)}");'
+    with open(resultWithReference_scad, "w", encoding="utf-8") as f:
+        f.write(f"""{outputImport}
+color([1,0,0,0.8])
+difference() {{
+    {referenceImport}
+    {outputImport}
+}}""")
+
+    with open(compare1_scad, "w", encoding="utf-8") as f:
+        f.write(f"""intersection() {{
+    {outputImport}
+    {referenceImport}
+}}""")
+
+    # Both images only need the result mesh, so they start as soon as it exists.
+    outputPngJob = _render_stl_to_png(output_stl, output_png, after=[outputJob], telemetry=invocations, limits=limits)
+    overlayPngJob = scheduler.submit(
+        _render_mesh_png,
+        [output_stl, reference_stl],
+        output2_png,
+        f"include <{os.path.basename(resultWithReference_scad)}>;",
+        telemetry=invocations,
+        limits=limits,
+        after=[outputJob]
+    )
+
+    prescreened = False
     try:
-        err = _run_openscad(result_scad, output_stl, timeout=600)
+        err = outputJob.result()
         if err:
             openscad_errors.append(err)
-    except TimeoutError as e:
+        # The result's bounds come free with its volume. An answer that misses
+        # the reference entirely (shifted, or scaled by a unit mix-up) has an
+        # intersection of exactly zero, so its boolean render is skipped.
+        meshReports["result"] = collectResultReport()
+        prescreened = not _bboxes_overlap(meshReports["result"], referenceArtifacts["meshReport"])
+        if prescreened:
+            meshReports["intersection"] = StlVolume.MeshReport(component_volumes=[])
+        else:
+            intersectionJob = scheduler.submit(
+                _run_openscad,
+                compare1_scad,
+                intersection_stl,
+                backend=backend,
+                telemetry=invocations,
+                limits=limits
+            )
+            collectIntersectionReport = measure_after(intersectionJob, "intersection", intersection_stl)
+            err = intersectionJob.result()
+            if err:
+                openscad_errors.append(err)
+            meshReports["intersection"] = collectIntersectionReport()
+    except (RenderFailure, StlVolume.MeshLoadError, BrokenProcessPool) as e:
+        # Let the image jobs settle so their usage is logged with the rest.
+        wait([outputPngJob, overlayPngJob])
+        _log_invocations(invocations, index, subPass)
+        if isinstance(e, RenderFailure):
+            failure = {"openscadFailure": e.kind}
+            explanation = f"Render {e.kind}: {e}"
+        else:
+            # OpenSCAD exported a mesh StlVolume cannot read, or one whose
+            # measurement killed its pool worker twice.
+            failure = {"meshFailure": str(e)}
+            explanation = f"Mesh could not be measured: {e}"
         return {
             "score": 0,
             "output_image": None,
             "output_mouseover_image": None,
             "output_hyperlink": result_scad,
-            "reference_image": reference_png if os.path.exists(reference_png) else None,
+            "reference_image": reference_png,
             "temp_dir": temp_dir,
-            "scoreExplantion": f"<div style='color:red;'>Render timeout: {e}</div>",
+            "scoreExplantion": f"<div style='color:red;'>{explanation}</div>",
             "resultVolume": 0,
             "referenceVolume": 0,
             "intersectionVolume": 0,
-            "differenceVolume": 0
+            "differenceVolume": 0,
+            **failure,
+            "openscadInvocations": invocations
         }
     
-    err = _run_openscad(compare1_scad, intersection_stl)
-    if err:
-        openscad_errors.append(err)
-    err = _run_openscad(compare2_scad, difference_stl)
-    if err:
-        openscad_errors.append(err)
-    
     # Generate PNG images with off-axis camera
     print(f"Rendering PNG images...")
-    _render_stl_to_png(output_stl, output_png)
-    render_scadText_to_png(f"include <{os.path.basename(resultWithReference_scad)}>;", output2_png)
+    # Preview failures are reported but never affect the score.
+    previewErrors = [err for err in (outputPngJob.result(), overlayPngJob.result()) if err]
 
-    if not os.path.exists(reference_png):
-        _render_stl_to_png(reference_stl, reference_png)
-
-    # Calculate volumes
-    resultVolume = StlVolume.calculate_stl_volume(output_stl)
-    referenceVolume = StlVolume.calculate_stl_volume(reference_stl)
-    intersectionVolume = StlVolume.calculate_stl_volume(intersection_stl)
-    differenceVolume = StlVolume.calculate_stl_volume(difference_stl)
+    if meshProfiles:
+        with open(os.path.join(temp_dir, "mesh_profile.json"), "w", encoding="utf-8") as f:
+            json.dump({name: prof.to_dict() for name, prof in meshProfiles.items()}, f, indent=2)
+    if referenceArtifacts["meshReport"] is not None:
+        meshReports["reference"] = StlVolume.MeshReport.from_dict(referenceArtifacts["meshReport"])
+    resultVolume = meshReports["result"].volume
+    referenceVolume = referenceArtifacts["volume"]
+    intersectionVolume = meshReports["intersection"].volume
+    # |A u B| - |A n B| = |A| + |B| - 2|A n B|, so the symmetric difference
+    # needs no boolean of its own.
+    differenceVolume = max(resultVolume + referenceVolume - 2 * intersectionVolume, 0.0)
     
     print(f"Result Volume: {resultVolume}")
     print(f"Reference Volume: {referenceVolume}")
     print(f"Intersection Volume: {intersectionVolume}")
     print(f"Difference Volume: {differenceVolume}")
 
-    scoreExplantion = f"""
+    scoreExplantion = _volume_table(resultVolume, referenceVolume, intersectionVolume, differenceVolume)
+    if prescreened:
+        scoreExplantion += "Result does not overlap the reference's bounding box; intersection render skipped.<br>"
+    
+    if meshProfiles:
+        scoreExplantion += "<pre>" + "\n\n".join(
+            name + ":\n" + prof.format() for name, prof in meshProfiles.items()
+        ) + "</pre>"
+
+    if openscad_errors or previewErrors:
+        scoreExplantion += "<div style='color:red;white-space:pre-wrap;'>" + "\n".join(openscad_errors + previewErrors).replace('<', '&lt;').replace('>', '&gt;') + "</div>"
+
+    # Calculate score
+    score, scoreNotes = _score_volumes(
+        testGlobals, result, subPass, resultVolume, referenceVolume, intersectionVolume, differenceVolume
+    )
+    scoreExplantion += scoreNotes
+
+    if openscad_errors:
+        score = 0
+
+    result_dict = {
+        "score": score,
+        "output_image": output_png,
+        "output_mouseover_image": output2_png,
+        "output_hyperlink":result_scad,
+        "reference_image": reference_png,
+        "temp_dir": temp_dir,
+        "scoreExplantion": scoreExplantion,
+        "resultVolume": resultVolume,
+        "referenceVolume": referenceVolume,
+        "intersectionVolume": intersectionVolume,
+        "differenceVolume": differenceVolume,
+        "meshReports": {name: report.to_dict() for name, report in meshReports.items()},
+        "openscadBackend": backend,
+        "intersectionPrescreened": prescreened,
+        "openscadInvocations": invocations
+    }
+    _log_invocations(invocations, index, subPass)
+
+    # Save to cache, unless a render failed or an image is missing: those may
+    # be transient, and a cached entry would replay them on every run.
+    if not openscad_errors and all(os.path.exists(p) for p in (output_png, output2_png)):
+        _save_cache(cache_meta_path, result_dict)
+
+    return result_dict
+
+
+def _volume_table(resultVolume: float, referenceVolume: float, intersectionVolume: float, differenceVolume: float) -> str:
+    return f"""
     <table>
     <tr><td>Result Volume:</td><td>{resultVolume:.2f}</td></tr>
     <tr><td>Reference Volume:</td><td>{referenceVolume:.2f}</td></tr>
@@ -250,65 +432,480 @@ minkowski(){
     <tr><td>Difference Volume:</td><td>{differenceVolume:.2f}</td></tr>
     </table>
     """
-    
-    if openscad_errors:
-        scoreExplantion += "<div style='color:red;white-space:pre-wrap;'>" + "\n".join(openscad_errors).replace('<', '&lt;').replace('>', '&gt;') + "</div>"
 
-    # Calculate score
+
+def _score_volumes(
+    testGlobals: dict,
+    result,
+    subPass: int,
+    resultVolume: float,
+    referenceVolume: float,
+    intersectionVolume: float,
+    differenceVolume: float
+) -> Tuple[float, str]:
+    """Score from the four volumes and the test's hooks; returns (score, notes)."""
+    notes = ""
     if referenceVolume == 0:
-        score = 0.0
-    else:
-        score = intersectionVolume / referenceVolume
+        return 0.0, notes
 
-        if "volumeValidateDelta" in testGlobals:
-            scoreDelta = testGlobals["volumeValidateDelta"](
-                result, resultVolume, referenceVolume, 
-                intersectionVolume, differenceVolume
-            )
+    score = intersectionVolume / referenceVolume
+
+    if "volumeValidateDelta" in testGlobals:
+        scoreDelta = testGlobals["volumeValidateDelta"](
+            result, resultVolume, referenceVolume, 
+            intersectionVolume, differenceVolume
+        )
 
-            if scoreDelta != 0:
-                scoreExplantion += f"Score was weighted from raw volume similarity, +: {scoreDelta:.2f}\n"
-                score += scoreDelta
+        if scoreDelta != 0:
+            notes += f"Score was weighted from raw volume similarity, +: {scoreDelta:.2f}\n"
+            score += scoreDelta
 
-        score -= (differenceVolume / referenceVolume) * 0.5
+    score -= (differenceVolume / referenceVolume) * 0.5
 
-        if "postProcessScore" in testGlobals:
-            oldScore = score
-            score = testGlobals["postProcessScore"](score, subPass)
-            if oldScore != score:
-                scoreExplantion += f"Score was renormalised: {oldScore:.2f} -> {score:.2f}\n"
+    if "postProcessScore" in testGlobals:
+        oldScore = score
+        score = testGlobals["postProcessScore"](score, subPass)
+        if oldScore != score:
+            notes += f"Score was renormalised: {oldScore:.2f} -> {score:.2f}\n"
 
-        score = max(0, score)
+    return max(0, score), notes
 
-    if openscad_errors:
-        score = 0
+
+def _compare_boxes(
+    index: int,
+    subPass: int,
+    result,
+    testGlobals: dict,
+    resultAsScad: str,
+    referenceScad: str,
+    scadModules: str
+) -> Optional[Dict[str, Any]]:
+    """Score a box-union answer exactly from resultToBoxes/referenceBoxes.
+
+    Returns None when the answer has no box form, so the caller renders it.
+    Images are rasterized from the boxes; OpenSCAD only runs for them if
+    MeshRasterizer is unavailable.
+    """
+    try:
+        resultBoxes = testGlobals["resultToBoxes"](result)
+    except Exception as e:
+        print(f"resultToBoxes failed ({e}); comparing with OpenSCAD instead")
+        return None
+    if resultBoxes is None:
+        return None
+    referenceBoxes = testGlobals["referenceBoxes"](subPass)
+
+    cache_key = _compute_cache_key(resultAsScad, referenceScad, scadModules, "boxes")
+    temp_dir = os.path.join(tempfile.gettempdir(), "mesh_benchmark_cache", cache_key)
+    cache_meta_path = os.path.join(temp_dir, "cache_meta.json")
+    cached = _cache_hit(cache_meta_path, cache_key)
+    if cached is not None:
+        return cached
+    os.makedirs(temp_dir, exist_ok=True)
+
+    result_scad = os.path.join(temp_dir, "result.scad")
+    output_png = os.path.join(temp_dir, "output.png")
+    output2_png = os.path.join(temp_dir, "output2.png")
+    reference_png = os.path.join(temp_dir, "reference.png")
+    _write_scad_file(result_scad, resultAsScad, scadModules, "result();")
+
+    scheduler = OpenScadScheduler.getScheduler()
+    invocations = []
+    imageJobs = [
+        scheduler.submit(_render_boxes_png, [resultBoxes], output_png, telemetry=invocations),
+        scheduler.submit(_render_boxes_png, [resultBoxes, referenceBoxes], output2_png, telemetry=invocations),
+        scheduler.submit(_render_boxes_png, [referenceBoxes], reference_png, telemetry=invocations),
+    ]
+
+    resultVolume, referenceVolume, intersectionVolume = BoxVolume.volumes(resultBoxes, referenceBoxes)
+    differenceVolume = max(resultVolume + referenceVolume - 2 * intersectionVolume, 0.0)
+    print(f"Box volumes: result {resultVolume}, reference {referenceVolume}, intersection {intersectionVolume}")
+
+    score, scoreNotes = _score_volumes(
+        testGlobals, result, subPass, resultVolume, referenceVolume, intersectionVolume, differenceVolume
+    )
+    scoreExplantion = _volume_table(resultVolume, referenceVolume, intersectionVolume, differenceVolume)
+    scoreExplantion += "Volumes were computed exactly from the boxes.<br>" + scoreNotes
+
+    # A missing preview never fails the comparison.
+    for job in imageJobs:
+        try:
+            job.result()
+        except Exception as e:
+            print(f"Warning: drawing a box preview failed ({e})")
+    images = [output_png, output2_png, reference_png]
 
     result_dict = {
         "score": score,
-        "output_image": output_png,
-        "output_mouseover_image": output2_png,
-        "output_hyperlink":result_scad,
-        "reference_image": reference_png,
+        "output_image": output_png if os.path.exists(output_png) else None,
+        "output_mouseover_image": output2_png if os.path.exists(output2_png) else None,
+        "output_hyperlink": result_scad,
+        "reference_image": reference_png if os.path.exists(reference_png) else None,
         "temp_dir": temp_dir,
         "scoreExplantion": scoreExplantion,
         "resultVolume": resultVolume,
         "referenceVolume": referenceVolume,
         "intersectionVolume": intersectionVolume,
-        "differenceVolume": differenceVolume
+        "differenceVolume": differenceVolume,
+        "volumeEngine": "boxes",
+        "openscadInvocations": invocations
     }
+    _log_invocations(invocations, index, subPass)
+    # Without every image the entry is not cached, so the next run retries them.
+    if all(os.path.exists(p) for p in images):
+        _save_cache(cache_meta_path, result_dict)
+    return result_dict
 
-    # Save to cache
-    _save_cache(cache_meta_path, result_dict)
 
-    return result_dict
+def _render_boxes_png(
+    layers: List[List["BoxVolume.Box"]],
+    png_path: str,
+    telemetry: Optional[List[Dict[str, Any]]] = None
+) -> None:
+    """Draw box lists like _render_mesh_png: the first plain, later ones red."""
+    if MeshRasterizer.available():
+        colors = [MeshRasterizer.FACE_COLOR] + [MeshRasterizer.OVERLAY_COLOR] * (len(layers) - 1)
+        MeshRasterizer.render_png(
+            [(BoxVolume.box_triangles(boxes), c) for boxes, c in zip(layers, colors)], png_path
+        )
+        return
+    scad = ""
+    for n, boxes in enumerate(layers):
+        color = "color([1,0,0,0.8]) " if n else ""
+        for lo, hi in BoxVolume.normalize(boxes):
+            scad += f"translate([{lo[0]},{lo[1]},{lo[2]}]) {color}cube([{hi[0] - lo[0]},{hi[1] - lo[1]},{hi[2] - lo[2]}]);\n"
+    _render_png(scad, png_path, telemetry=telemetry)
+
+
+def _cache_hit(cache_meta_path: str, cache_key: str) -> Optional[Dict[str, Any]]:
+    if not os.path.exists(cache_meta_path):
+        return None
+    cached = _load_cache(cache_meta_path)
+    if cached is not None:
+        print(f"Cache hit for {cache_key[:12]}...")
+        cached["scoreExplantion"] += "Results were <a href='" + cache_meta_path + "'>cached</a>."
+    return cached
+
+
+def _bboxes_overlap(report: "StlVolume.MeshReport", referenceReport: Optional[Dict[str, Any]]) -> bool:
+    """False only when the two solids provably share no volume."""
+    if referenceReport is None:
+        return True
+    if report.bbox is None or referenceReport.get("bbox") is None:
+        # An empty mesh intersects nothing.
+        return False
+    (lo, hi), (refLo, refHi) = report.bbox, referenceReport["bbox"]
+    return all(min(hi[i], refHi[i]) > max(lo[i], refLo[i]) for i in range(3))
 
 
-def _compute_cache_key(resultAsScad: str, referenceScad: str, scadModules: str) -> str:
-    """Compute a hash key from the input SCAD texts."""
+def _compute_cache_key(resultAsScad: str, referenceScad: str, scadModules: str, backend: Optional[str] = None) -> str:
+    """Compute a hash key from the input SCAD texts and OpenSCAD backend."""
     combined = f"{resultAsScad}\n---REFERENCE---\n{referenceScad}\n---MODULES---\n{scadModules}"
+    if backend:
+        combined += f"\n---BACKEND---\n{backend}"
     return hashlib.sha256(combined.encode('utf-8')).hexdigest()
 
 
+def _compute_reference_key(referenceScad: str, scadModules: str, backend: Optional[str] = None) -> str:
+    """Compute a hash key from the reference SCAD text alone."""
+    combined = f"{referenceScad}\n---MODULES---\n{scadModules}\n---FORMAT---\n{meshExportFormat}"
+    if backend:
+        combined += f"\n---BACKEND---\n{backend}"
+    return hashlib.sha256(combined.encode('utf-8')).hexdigest()
+
+
+def _get_reference_artifacts(
+    referenceScad: str,
+    scadModules: str,
+    backend: Optional[str] = None,
+    telemetry: Optional[List[Dict[str, Any]]] = None,
+    limits: Optional[OpenScadProcess.Limits] = None
+) -> Tuple[Dict[str, Any], Optional[str]]:
+    """Return the reference mesh, image and volume, rendering them on a miss.
+
+    Returns (artifacts, error message or None). reference_meta.json is
+    written last, so its presence means the other artifacts are complete;
+    failed renders are not cached. Invocations made for a fresh render are
+    appended to telemetry and kept in the metadata.
+    """
+    key = _compute_reference_key(referenceScad, scadModules, backend)
+    refDir = os.path.join(referenceCacheDir, key)
+    meta_path = os.path.join(refDir, "reference_meta.json")
+    with _reference_lock(key):
+        cached = _load_reference_meta(meta_path)
+        if cached is not None:
+            return cached, None
+
+        os.makedirs(refDir, exist_ok=True)
+        reference_scad = os.path.join(refDir, "reference.scad")
+        reference_stl = os.path.join(refDir, "reference." + meshExportFormat)
+        reference_png = os.path.join(refDir, "reference.png")
+        _write_scad_file(
+            reference_scad,
+            referenceScad,
+            scadModules,
+            "minkowski(){cube(0.001);reference();}"
+        )
+        invocations = []
+        try:
+            err = OpenScadScheduler.getScheduler().submit(
+                _run_openscad, reference_scad, reference_stl, backend=backend, telemetry=invocations, limits=limits
+            ).result()
+        except RenderFailure as e:
+            err = f"Reference render {e.kind}: {e}"
+        if err or not os.path.exists(reference_stl):
+            if telemetry is not None:
+                telemetry.extend(invocations)
+            return {
+                "stl": reference_stl,
+                "png": None,
+                "volume": 0.0,
+                "meshReport": None,
+                "openscadBackend": backend
+            }, err
+
+        pngJob = _render_stl_to_png(reference_stl, reference_png, telemetry=invocations, limits=limits)
+        try:
+            report = _pool_report(StlVolume.submit_analyze(reference_stl, mode="streaming"), reference_stl)
+        except (StlVolume.MeshLoadError, BrokenProcessPool) as e:
+            report, err = None, f"Reference mesh could not be measured: {e}"
+        pngJob.result()
+        if telemetry is not None:
+            telemetry.extend(invocations)
+        if report is None:
+            return {
+                "stl": reference_stl,
+                "png": None,
+                "volume": 0.0,
+                "meshReport": None,
+                "openscadBackend": backend
+            }, err
+        artifacts = {
+            "stl": reference_stl,
+            "png": reference_png if os.path.exists(reference_png) else None,
+            "volume": report.volume,
+            "meshReport": report.to_dict(),
+            "openscadBackend": backend,
+            "openscadInvocations": invocations,
+        }
+        tmp_path = f"{meta_path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(artifacts, f, indent=2)
+            os.replace(tmp_path, meta_path)
+        except OSError as e:
+            print(f"Warning: Failed to save reference cache: {e}")
+        return artifacts, None
+
+
+def _pool_report(job: Future, path: str) -> StlVolume.MeshReport:
+    """The MeshReport of a submit_analyze job on path.
+
+    A worker that died (e.g. killed for memory) breaks the whole pool, so
+    the mesh is measured once more on a fresh one; BrokenProcessPool is
+    raised if that worker dies too.
+    """
+    try:
+        return job.result()
+    except BrokenProcessPool:
+        print(f"Warning: Mesh measurement process died for {path}; retrying once")
+        return StlVolume.submit_analyze(path, mode="streaming").result()
+
+
+def _reference_lock(key: str) -> threading.Lock:
+    # One lock per reference, so concurrent subpasses of the same test wait
+    # for a single render instead of each starting their own.
+    with _referenceLocksGuard:
+        return _referenceLocks.setdefault(key, threading.Lock())
+
+
+def _openscad_executable() -> str:
+    """Resolve openScadPath on first use; raises FileNotFoundError if absent."""
+    global openScadPath
+    with _discoveryLock:
+        if openScadPath:
+            found = openScadPath if os.path.isfile(openScadPath) else shutil.which(openScadPath)
+            if not found:
+                raise FileNotFoundError(f"OpenSCAD executable not found: {openScadPath}")
+            openScadPath = found
+            return openScadPath
+        for candidate in _openscadInstallPaths:
+            if os.path.isfile(candidate):
+                openScadPath = candidate
+                return openScadPath
+        for name in _openscadPathNames:
+            found = shutil.which(name)
+            if found:
+                openScadPath = found
+                return openScadPath
+    raise FileNotFoundError(
+        "OpenSCAD executable not found; set OPENSCAD_PATH or put openscad on PATH "
+        f"(searched {', '.join(_openscadInstallPaths + _openscadPathNames)})"
+    )
+
+
+def _png_command() -> List[str]:
+    """OpenSCAD command for PNG export, under a virtual display when headless."""
+    executable = _openscad_executable()
+    if pngWrapperSetting is not None:
+        return shlex.split(pngWrapperSetting) + [executable]
+    if sys.platform.startswith("linux") and not (os.environ.get("DISPLAY") or os.environ.get("WAYLAND_DISPLAY")):
+        xvfb = shutil.which("xvfb-run")
+        if xvfb:
+            return [xvfb, "-a", "-s", "-screen 0 1024x768x24", executable]
+    return [executable]
+
+
+def _openscad_info() -> Dict[str, Any]:
+    """Version and --backend values of the OpenSCAD executable, probed once."""
+    global _openscadInfo
+    with _backendLock:
+        if _openscadInfo is None:
+            _openscadInfo = _probe_openscad(_openscad_executable())
+        return _openscadInfo
+
+
+def _probe_openscad(path: str) -> Dict[str, Any]:
+    # The probes run under the default limits like every render, with a
+    # shorter wall clock since they do no geometry.
+    defaults = _resource_limits()
+    limits = OpenScadProcess.Limits(60, defaults.cpuSeconds, defaults.memoryBytes)
+
+    def output(arg: str) -> str:
+        try:
+            result = OpenScadProcess.run([path, arg], limits=limits)
+        except OSError as e:
+            print(f"Warning: Could not run {path} {arg}: {e}")
+            return ""
+        if result.failure in ("timeout", "cpu", "oom", "crash"):
+            print(f"Warning: {_describe_failure(result, limits)} for {arg}; its output is ignored")
+            return ""
+        return result.stdout + result.stderr
+
+    version = re.search(r"version\s+(\S+)", output("--version"))
+    # The --backend description lists the values in quotes, e.g.
+    # "3D rendering backend to use: 'CGAL' (old/slow) [default] or 'Manifold'".
+    backends = []
+    helpText = output("--help")
+    option = re.search(r"--backend\b(.*?)(?=\n\s*-|\Z)", helpText, re.S)
+    if option:
+        backends = list(dict.fromkeys(re.findall(r"'([A-Za-z0-9_]+)'", option.group(1))))
+    return {"path": path, "version": version.group(1) if version else None, "backends": backends}
+
+
+def _requested_backend(testGlobals: dict) -> str:
+    """The test's openscadBackend or OPENSCAD_BACKEND; may be "auto"."""
+    return testGlobals.get("openscadBackend") or openscadBackendSetting
+
+
+def _select_backend(testGlobals: dict) -> Optional[str]:
+    """Backend for this test: its override, OPENSCAD_BACKEND or calibration.
+
+    Returns None when OpenSCAD has no --backend option, so its default is used.
+    Probes OpenSCAD, so it is only called once a render is needed.
+    """
+    global _calibratedBackend
+    info = _openscad_info()
+    requested = _requested_backend(testGlobals)
+    if requested.lower() != "auto":
+        match = next((b for b in info["backends"] if b.lower() == requested.lower()), None)
+        if match is None and info["backends"]:
+            print(f"Warning: OpenSCAD {info['version']} has no backend {requested!r}; using its default")
+        return match
+    with _backendLock:
+        if _calibratedBackend is None:
+            _calibratedBackend = (_calibrate_backend(info),)
+        return _calibratedBackend[0]
+
+
+def _calibrate_backend(info: Dict[str, Any]) -> Optional[str]:
+    """Render a calibration model with each backend and pick the fastest.
+
+    Only backends whose volume is within backendVolumeTolerance of CGAL's
+    (or of the first backend that rendered) are eligible. The choice is
+    cached on disk per OpenSCAD executable, version and backend list.
+    """
+    backends = info["backends"]
+    if len(backends) < 2:
+        return backends[0] if backends else None
+    workDir = os.path.join(tempfile.gettempdir(), "mesh_benchmark_cache", "backend_calibration")
+    os.makedirs(workDir, exist_ok=True)
+    cachePath = os.path.join(workDir, "openscad_backend.json")
+    identity = {"path": info["path"], "version": info["version"], "backends": backends}
+    try:
+        with open(cachePath, "r", encoding="utf-8") as f:
+            cached = json.load(f)
+        if cached.get("identity") == identity:
+            return cached["backend"]
+    except (OSError, ValueError, KeyError):
+        pass
+
+    calibration_scad = os.path.join(workDir, "calibration.scad")
+    with open(calibration_scad, "w", encoding="utf-8") as f:
+        f.write(_calibrationScad)
+    scheduler = OpenScadScheduler.getScheduler()
+    seconds: Dict[str, float] = {}
+    volumes: Dict[str, float] = {}
+    for backend in backends:
+        output_file = os.path.join(workDir, f"calibration_{backend}.stl")
+        t0 = time.perf_counter()
+        try:
+            err = scheduler.submit(_run_openscad, calibration_scad, output_file, backend=backend).result()
+        except RenderFailure:
+            continue
+        if err or not os.path.exists(output_file):
+            continue
+        seconds[backend] = time.perf_counter() - t0
+        volumes[backend] = StlVolume.calculate_stl_volume(output_file)
+    if not volumes:
+        return None
+
+    baseline = next((b for b in volumes if b.lower() == "cgal"), next(iter(volumes)))
+    agreeing = [
+        b for b in volumes
+        if abs(volumes[b] - volumes[baseline]) <= backendVolumeTolerance * abs(volumes[baseline])
+    ]
+    chosen = min(agreeing, key=seconds.__getitem__)
+    print(
+        f"OpenSCAD {info['version']} backend calibration: "
+        + ", ".join(f"{b} {seconds[b]:.2f}s vol {volumes[b]:.3f}" for b in volumes)
+        + f"; using {chosen}"
+    )
+    try:
+        with open(cachePath, "w", encoding="utf-8") as f:
+            json.dump(
+                {"identity": identity, "backend": chosen, "seconds": seconds, "volumes": volumes},
+                f,
+                indent=2
+            )
+    except OSError as e:
+        print(f"Warning: Failed to save backend calibration: {e}")
+    return chosen
+
+
+def _load_reference_meta(meta_path: str) -> Optional[Dict[str, Any]]:
+    """Load cached reference artifacts if the mesh and image still exist.
+
+    A reference whose image could not be drawn is cached with png None and
+    reused as is; only a recorded file that has gone missing forces a rerender.
+    """
+    try:
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not cached.get('stl') or not os.path.exists(cached['stl']):
+        return None
+    if cached.get('png') and not os.path.exists(cached['png']):
+        return None
+    return cached
+
+
+def _scad_path(path: str) -> str:
+    """Absolute path in the form OpenSCAD accepts inside import()."""
+    return os.path.abspath(path).replace("\\", "/")
+
+
 def _load_cache(cache_meta_path: str) -> Optional[Dict[str, Any]]:
     """Load cached result if all files still exist."""
     try:
@@ -316,7 +913,7 @@ def _load_cache(cache_meta_path: str) -> Optional[Dict[str, Any]]:
             cached = json.load(f)
         # Verify all referenced files still exist
         for key in ['output_image', 'reference_image']:
-            if key in cached and not os.path.exists(cached[key]):
+            if cached.get(key) and not os.path.exists(cached[key]):
                 return None
         return cached
     except (json.JSONDecodeError, IOError):
@@ -346,29 +943,81 @@ def _write_scad_file(
         f.write(suffix)
 
 
-class TimeoutError(Exception):
-    """Raised when OpenSCAD times out."""
+class RenderFailure(Exception):
+    """Raised when OpenSCAD is killed by a limit or dies abnormally.
+
+    kind is OpenScadProcess's classification: timeout, cpu, oom or crash.
+    """
+    def __init__(self, kind: str, message: str):
+        super().__init__(message)
+        self.kind = kind
+
+
+class TimeoutError(RenderFailure):
+    """Raised when OpenSCAD exceeds its wall-clock or CPU time limit."""
     pass
 
 
-def _run_openscad(input_scad: str, output_file: str, timeout: Optional[float] = None) -> Optional[str]:
+def _resource_limits(testGlobals: Optional[dict] = None) -> OpenScadProcess.Limits:
+    """Default limits, overridden by the test's openscadLimits."""
+    settings = {
+        "wallSeconds": openscadWallSeconds,
+        "cpuSeconds": openscadCpuSeconds,
+        "memoryMb": openscadMemoryMb,
+    }
+    if testGlobals:
+        settings.update(testGlobals.get("openscadLimits") or {})
+    memoryMb = settings["memoryMb"]
+    return OpenScadProcess.Limits(
+        wallSeconds=settings["wallSeconds"] or None,
+        cpuSeconds=settings["cpuSeconds"] or None,
+        memoryBytes=int(memoryMb) * 1024 * 1024 if memoryMb else None,
+    )
+
+
+def _describe_failure(result: "OpenScadProcess.ProcessResult", limits: OpenScadProcess.Limits) -> str:
+    if result.failure == "timeout":
+        return f"OpenSCAD render timed out after {limits.wallSeconds:g} seconds"
+    if result.failure == "cpu":
+        return f"OpenSCAD render exceeded its CPU limit of {limits.cpuSeconds:g} seconds"
+    if result.failure == "oom":
+        if limits.memoryBytes:
+            return f"OpenSCAD ran out of memory (limit {limits.memoryBytes // (1024 * 1024)} MB)"
+        return "OpenSCAD ran out of memory"
+    return f"OpenSCAD crashed with exit code {result.returncode}"
+
+
+def _run_openscad(
+    input_scad: str,
+    output_file: str,
+    timeout: Optional[float] = None,
+    backend: Optional[str] = None,
+    telemetry: Optional[List[Dict[str, Any]]] = None,
+    limits: Optional[OpenScadProcess.Limits] = None
+) -> Optional[str]:
     """Run OpenSCAD to generate output file from SCAD input.
     
     Returns error message string if there was an error, None otherwise.
-    Raises TimeoutError if timeout is specified and exceeded.
+    Runs under limits (the defaults when None; timeout overrides the wall
+    clock) and raises TimeoutError when a time limit is hit, RenderFailure
+    when OpenSCAD runs out of memory or crashes.
+    The invocation's resource usage is appended to telemetry, or to the
+    run-level log when no list is given.
     """
-    try:
-        result = subprocess.run(
-            [openScadPath, "-o", output_file, input_scad],
-            capture_output=True,
-            text=True,
-            encoding="utf-8",
-            errors="replace",
-            timeout=timeout
-        )
-    except subprocess.TimeoutExpired:
-        print(f"OpenSCAD timed out after {timeout}s for {input_scad}")
-        raise TimeoutError(f"OpenSCAD render timed out after {timeout} seconds")
+    limits = limits or _resource_limits()
+    if timeout is not None:
+        limits = OpenScadProcess.Limits(timeout, limits.cpuSeconds, limits.memoryBytes)
+    command = [_openscad_executable()]
+    if backend:
+        command += ["--backend", backend]
+    result = OpenScadProcess.run(command + ["-o", output_file, input_scad], limits=limits)
+    _record_invocation(telemetry, input_scad, output_file, backend, result)
+    if result.failure in ("timeout", "cpu", "oom", "crash"):
+        message = _describe_failure(result, limits)
+        print(f"{message} for {input_scad}")
+        if result.failure in ("timeout", "cpu"):
+            raise TimeoutError(result.failure, message)
+        raise RenderFailure(result.failure, message)
     if result.returncode != 0:
         print(f"Warning: OpenSCAD returned non-zero exit code for {input_scad}")
         error_msg = f"OpenSCAD error for {os.path.basename(input_scad)}:\n"
@@ -381,24 +1030,184 @@ def _run_openscad(input_scad: str, output_file: str, timeout: Optional[float] =
     return None
 
 
-def _render_stl_to_png(stl_path: str, png_path: str) -> None:
-    """Render an STL file to PNG using OpenSCAD with an off-axis camera."""
-    # Create a temporary SCAD file that imports the STL
-    temp_scad = stl_path.replace(".stl", "_render.scad")
-    render_scadText_to_png(
+def _count_facets(path: str) -> Optional[int]:
+    """Triangle count of an exported mesh, or None for other outputs."""
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in (".stl", ".off", ".3mf", ".amf") or not os.path.exists(path):
+        return None
+    try:
+        if ext != ".stl":
+            # Indexed formats carry no count to read off; their polygons are
+            # fanned into triangles so the count matches an STL export.
+            return len(StlVolume.load_triangles(path))
+        size = os.path.getsize(path)
+        with open(path, "rb") as f:
+            header = f.read(84)
+            if len(header) == 84:
+                count = int.from_bytes(header[80:84], "little")
+                if 84 + 50 * count == size:
+                    return count
+            if header.lstrip().startswith(b"solid"):
+                # Carry the tail over so a keyword split across chunks counts once.
+                f.seek(0)
+                count = 0
+                tail = b""
+                while True:
+                    chunk = f.read(1 << 20)
+                    if not chunk:
+                        return count
+                    data = tail + chunk
+                    count += data.count(b"endfacet")
+                    tail = data[-7:]
+        return len(StlVolume.load_triangles(path))
+    except Exception:
+        return None
+
+
+def _record_invocation(
+    telemetry: Optional[List[Dict[str, Any]]],
+    input_file: str,
+    output_file: str,
+    backend: Optional[str],
+    result: "OpenScadProcess.ProcessResult"
+) -> None:
+    record = {
+        "input": os.path.basename(input_file),
+        "output": os.path.basename(output_file),
+        "backend": backend,
+        **result.usage(),
+        "outputBytes": os.path.getsize(output_file) if os.path.exists(output_file) else None,
+        "facets": _count_facets(output_file),
+    }
+    if telemetry is not None:
+        telemetry.append(record)
+    else:
+        _log_invocations([record], None, None)
+
+
+def _log_invocations(records: List[Dict[str, Any]], index: Optional[int], subPass: Optional[int]) -> None:
+    with _invocationLogLock:
+        for record in records:
+            _invocationLog.append({"test": index, "subPass": subPass, **record})
+
+
+def writeOpenScadMetrics(path: str) -> Optional[Dict[str, Any]]:
+    """Aggregate every OpenSCAD invocation of this run into a JSON file.
+
+    Returns the metrics, or None (writing nothing) if OpenSCAD never ran.
+    """
+    with _invocationLogLock:
+        records = list(_invocationLog)
+    if not records:
+        return None
+
+    def total(rows: List[Dict[str, Any]], field: str) -> float:
+        return sum(r[field] or 0 for r in rows)
+
+    def summary(rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+        rss = [r["peakRssBytes"] for r in rows if r["peakRssBytes"] is not None]
+        return {
+            "invocations": len(rows),
+            "failed": sum(1 for r in rows if r["returncode"] != 0),
+            "timedOut": sum(1 for r in rows if r["timedOut"]),
+            "failures": dict(Counter(r["failure"] for r in rows if r.get("failure"))),
+            "wallSeconds": total(rows, "wallSeconds"),
+            "cpuSeconds": total(rows, "userSeconds") + total(rows, "systemSeconds"),
+            "maxPeakRssBytes": max(rss) if rss else None,
+            "outputBytes": int(total(rows, "outputBytes")),
+            "facets": int(total(rows, "facets")),
+        }
+
+    perTest: Dict[str, List[Dict[str, Any]]] = {}
+    for r in records:
+        perTest.setdefault("other" if r["test"] is None else str(r["test"]), []).append(r)
+    metrics = {
+        "totals": summary(records),
+        "perTest": {test: summary(rows) for test, rows in perTest.items()},
+        "slowest": sorted(records, key=lambda r: r["wallSeconds"], reverse=True)[:20],
+        "largestRss": sorted(records, key=lambda r: r["peakRssBytes"] or 0, reverse=True)[:20],
+    }
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(metrics, f, indent=2)
+    return metrics
+
+
+def _render_stl_to_png(
+    stl_path: str,
+    png_path: str,
+    after: Iterable[Future] = (),
+    telemetry: Optional[List[Dict[str, Any]]] = None,
+    limits: Optional[OpenScadProcess.Limits] = None
+) -> Future:
+    """Queue a PNG render of an exported mesh file with an off-axis camera.
+
+    The future yields _render_mesh_png's error message, or None.
+    """
+    return OpenScadScheduler.getScheduler().submit(
+        _render_mesh_png,
+        [stl_path],
+        png_path,
         f'import("{os.path.basename(stl_path)}");',
-        png_path
+        telemetry=telemetry,
+        limits=limits,
+        after=after
     )
-    
-    # Clean up the temporary SCAD file
+
+
+def _render_mesh_png(
+    mesh_paths: List[str],
+    png_path: str,
+    fallbackScad: str,
+    cameraArg: str = MeshRasterizer.DEFAULT_CAMERA,
+    telemetry: Optional[List[Dict[str, Any]]] = None,
+    limits: Optional[OpenScadProcess.Limits] = None
+) -> Optional[str]:
+    """Draw meshes already on disk to PNG without launching OpenSCAD.
+
+    The first mesh is drawn in the face color and later ones in the overlay
+    red where they are in front of it. Falls back to an OpenSCAD render of
+    fallbackScad when NumPy/Pillow are missing or rasterizing fails for any
+    reason. Never raises: returns an error message if no image could be
+    drawn, None otherwise.
+    """
+    if not all(os.path.exists(p) for p in mesh_paths):
+        print(f"Warning: cannot render {os.path.basename(png_path)}, mesh missing")
+        return None
+    if MeshRasterizer.available():
+        try:
+            colors = [MeshRasterizer.FACE_COLOR] + [MeshRasterizer.OVERLAY_COLOR] * (len(mesh_paths) - 1)
+            layers = [(StlVolume.load_triangles(p), c) for p, c in zip(mesh_paths, colors)]
+            MeshRasterizer.render_png(layers, png_path, cameraArg)
+            return None
+        except Exception as e:
+            print(f"Warning: rasterizing {os.path.basename(png_path)} failed ({e!r}); using OpenSCAD")
     try:
-        os.remove(temp_scad)
-    except OSError:
-        pass
+        _render_png(fallbackScad, png_path, cameraArg, telemetry, limits)
+    except Exception as e:
+        message = f"Drawing {os.path.basename(png_path)} failed: {e!r}"
+        print(f"Warning: {message}")
+        return message
+    return None
 
 
 def render_scadText_to_png(scad_content: str, png_path: str, cameraArg: str = "--camera=10,10,10,55,0,25,100") -> None:
     """Render SCAD content to PNG using OpenSCAD with an off-axis camera."""
+    OpenScadScheduler.getScheduler().submit(_render_png, scad_content, png_path, cameraArg).result()
+
+
+def _render_png(
+    scad_content: str,
+    png_path: str,
+    cameraArg: str = "--camera=10,10,10,55,0,25,100",
+    telemetry: Optional[List[Dict[str, Any]]] = None,
+    limits: Optional[OpenScadProcess.Limits] = None
+) -> None:
+    """Run the OpenSCAD PNG render; called on a scheduler slot.
+
+    Failures only print a warning: a missing image never fails a test.
+    """
+    limits = limits or _resource_limits()
     # Create a temporary SCAD file with the provided content
     temp_scad = png_path.replace(".png", "temp.scad")
     with open(temp_scad, "w", encoding="utf-8") as f:
@@ -407,9 +1216,8 @@ def render_scadText_to_png(scad_content: str, png_path: str, cameraArg: str = "-
     # Use off-axis camera: positioned at (10, 10, 10) looking at origin
     # Format: --camera=x,y,z,rot_x,rot_y,rot_z,distance
     # We'll use auto-center and a good viewing angle
-    result = subprocess.run(
-        [
-            openScadPath,
+    result = OpenScadProcess.run(
+        _png_command() + [
             "--autocenter",
             "--viewall",
             cameraArg,
@@ -418,12 +1226,13 @@ def render_scadText_to_png(scad_content: str, png_path: str, cameraArg: str = "-
             "-o", os.path.basename(png_path),
             os.path.basename(temp_scad)
         ],
-        capture_output=True,
-        text=True,
-        encoding="utf-8",
-        errors="replace",
-        cwd=os.path.dirname(png_path)
+        cwd=os.path.dirname(png_path),
+        limits=limits
     )
+    _record_invocation(telemetry, temp_scad, png_path, None, result)
+    if result.failure in ("timeout", "cpu", "oom", "crash"):
+        print(f"Warning: {_describe_failure(result, limits)} rendering {os.path.basename(png_path)}")
+        return
     if result.returncode != 0:
         print(f"Warning: OpenSCAD PNG rendering returned non-zero exit code")
         if result.stderr:
@@ -0,0 +1,187 @@
+"""ASCII STL parser benchmark: StlVolume's parsers against C-level NumPy parses.
+
+Writes a UV sphere of the requested size as ASCII STL (~50 MB by default),
+then times, best of --repeat runs:
+
+    line        StlVolume._parse_ascii_stl, the line-by-line fallback
+    bulk        StlVolume._parse_ascii_stl_array, the default parser
+    fromstring  keywords stripped, then np.fromstring(sep=" ") per chunk
+    loadtxt     keywords stripped, then np.loadtxt per chunk
+    floor       bytes.split() plus one float64 conversion of the number
+                tokens per chunk, without validation or winding correction
+
+Every candidate reads the file in the same 'endfacet'-aligned chunks. floor
+is the least work any parser built on Python's float conversion can do, so
+bulk's distance to it is all that layout checks and winding cost. The two
+C-level parses are slower than both, because NumPy's per-number text
+conversion costs more than bytes.split() plus float(). All parsers must
+return identical triangles:
+
+    python bench/bench_ascii_parse.py
+    python bench/bench_ascii_parse.py --triangles 50000 --out ascii.json
+"""
+import argparse
+import io
+import json
+import mmap
+import os
+import platform
+import sys
+import tempfile
+import time
+import warnings
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+_HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, _HERE)
+sys.path.insert(0, os.path.dirname(_HERE))
+
+import meshgen  # noqa: E402
+import StlVolume  # noqa: E402
+
+# Keyword spellings as OpenSCAD writes them, longest first so "endfacet" is
+# stripped before anything that could match inside it.
+_KEYWORDS = (b"endfacet", b"endloop", b"outer loop", b"facet normal", b"vertex")
+
+
+def _chunks(path: str) -> Iterator[bytes]:
+    # Same chunking as StlVolume._iter_ascii_stl_chunks.
+    with open(path, "rb") as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    with mm:
+        pos = mm.find(b"\n") + 1
+        end = mm.rfind(b"endfacet") + len(b"endfacet")
+        while pos < end:
+            stop = end
+            if end - pos > StlVolume._ASCII_CHUNK_BYTES:
+                stop = mm.rfind(b"endfacet", pos, pos + StlVolume._ASCII_CHUNK_BYTES) + len(b"endfacet")
+            yield mm[pos:stop]
+            pos = stop
+
+
+def _stripped(chunk: bytes) -> Tuple[bytes, int]:
+    n = chunk.count(b"endfacet")
+    if not (
+        chunk.count(b"facet normal") == n
+        and chunk.count(b"outer loop") == n
+        and chunk.count(b"endloop") == n
+        and chunk.count(b"vertex") == 3 * n
+    ):
+        raise ValueError("irregular facet layout")
+    for word in _KEYWORDS:
+        chunk = chunk.replace(word, b" ")
+    return chunk, n
+
+
+def _orient(vals: np.ndarray, n: int) -> np.ndarray:
+    if vals.size != 12 * n:
+        raise ValueError("irregular facet layout")
+    vals = vals.reshape(n, 12)
+    return StlVolume._orient_facets(vals[:, :3], vals[:, 3:].reshape(-1, 3, 3))
+
+
+def parse_fromstring(path: str) -> np.ndarray:
+    out = []
+    for chunk in _chunks(path):
+        text, n = _stripped(chunk)
+        with warnings.catch_warnings():
+            # Unparsable text only warns, so make it an error.
+            warnings.simplefilter("error", DeprecationWarning)
+            out.append(_orient(np.fromstring(text, dtype=np.float64, sep=" "), n))
+    return np.concatenate(out)
+
+
+def parse_loadtxt(path: str) -> np.ndarray:
+    out = []
+    for chunk in _chunks(path):
+        text, n = _stripped(chunk)
+        out.append(_orient(np.loadtxt(io.BytesIO(text), dtype=np.float64), n))
+    return np.concatenate(out)
+
+
+def parse_floor(path: str) -> np.ndarray:
+    out = []
+    for chunk in _chunks(path):
+        toks = chunk.split()
+        vals = np.empty((len(toks) // StlVolume._ASCII_FACET_TOKENS, 12))
+        for k, col in enumerate(StlVolume._ASCII_NUMBER_COLUMNS):
+            vals[:, k] = np.array(toks[col::StlVolume._ASCII_FACET_TOKENS], dtype=np.float64)
+        out.append(vals)
+    return np.concatenate(out)
+
+
+_PARSERS: Dict[str, Callable[[str], np.ndarray]] = {
+    "line": lambda path: np.asarray(StlVolume._parse_ascii_stl(path), dtype=np.float64),
+    "bulk": StlVolume._parse_ascii_stl_array,
+    "fromstring": parse_fromstring,
+    "loadtxt": parse_loadtxt,
+    "floor": parse_floor,
+}
+
+
+def run(args: argparse.Namespace) -> Dict[str, object]:
+    work = tempfile.mkdtemp(prefix="ascii_parse_bench_")
+    path = os.path.join(work, "sphere_ascii.stl")
+    verts, faces, _ = meshgen.uv_sphere(args.triangles)
+    meshgen.write_ascii_stl(path, verts, faces)
+    del verts
+    size = os.path.getsize(path)
+    print(f"{len(faces)} triangles, {size / 1e6:.1f} MB ASCII")
+    results: List[Dict[str, object]] = []
+    reference = None
+    mismatches = 0
+    try:
+        for name, parse in _PARSERS.items():
+            best = float("inf")
+            for _ in range(args.repeat):
+                t0 = time.perf_counter()
+                tris = parse(path)
+                best = min(best, time.perf_counter() - t0)
+            if name == "bulk":
+                reference = tris
+            # floor returns the raw numbers, which skip winding correction.
+            same = name == "floor" or reference is None or np.array_equal(tris, reference)
+            mismatches += not same
+            results.append({"parser": name, "seconds": best, "mb_per_sec": size / 1e6 / best, "identical": same})
+            del tris
+    finally:
+        os.remove(path)
+        os.rmdir(work)
+    line = results[0]["seconds"]
+    print(f"{'parser':<12}{'seconds':>9}{'MB/s':>8}{'vs line':>9}")
+    for row in results:
+        row["speedup_vs_line"] = line / row["seconds"]
+        flag = "" if row["identical"] else "  MISMATCH"
+        print(f"{row['parser']:<12}{row['seconds']:9.3f}{row['mb_per_sec']:8.1f}{row['speedup_vs_line']:8.2f}x{flag}")
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "triangles": int(len(faces)),
+        "file_bytes": size,
+        "mismatches": mismatches,
+        "results": results,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--triangles", type=int, default=240_000, help="sphere size (~50 MB ASCII by default)")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--out", help="write results JSON here")
+    args = parser.parse_args(argv)
+    report = run(args)
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+    if report["mismatches"]:
+        print(f"{report['mismatches']} parser(s) disagree with bulk", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,234 @@
+"""Throughput and memory benchmark for StlVolume.
+
+Generates parametric meshes (UV spheres, nested hollow shells, grids of
+disjoint cubes, T-junction cubes) as binary and ASCII STL, measures each
+file with StlVolume in a fresh process, checks the volume against the
+analytic value and writes the per-stage timings, triangles/sec and peak
+RSS to JSON so results can be compared across versions:
+
+    python bench/bench_stlvolume.py --out bench_results.json
+    python bench/bench_stlvolume.py --quick
+    python bench/bench_stlvolume.py --compare old.json new.json
+
+Exits non-zero if any volume is off by more than --rtol.
+"""
+import argparse
+import json
+import math
+import multiprocessing
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import warnings
+from typing import Dict, List, Optional
+
+import numpy as np
+
+_HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, _HERE)
+sys.path.insert(0, os.path.dirname(_HERE))
+
+import meshgen  # noqa: E402
+import StlVolume  # noqa: E402
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+_SPHERE_SIZES = [1_000, 10_000, 100_000, 1_000_000, 5_000_000]
+_QUICK_SPHERE_SIZES = [1_000, 10_000, 100_000]
+# ASCII is ~5x larger and slower to write; above this only binary is generated.
+_ASCII_MAX_TRIANGLES = 1_000_000
+
+
+def _cases(quick: bool) -> List[Dict[str, object]]:
+    cases = [
+        {"name": f"sphere_{n}", "make": ("uv_sphere", n)}
+        for n in (_QUICK_SPHERE_SIZES if quick else _SPHERE_SIZES)
+    ]
+    cases.append({"name": "shells_25", "make": ("nested_shells", 25)})
+    cases.append({"name": "cubes_1000", "make": ("cube_grid", 1000)})
+    if not quick:
+        cases.append({"name": "cubes_10000", "make": ("cube_grid", 10000)})
+    cases.append({"name": "tjunction_1000", "make": ("t_junction_grid", 1000)})
+    return cases
+
+
+def _peak_rss_bytes() -> Optional[int]:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _run_case(path: str, mode: str, trace_memory: bool) -> Dict[str, object]:
+    # Runs in a fresh child so peak RSS belongs to this measurement alone.
+    baseline = _peak_rss_bytes()
+    with StlVolume.StageProfiler(trace_memory=trace_memory) as profiler, \
+            warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        t0 = time.perf_counter()
+        volume = StlVolume.calculate_stl_volume(path, mode=mode, profiler=profiler)
+        seconds = time.perf_counter() - t0
+    return {
+        "volume": volume,
+        "seconds": seconds,
+        "warnings": len(caught),
+        "stages": profiler.to_dict(),
+        "baseline_rss_bytes": baseline,
+        "peak_rss_bytes": _peak_rss_bytes(),
+    }
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=_HERE, capture_output=True, text=True, timeout=10,
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def run(args: argparse.Namespace) -> Dict[str, object]:
+    work = args.workdir or tempfile.mkdtemp(prefix="stlvolume_bench_")
+    os.makedirs(work, exist_ok=True)
+    formats = args.formats.split(",")
+    modes = args.modes.split(",")
+    # Linux carries ru_maxrss across fork and exec, so children must not
+    # descend from this process once it holds generated meshes.
+    methods = multiprocessing.get_all_start_methods()
+    ctx = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+    results: List[Dict[str, object]] = []
+    failures = 0
+    with ctx.Pool(processes=1, maxtasksperchild=1) as pool:
+        for case in _cases(args.quick):
+            if args.filter and args.filter not in case["name"]:
+                continue
+            func, param = case["make"]
+            t0 = time.perf_counter()
+            verts, faces, expected = getattr(meshgen, func)(param)
+            for fmt in formats:
+                if fmt == "ascii" and len(faces) > _ASCII_MAX_TRIANGLES:
+                    continue
+                path = os.path.join(work, f"{case['name']}_{fmt}.stl")
+                if not os.path.exists(path):
+                    writer = meshgen.write_binary_stl if fmt == "binary" else meshgen.write_ascii_stl
+                    writer(path, verts, faces)
+                for mode in modes:
+                    res = pool.apply(_run_case, (path, mode, args.trace_memory))
+                    rel = abs(res["volume"] - expected) / abs(expected)
+                    ok = rel <= args.rtol
+                    failures += not ok
+                    row = {
+                        "case": case["name"],
+                        "format": fmt,
+                        "mode": mode,
+                        "triangles": int(len(faces)),
+                        "file_bytes": os.path.getsize(path),
+                        "expected_volume": expected,
+                        "volume": res["volume"],
+                        "rel_error": rel,
+                        "ok": ok,
+                        "seconds": res["seconds"],
+                        "triangles_per_sec": len(faces) / res["seconds"] if res["seconds"] > 0 else None,
+                        "peak_rss_bytes": res["peak_rss_bytes"],
+                        "baseline_rss_bytes": res["baseline_rss_bytes"],
+                        "warnings": res["warnings"],
+                        "stages": res["stages"],
+                    }
+                    results.append(row)
+                    _print_row(row)
+            del verts, faces
+            if not args.keep:
+                for fmt in formats:
+                    path = os.path.join(work, f"{case['name']}_{fmt}.stl")
+                    if os.path.exists(path):
+                        os.remove(path)
+            if args.verbose:
+                print(f"  ({case['name']} total {time.perf_counter() - t0:.1f}s)", file=sys.stderr)
+    if not args.keep and not args.workdir:
+        try:
+            os.rmdir(work)
+        except OSError:
+            pass
+    return {
+        "revision": _git_revision(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "trace_memory": args.trace_memory,
+        "rtol": args.rtol,
+        "failures": failures,
+        "results": results,
+    }
+
+
+def _print_row(row: Dict[str, object]) -> None:
+    rss = row["peak_rss_bytes"]
+    rss_s = f"{rss / 1e6:9.0f}" if rss is not None else f"{'-':>9}"
+    tps = row["triangles_per_sec"]
+    print(
+        f"{row['case']:<18}{row['format']:<7}{row['mode']:<10}{row['triangles']:>9}"
+        f"{row['seconds']:9.3f}s{(tps or 0) / 1e6:8.2f}M/s{rss_s}MB"
+        f"  rel={row['rel_error']:.1e} {'OK' if row['ok'] else 'FAIL'}",
+        flush=True,
+    )
+
+
+def compare(old_path: str, new_path: str) -> None:
+    """Print throughput and peak RSS ratios (new / old) for matching rows."""
+    with open(old_path) as f:
+        old = json.load(f)
+    with open(new_path) as f:
+        new = json.load(f)
+    key = lambda r: (r["case"], r["format"], r["mode"])  # noqa: E731
+    before = {key(r): r for r in old["results"]}
+    print(f"{old.get('revision')} -> {new.get('revision')}")
+    print(f"{'case':<18}{'format':<7}{'mode':<10}{'tri/s':>8}{'rss':>8}")
+    for r in new["results"]:
+        o = before.get(key(r))
+        if o is None:
+            continue
+        speed = r["triangles_per_sec"] / o["triangles_per_sec"] if o["triangles_per_sec"] else math.nan
+        rss = r["peak_rss_bytes"] / o["peak_rss_bytes"] if o["peak_rss_bytes"] and r["peak_rss_bytes"] else math.nan
+        print(f"{r['case']:<18}{r['format']:<7}{r['mode']:<10}{speed:7.2f}x{rss:7.2f}x")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--out", help="write results JSON here")
+    parser.add_argument("--quick", action="store_true", help="skip the 1M+ triangle cases")
+    parser.add_argument("--filter", help="only run cases whose name contains this")
+    parser.add_argument("--formats", default="binary,ascii")
+    parser.add_argument("--modes", default="robust,streaming")
+    parser.add_argument("--rtol", type=float, default=1e-5)
+    parser.add_argument("--trace-memory", action="store_true",
+                        help="record per-stage tracemalloc peaks (slows timings)")
+    parser.add_argument("--workdir", help="directory for generated STL files")
+    parser.add_argument("--keep", action="store_true", help="keep generated STL files")
+    parser.add_argument("--verbose", action="store_true")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"))
+    args = parser.parse_args(argv)
+    if args.compare:
+        compare(*args.compare)
+        return 0
+    report = run(args)
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+    if report["failures"]:
+        print(f"{report['failures']} volume check(s) failed", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
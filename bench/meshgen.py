@@ -0,0 +1,156 @@
+"""Parametric test meshes for the StlVolume benchmarks.
+
+Every generator returns (vertices, faces, expected_volume): float64 (n, 3)
+vertices, int32 (m, 3) faces wound outward (cavities inward), and the
+volume computed independently of StlVolume.
+"""
+import math
+from typing import Tuple
+
+import numpy as np
+
+Mesh = Tuple[np.ndarray, np.ndarray, float]
+
+_CUBE_CORNERS = np.array(
+    [[dx, dy, dz] for dx in (0, 1) for dy in (0, 1) for dz in (0, 1)], dtype=np.float64
+)
+# Outward-wound triangles over the corners above (index = dx*4 + dy*2 + dz).
+_CUBE_FACES = np.array(
+    [
+        [0, 1, 3], [0, 3, 2],
+        [4, 6, 7], [4, 7, 5],
+        [0, 4, 5], [0, 5, 1],
+        [2, 3, 7], [2, 7, 6],
+        [0, 2, 6], [0, 6, 4],
+        [1, 5, 7], [1, 7, 3],
+    ],
+    dtype=np.int32,
+)
+
+
+def uv_sphere(triangles: int, radius: float = 10.0) -> Mesh:
+    """Closed UV sphere with roughly the requested triangle count."""
+    nv = max(3, int(round(math.sqrt(triangles / 4.0))))
+    nu = 2 * nv
+    theta = np.pi * np.arange(1, nv) / nv
+    phi = 2.0 * np.pi * np.arange(nu) / nu
+    st, ct = np.sin(theta)[:, None], np.cos(theta)[:, None]
+    ring = np.stack(
+        [radius * st * np.cos(phi), radius * st * np.sin(phi), np.broadcast_to(radius * ct, (nv - 1, nu))],
+        axis=-1,
+    ).reshape(-1, 3)
+    verts = np.vstack([[0.0, 0.0, radius], ring, [0.0, 0.0, -radius]])
+    north, south = 0, len(verts) - 1
+    j = np.arange(nu)
+    jn = (j + 1) % nu
+    faces = [np.stack([np.full(nu, north), 1 + j, 1 + jn], axis=1)]
+    for i in range(nv - 2):
+        a = 1 + i * nu + j
+        b = 1 + (i + 1) * nu + j
+        c = 1 + (i + 1) * nu + jn
+        d = 1 + i * nu + jn
+        faces.append(np.stack([a, b, d], axis=1))
+        faces.append(np.stack([b, c, d], axis=1))
+    last = 1 + (nv - 2) * nu
+    faces.append(np.stack([last + j, np.full(nu, south), last + jn], axis=1))
+    return verts, np.vstack(faces).astype(np.int32), _uv_sphere_volume(radius, nu, nv)
+
+
+def _uv_sphere_volume(radius: float, nu: int, nv: int) -> float:
+    # Exact volume of the inscribed polyhedron: by symmetry it is nu copies
+    # of one longitude wedge, each a fan of tetrahedra from the centre.
+    def p(t: float, f: float) -> Tuple[float, float, float]:
+        return (math.sin(t) * math.cos(f), math.sin(t) * math.sin(f), math.cos(t))
+
+    def det(a, b, c) -> float:
+        return (
+            a[0] * (b[1] * c[2] - b[2] * c[1])
+            - a[1] * (b[0] * c[2] - b[2] * c[0])
+            + a[2] * (b[0] * c[1] - b[1] * c[0])
+        )
+
+    f0, f1 = 0.0, 2.0 * math.pi / nu
+    wedge = 0.0
+    for i in range(nv):
+        t0, t1 = math.pi * i / nv, math.pi * (i + 1) / nv
+        a, b, c, d = p(t0, f0), p(t1, f0), p(t1, f1), p(t0, f1)
+        if i > 0:
+            wedge += det(a, b, d)
+        if i < nv - 1:
+            wedge += det(b, c, d)
+    return nu * wedge * radius ** 3 / 6.0
+
+
+def nested_shells(shells: int, size: float = 100.0, wall: float = 1.0) -> Mesh:
+    """Concentric cube shells alternating solid and cavity."""
+    verts, faces = [], []
+    volume = 0.0
+    for k in range(shells):
+        s = size - 2.0 * wall * k
+        if s <= 0:
+            break
+        f = _CUBE_FACES if k % 2 == 0 else _CUBE_FACES[:, [0, 2, 1]]
+        faces.append(f + 8 * len(verts))
+        verts.append(_CUBE_CORNERS * s + wall * k)
+        volume += s ** 3 if k % 2 == 0 else -(s ** 3)
+    return np.vstack(verts), np.vstack(faces).astype(np.int32), volume
+
+
+def cube_grid(count: int, size: float = 1.0, gap: float = 0.5) -> Mesh:
+    """count disjoint axis-aligned cubes laid out on a square grid."""
+    side = int(math.ceil(math.sqrt(count)))
+    k = np.arange(count)
+    origin = np.stack([(k % side) * (size + gap), (k // side) * (size + gap), np.zeros(count)], axis=1)
+    verts = (origin[:, None, :] + _CUBE_CORNERS[None] * size).reshape(-1, 3)
+    faces = (_CUBE_FACES[None] + 8 * k[:, None, None]).reshape(-1, 3)
+    return verts, faces.astype(np.int32), count * size ** 3
+
+
+def t_junction_grid(count: int, size: float = 1.0, gap: float = 0.5) -> Mesh:
+    """Cubes whose top face is split at an edge midpoint the side face lacks.
+
+    The surface is geometrically closed, so the volume is still count *
+    size**3, but every cube has boundary edges along the T-junction.
+    """
+    corners = np.vstack([_CUBE_CORNERS, [[0.5, 0.0, 1.0]]])
+    # Top face (z = 1: corners 1, 3, 5, 7) fanned from the midpoint 8 of edge 1-5.
+    top = np.array([[8, 5, 7], [8, 7, 3], [8, 3, 1]], dtype=np.int32)
+    keep = [f for f in _CUBE_FACES.tolist() if not all(i in (1, 3, 5, 7) for i in f)]
+    cube = np.vstack([np.array(keep, dtype=np.int32), top])
+    side = int(math.ceil(math.sqrt(count)))
+    k = np.arange(count)
+    origin = np.stack([(k % side) * (size + gap), (k // side) * (size + gap), np.zeros(count)], axis=1)
+    verts = (origin[:, None, :] + corners[None] * size).reshape(-1, 3)
+    faces = (cube[None] + len(corners) * k[:, None, None]).reshape(-1, 3)
+    return verts, faces.astype(np.int32), count * size ** 3
+
+
+def write_binary_stl(path: str, verts: np.ndarray, faces: np.ndarray) -> None:
+    tris = verts[faces].astype(np.float32)
+    rec = np.zeros(len(tris), dtype=[("normal", "<f4", (3,)), ("verts", "<f4", (3, 3)), ("attr", "<u2")])
+    rec["verts"] = tris
+    n = np.cross(tris[:, 1] - tris[:, 0], tris[:, 2] - tris[:, 0])
+    length = np.linalg.norm(n, axis=1, keepdims=True)
+    rec["normal"] = n / np.where(length > 0, length, 1.0)
+    with open(path, "wb") as f:
+        f.write(b"StlVolume benchmark".ljust(80, b" "))
+        f.write(np.uint32(len(tris)).tobytes())
+        rec.tofile(f)
+
+
+def write_ascii_stl(path: str, verts: np.ndarray, faces: np.ndarray, chunk: int = 1 << 16) -> None:
+    template = (
+        "facet normal %.9g %.9g %.9g\n outer loop\n"
+        "  vertex %.9g %.9g %.9g\n  vertex %.9g %.9g %.9g\n  vertex %.9g %.9g %.9g\n"
+        " endloop\nendfacet\n"
+    )
+    with open(path, "w", encoding="ascii") as f:
+        f.write("solid bench\n")
+        for s in range(0, len(faces), chunk):
+            tris = verts[faces[s:s + chunk]]
+            n = np.cross(tris[:, 1] - tris[:, 0], tris[:, 2] - tris[:, 0])
+            length = np.linalg.norm(n, axis=1, keepdims=True)
+            n = n / np.where(length > 0, length, 1.0)
+            rows = np.hstack([n, tris.reshape(-1, 9)])
+            f.write("".join(template % tuple(r) for r in rows.tolist()))
+        f.write("endsolid bench\n")
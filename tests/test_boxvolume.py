@@ -0,0 +1,60 @@
+import BoxVolume
+
+
+def _box(lo, hi):
+    return (tuple(float(c) for c in lo), tuple(float(c) for c in hi))
+
+
+def test_union_of_overlapping_boxes():
+    # Two 2-unit cubes overlapping in a 1 x 2 x 2 slab.
+    assert BoxVolume.union_volume([_box((0, 0, 0), (2, 2, 2)), _box((1, 0, 0), (3, 2, 2))]) == 12.0
+
+
+def test_union_of_touching_boxes():
+    boxes = [_box((0, 0, 0), (1, 1, 1)), _box((1, 0, 0), (2, 1, 1)), _box((0, 1, 0), (1, 2, 1))]
+    assert BoxVolume.union_volume(boxes) == 3.0
+
+
+def test_union_of_nested_boxes():
+    assert BoxVolume.union_volume([_box((0, 0, 0), (4, 4, 4)), _box((1, 1, 1), (2, 2, 2))]) == 64.0
+
+
+def test_volumes_of_two_unions_and_their_intersection():
+    a = [_box((0, 0, 0), (2, 2, 2))]
+    b = [_box((1, 1, 1), (3, 3, 3)), _box((1.5, 1.5, 1.5), (2.5, 2.5, 2.5))]
+    assert BoxVolume.volumes(a, b) == (8.0, 8.0, 1.0)
+
+
+def test_empty_and_inverted_corners_are_normalized():
+    assert BoxVolume.union_volume([_box((2, 2, 2), (0, 0, 0)), _box((0, 0, 0), (0, 5, 5))]) == 8.0
+
+
+def _l_prism():
+    # An L-shaped outline extruded by 1, volume 3, faces counter-clockwise
+    # seen from outside; the top and bottom are single six-sided faces.
+    outline = [(0, 0), (2, 0), (2, 1), (1, 1), (1, 2), (0, 2)]
+    points = [(x, y, 0) for x, y in outline] + [(x, y, 1) for x, y in outline]
+    faces = [list(range(6, 12)), list(range(5, -1, -1))]
+    faces += [[i, (i + 1) % 6, (i + 1) % 6 + 6, i + 6] for i in range(6)]
+    return points, faces
+
+
+def test_polyhedron_boxes_accept_both_windings():
+    points, faces = _l_prism()
+    for loops in (faces, [f[::-1] for f in faces]):
+        boxes = BoxVolume.orthogonal_polyhedron_boxes(points, loops)
+        assert boxes is not None
+        assert BoxVolume.union_volume(boxes) == 3.0
+
+
+def test_polyhedron_boxes_reject_mixed_winding_and_open_meshes():
+    points, faces = _l_prism()
+    assert BoxVolume.orthogonal_polyhedron_boxes(points, faces[:1] + [faces[1][::-1]] + faces[2:]) is None
+    assert BoxVolume.orthogonal_polyhedron_boxes(points, faces[1:]) is None
+
+
+def test_polyhedron_boxes_reject_slanted_faces():
+    points, faces = _l_prism()
+    points = list(points)
+    points[6] = (0, 0, 1.5)
+    assert BoxVolume.orthogonal_polyhedron_boxes(points, faces) is None
@@ -0,0 +1,77 @@
+import os
+import signal
+import sys
+import time
+
+import pytest
+
+import OpenScadProcess
+
+posix = pytest.mark.skipif(not hasattr(os, "wait4"), reason="rlimits and wait4 need POSIX")
+
+
+def _python(code):
+    return [sys.executable, "-c", code]
+
+
+def test_successful_run_reports_usage():
+    result = OpenScadProcess.run(_python("print('ok')"))
+    assert result.failure is None
+    assert result.stdout.strip() == "ok"
+    assert result.wallSeconds > 0
+
+
+def test_non_zero_exit_is_an_error():
+    result = OpenScadProcess.run(_python("import sys; sys.stderr.write('syntax'); sys.exit(1)"))
+    assert result.failure == "error"
+    assert "syntax" in result.stderr
+
+
+def test_wall_timeout_kills_the_child():
+    t0 = time.monotonic()
+    result = OpenScadProcess.run(_python("import time; time.sleep(30)"), limits=OpenScadProcess.Limits(wallSeconds=0.5))
+    assert result.timedOut and result.failure == "timeout"
+    assert time.monotonic() - t0 < 10
+
+
+@posix
+def test_wall_timeout_takes_down_the_process_group():
+    # The child forks a grandchild that would outlive it; killing the group
+    # must not leave the run waiting on it.
+    code = "import os, time\nif os.fork() == 0:\n    time.sleep(30)\nelse:\n    time.sleep(30)"
+    t0 = time.monotonic()
+    result = OpenScadProcess.run(_python(code), timeout=0.5)
+    assert result.failure == "timeout"
+    assert time.monotonic() - t0 < 10
+
+
+@posix
+def test_cpu_limit_is_classified_as_cpu():
+    result = OpenScadProcess.run(_python("while True: pass"), limits=OpenScadProcess.Limits(wallSeconds=30, cpuSeconds=1))
+    assert result.failure == "cpu"
+    assert result.userSeconds >= 0.5
+
+
+@posix
+def test_memory_limit_is_classified_as_oom():
+    # Reports the failed allocation the way OpenSCAD's C++ runtime does.
+    code = "import sys\ntry:\n    x = bytearray(2 * 1024 ** 3)\nexcept MemoryError:\n    sys.exit('std::bad_alloc')"
+    limits = OpenScadProcess.Limits(wallSeconds=30, memoryBytes=512 * 1024 * 1024)
+    result = OpenScadProcess.run(_python(code), limits=limits)
+    assert result.failure == "oom"
+
+
+def test_classify():
+    def result(code, stderr="", user=None):
+        return OpenScadProcess.ProcessResult(code, "", stderr, False, 1.0, user, 0.0)
+
+    assert OpenScadProcess.classify(result(0)) is None
+    assert OpenScadProcess.classify(result(1)) == "error"
+    assert OpenScadProcess.classify(result(1, "std::bad_alloc")) == "oom"
+    assert OpenScadProcess.classify(result(-signal.SIGSEGV)) == "crash"
+    assert OpenScadProcess.classify(result(0xC0000005)) == "crash"
+    assert OpenScadProcess.classify(result(0xC0000017)) == "oom"
+    if hasattr(signal, "SIGKILL"):
+        limits = OpenScadProcess.Limits(cpuSeconds=2)
+        assert OpenScadProcess.classify(result(-signal.SIGKILL, user=2.5), limits) == "cpu"
+        assert OpenScadProcess.classify(result(-signal.SIGKILL, user=0.1), limits) == "oom"
@@ -0,0 +1,302 @@
+import tracemalloc
+import warnings
+import zipfile
+
+import numpy as np
+import pytest
+
+import meshgen
+import StlVolume
+
+
+def _sliver_cube(size: float = 10.0, offset: float = 1e-7):
+    # A cube whose top face is fanned around a point just inside one edge,
+    # so one of its triangles is a thin but valid sliver.
+    corners = meshgen._CUBE_CORNERS * size
+    faces = [f for f in meshgen._CUBE_FACES.tolist() if not all(corners[i][2] == size for i in f)]
+    verts = np.vstack([corners, [[size / 2, offset, size]]])
+    apex = len(verts) - 1
+    # Top corners (dx*4 + dy*2 + 1) counter-clockwise seen from above.
+    ring = [1, 5, 7, 3]
+    faces += [[ring[i], ring[(i + 1) % 4], apex] for i in range(4)]
+    return verts, np.array(faces, dtype=np.int32), size ** 3
+
+
+def test_thin_valid_sliver_is_kept(tmp_path):
+    verts, faces, expected = _sliver_cube()
+    path = str(tmp_path / "sliver.stl")
+    meshgen.write_binary_stl(path, verts, faces)
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        report = StlVolume._measure(path, None, "robust")
+    assert report.triangle_count == len(faces)
+    assert report.watertight
+    assert abs(report.volume - expected) <= 1e-6 * expected
+
+
+
+def test_voxel_estimate_memory_is_bounded_on_large_triangles():
+    # 600 stacked, slightly tilted 100 x 100 slabs: every top and bottom
+    # triangle covers half of all ray columns, which used to need one
+    # (triangle, column) pair per covered column at once (OOM here).
+    count = 600
+    slab = meshgen._CUBE_CORNERS * np.array([100.0, 100.0, 0.5])
+    verts = slab[None] + np.stack([np.zeros(count), np.zeros(count), np.arange(count)], axis=1)[:, None]
+    verts[:, :, 2] += verts[:, :, 0] * 1e-4
+    tris = verts[:, meshgen._CUBE_FACES].reshape(-1, 3, 3)
+    tracemalloc.start()
+    try:
+        volume, error = StlVolume._voxel_estimate(tris, StlVolume._VOXEL_RESOLUTION)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    assert peak < 400 * 2 ** 20
+    assert abs(volume - count * 100 * 100 * 0.5) <= error
+
+
+def test_voxel_error_bound_is_tight_and_holds():
+    # A curved surface and boxes whose faces fall between the ray centres.
+    for verts, faces, expected in (meshgen.uv_sphere(20000), meshgen.cube_grid(3), meshgen.nested_shells(2)):
+        volume, error = StlVolume._voxel_estimate(verts[faces], StlVolume._VOXEL_RESOLUTION)
+        assert abs(volume - expected) <= error
+    verts, faces, expected = meshgen.uv_sphere(20000)
+    volume, error = StlVolume._voxel_estimate(verts[faces], StlVolume._VOXEL_RESOLUTION)
+    assert error < 0.005 * expected
+
+
+def test_voxel_check_is_reported_beside_the_exact_volume(tmp_path):
+    # A cube with two facets written twice: non-manifold, and its exact sum
+    # counts the duplicated facets' tetrahedra again (28/3 instead of 8).
+    path = str(tmp_path / "duplicated.stl")
+    meshgen.write_binary_stl(path, meshgen._CUBE_CORNERS * 2.0, np.vstack([meshgen._CUBE_FACES, meshgen._CUBE_FACES[:2]]))
+    with pytest.warns(RuntimeWarning, match="disagrees with voxel estimate"):
+        report = StlVolume._measure(path, None, "robust")
+    assert abs(report.volume - 28.0 / 3.0) < 1e-9
+    assert report.volume_source == "exact" and report.volume_error == 0.0
+    assert abs(report.voxel_volume - 8.0) <= report.voxel_error
+    restored = StlVolume.MeshReport.from_dict(report.to_dict())
+    assert (restored.voxel_volume, restored.voxel_error) == (report.voxel_volume, report.voxel_error)
+
+    meshgen.write_binary_stl(path, meshgen._CUBE_CORNERS * 2.0, meshgen._CUBE_FACES)
+    report = StlVolume._measure(path, None, "robust")
+    assert report.voxel_volume is None and report.voxel_error is None
+    assert StlVolume._measure(path, None, "voxel").volume_source == "voxel"
+
+
+def _two_cubes(second: float, offset: float, flip_second: bool):
+    # A 5-unit cube plus a second cube at (offset, 0, 0), optionally wound
+    # inward.
+    verts = np.vstack([meshgen._CUBE_CORNERS * 5.0, meshgen._CUBE_CORNERS * second + [offset, 0.0, 0.0]])
+    faces = np.vstack([meshgen._CUBE_FACES, meshgen._CUBE_FACES + 8])
+    if flip_second:
+        faces[12:] = faces[12:, ::-1]
+    return verts, faces
+
+
+def test_streaming_rejects_oppositely_wound_shells(tmp_path):
+    # Every half-edge pairs up, but the inverted 2-unit cube's signed volume
+    # would be subtracted from the 5-unit one's (117 instead of 133).
+    path = str(tmp_path / "inverted.stl")
+    meshgen.write_binary_stl(path, *_two_cubes(2.0, 6.0, flip_second=True))
+    assert StlVolume._streaming_report(path) is None
+    report = StlVolume._measure(path, None, "streaming")
+    assert abs(report.volume - 133.0) < 1e-6
+
+
+def test_streaming_matches_robust_on_randomly_inverted_cubes(tmp_path):
+    rng = np.random.default_rng(0)
+    for case in range(20):
+        sizes = rng.uniform(0.2, 5.0, size=4)
+        offsets = np.cumsum(sizes + rng.uniform(0.1, 2.0, size=4)) - sizes
+        verts = np.vstack([meshgen._CUBE_CORNERS * s + [x, 0.0, 0.0] for s, x in zip(sizes, offsets)])
+        faces = np.vstack([
+            meshgen._CUBE_FACES[:, ::-1] if flip else meshgen._CUBE_FACES
+            for flip in rng.random(4) < 0.3
+        ]) + np.repeat(8 * np.arange(4), 12)[:, None]
+        path = str(tmp_path / f"cubes{case}.stl")
+        meshgen.write_binary_stl(path, verts, faces)
+        expected = float((sizes ** 3).sum())
+        assert abs(StlVolume._measure(path, None, "streaming").volume - expected) <= 1e-6 * expected
+
+
+def test_streaming_keeps_cavities(tmp_path):
+    path = str(tmp_path / "hollow.stl")
+    meshgen.write_binary_stl(path, *_two_cubes(2.0, 1.0, flip_second=True))
+    report = StlVolume._streaming_report(path)
+    assert report is not None and abs(report.volume - 117.0) < 1e-6
+
+
+def test_pool_is_resized_for_a_different_worker_count():
+    try:
+        first = StlVolume._get_pool(2)
+        assert StlVolume._get_pool(None) is first
+        assert StlVolume._get_pool(2) is first
+        resized = StlVolume._get_pool(3)
+        assert resized is not first and resized._max_workers == 3
+    finally:
+        StlVolume._discard_pool(StlVolume._get_pool(None))
+
+
+def _ascii_facet(normal, corners, newline="\n", indent="  "):
+    text = f"{indent}facet normal {normal[0]} {normal[1]} {normal[2]}{newline}{indent}  outer loop{newline}"
+    for x, y, z in corners:
+        text += f"{indent}    vertex {x:e} {y} {z}{newline}"
+    return text + f"{indent}  endloop{newline}{indent}endfacet{newline}"
+
+
+def test_bulk_ascii_parser_matches_line_parser(tmp_path):
+    # The second facet's normal disagrees with its winding, so it is flipped.
+    corners = ((0.0, 0.0, 0.0), (0.0, 1.0, 0.0), (1.0, 0.0, 0.0))
+    facets = "".join(_ascii_facet(n, corners) for n in ((0, 0, -1), (0, 0, 1)))
+    regular = {
+        "plain": "solid x\n" + facets + "endsolid x\n",
+        "facet_in_name": "solid my facet part\n" + facets + "endsolid my facet part\n",
+        "crlf": "solid x\r\n"
+        + "".join(_ascii_facet(n, corners, newline="\r\n") for n in ((0, 0, -1), (0, 0, 1)))
+        + "endsolid x\r\n",
+        "no_endsolid": "solid x\n" + facets,
+        "no_indent": "solid\n" + "".join(_ascii_facet(n, corners, indent="") for n in ((0, 0, -1), (0, 0, 1))),
+    }
+    # Layouts the bulk parser declines, leaving them to the line parser.
+    irregular = {
+        "endfacet_in_name": "solid endfacet\n" + facets + "endsolid endfacet\n",
+        "second_solid": "solid x\n" + facets + "endsolid x\nsolid y\n" + facets + "endsolid y\n",
+        "bad_number": "solid x\n" + facets.replace("vertex 0.000000e+00 1.0", "vertex 0.0.0 1.0", 1) + "endsolid x\n",
+    }
+    for name, text in {**regular, **irregular}.items():
+        path = tmp_path / f"{name}.stl"
+        path.write_bytes(text.encode())
+        expected = np.asarray(StlVolume._parse_ascii_stl(str(path)), dtype=np.float64).reshape(-1, 3, 3)
+        bulk = StlVolume._parse_ascii_stl_array(str(path))
+        assert (bulk is not None) == (name in regular), name
+        assert np.array_equal(StlVolume._load_stl_array(str(path)), expected), name
+
+
+def _cube_off(quads: bool) -> str:
+    corners = meshgen._CUBE_CORNERS * 2.0
+    lines = [f"{x} {y} {z}" for x, y, z in corners]
+    if quads:
+        # Each pair of cube triangles shares its first corner: fan order a b c d.
+        pairs = meshgen._CUBE_FACES.reshape(6, 2, 3)
+        faces = [f"4 {p[0][0]} {p[0][1]} {p[0][2]} {p[1][2]}  # side {i}" for i, p in enumerate(pairs)]
+        return "# cube\nOFF\n8 6 0\n" + "\n".join(lines + faces) + "\n"
+    faces = [f"3 {a} {b} {c}" for a, b, c in meshgen._CUBE_FACES]
+    return "OFF\n8 12 0\n" + "\n".join(lines + faces) + "\n"
+
+
+def test_off_loader(tmp_path):
+    for quads in (False, True):
+        path = tmp_path / f"cube{int(quads)}.off"
+        path.write_text(_cube_off(quads))
+        report = StlVolume.analyze(str(path))
+        assert report.triangle_count == 12 and report.watertight
+        assert abs(report.volume - 8.0) < 1e-9
+
+
+def test_3mf_loader_applies_transforms(tmp_path):
+    verts = "".join(f'<vertex x="{x}" y="{y}" z="{z}"/>' for x, y, z in meshgen._CUBE_CORNERS)
+    tris = "".join(f'<triangle v1="{a}" v2="{b}" v3="{c}"/>' for a, b, c in meshgen._CUBE_FACES)
+    model = (
+        '<model xmlns="http://schemas.microsoft.com/3dmanufacturing/core/2015/02"><resources>'
+        f'<object id="1" type="model"><mesh><vertices>{verts}</vertices><triangles>{tris}</triangles></mesh></object>'
+        '<object id="2" type="model"><components>'
+        '<component objectid="1" transform="2 0 0 0 2 0 0 0 2 0 0 0"/></components></object>'
+        '</resources><build><item objectid="2" transform="1 0 0 0 1 0 0 0 3 5 0 0"/></build></model>'
+    )
+    path = tmp_path / "cube.3mf"
+    with zipfile.ZipFile(path, "w") as z:
+        z.writestr("3D/3dmodel.model", model)
+    report = StlVolume.analyze(str(path))
+    assert abs(report.volume - 24.0) < 1e-9
+    assert report.bbox == ((5.0, 0.0, 0.0), (7.0, 2.0, 6.0))
+
+
+def test_amf_loader(tmp_path):
+    verts = "".join(
+        f"<vertex><coordinates><x>{x}</x><y>{y}</y><z>{z}</z></coordinates></vertex>"
+        for x, y, z in meshgen._CUBE_CORNERS * 3.0
+    )
+    tris = "".join(f"<triangle><v1>{a}</v1><v2>{b}</v2><v3>{c}</v3></triangle>" for a, b, c in meshgen._CUBE_FACES)
+    path = tmp_path / "cube.amf"
+    path.write_text(f'<amf unit="millimeter"><object id="0"><mesh><vertices>{verts}</vertices>'
+                    f"<volume>{tris}</volume></mesh></object></amf>")
+    assert abs(StlVolume.analyze(str(path)).volume - 27.0) < 1e-9
+
+
+def test_malformed_indexed_meshes_raise_mesh_load_error(tmp_path):
+    bad = {
+        "truncated.off": "OFF\n8 12 0\n0 0 0\n",
+        "index.off": "OFF\n3 1 0\n0 0 0\n1 0 0\n0 1 0\n3 0 1 7\n",
+        "header.off": "not a mesh\n",
+        "broken.amf": "<amf><object>",
+        "notzip.3mf": "plain text",
+    }
+    for name, text in bad.items():
+        path = tmp_path / name
+        path.write_text(text)
+        with pytest.raises(StlVolume.MeshLoadError):
+            StlVolume.analyze(str(path))
+
+
+def test_array_weld_matches_dict_weld():
+    # Corners jittered well inside the welding tolerance must merge, in
+    # first-seen order, exactly as the per-vertex dict path merges them.
+    rng = np.random.default_rng(1)
+    grid = rng.integers(0, 6, size=(400, 3, 3)).astype(np.float64)
+    tris = grid + rng.uniform(-1e-9, 1e-9, size=grid.shape)
+    tol = 1e-6
+    mesh = StlVolume._dedup_vertices(tris, tol)
+    verts, faces = StlVolume._dedup_vertices([tuple(map(tuple, t)) for t in tris.tolist()], tol).to_tuples()
+    assert len(mesh.vertices) == len(verts) <= 216
+    assert np.array_equal(mesh.vertices, np.array(verts))
+    assert mesh.faces.tolist() == [list(f) for f in faces]
+
+
+def test_bvh_point_in_mesh_matches_brute_force():
+    verts, faces, _ = meshgen.uv_sphere(2000, radius=10.0)
+    tris = verts[faces]
+    eps = 1e-8
+    bvh = StlVolume._TriangleBvh(tris, eps)
+    soup = [tuple(map(tuple, t)) for t in tris.tolist()]
+    rng = np.random.default_rng(2)
+    points = rng.uniform(-12.0, 12.0, size=(200, 3))
+    inside = [StlVolume._point_in_mesh(tuple(p), bvh, eps) for p in points.tolist()]
+    assert inside == [StlVolume._point_in_mesh(tuple(p), soup, eps) for p in points.tolist()]
+    radius = np.linalg.norm(points, axis=1)
+    assert all(inside[i] for i in np.flatnonzero(radius < 9.5))
+    assert not any(inside[i] for i in np.flatnonzero(radius > 10.0))
+
+
+def test_containment_forest_signs_nested_and_sibling_shells(tmp_path):
+    # A 10-unit solid holding two separate 3-unit cavities, one of which
+    # holds a 1-unit island, next to a disjoint 2-unit cube whose bbox
+    # overlaps none of them.
+    shells = [(10.0, (0, 0, 0), False), (3.0, (1, 1, 1), True), (3.0, (6, 1, 1), True),
+              (1.0, (2, 2, 2), False), (2.0, (12, 0, 0), False)]
+    verts = np.vstack([meshgen._CUBE_CORNERS * s + o for s, o, _ in shells])
+    faces = np.vstack([
+        (meshgen._CUBE_FACES[:, ::-1] if cavity else meshgen._CUBE_FACES) + 8 * k
+        for k, (_, _, cavity) in enumerate(shells)
+    ])
+    path = str(tmp_path / "nested.stl")
+    meshgen.write_binary_stl(path, verts, faces)
+    report = StlVolume._measure(path, None, "robust")
+    assert sorted(report.component_volumes) == sorted([1000.0, -27.0, -27.0, 1.0, 8.0])
+    assert abs(report.volume - (1000.0 - 54.0 + 1.0 + 8.0)) < 1e-9
+
+
+def test_benchmark_meshes_measure_their_analytic_volumes(tmp_path):
+    cases = {
+        "sphere": meshgen.uv_sphere(5000),
+        "nested": meshgen.nested_shells(3, size=10.0),
+        "grid": meshgen.cube_grid(5),
+        "t_junction": meshgen.t_junction_grid(4),
+    }
+    for name, (verts, faces, expected) in cases.items():
+        for write in (meshgen.write_binary_stl, meshgen.write_ascii_stl):
+            path = str(tmp_path / f"{name}_{write.__name__}.stl")
+            write(path, verts, faces)
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore", RuntimeWarning)
+                volume = StlVolume._measure(path, None, "robust").volume
+            assert abs(volume - expected) <= 1e-6 * expected, (name, write.__name__)
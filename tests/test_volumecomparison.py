@@ -0,0 +1,241 @@
+import json
+import os
+
+import StlVolume
+import VolumeComparison
+
+
+def _write_json(path, data):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    return str(path)
+
+
+def test_cache_with_missing_images_loads(tmp_path):
+    meta = _write_json(tmp_path / "cache_meta.json", {
+        "score": 0.5,
+        "output_image": None,
+        "reference_image": None,
+        "scoreExplantion": "",
+    })
+    cached = VolumeComparison._cache_hit(meta, "0" * 64)
+    assert cached is not None and cached["score"] == 0.5
+
+
+def test_cache_with_deleted_image_is_ignored(tmp_path):
+    meta = _write_json(tmp_path / "cache_meta.json", {
+        "output_image": str(tmp_path / "gone.png"),
+        "reference_image": None,
+        "scoreExplantion": "",
+    })
+    assert VolumeComparison._load_cache(meta) is None
+
+
+def test_reference_meta_is_reused_without_png(tmp_path):
+    stl = tmp_path / "reference.stl"
+    stl.write_bytes(b"solid x\nendsolid x\n")
+    meta = _write_json(tmp_path / "reference_meta.json", {"stl": str(stl), "png": None, "volume": 1.0})
+    assert VolumeComparison._load_reference_meta(meta)["volume"] == 1.0
+    stl.unlink()
+    assert VolumeComparison._load_reference_meta(meta) is None
+
+
+def _box_test_globals():
+    unit = [((0, 0, 0), (1, 1, 1))]
+    return {
+        "resultToScad": lambda r: "module result(){cube(1);}",
+        "resultToBoxes": lambda r: unit,
+        "referenceBoxes": lambda subPass: unit,
+    }
+
+
+def test_box_comparison_without_images_is_not_cached(tmp_path, monkeypatch):
+    monkeypatch.setattr(VolumeComparison.tempfile, "tempdir", str(tmp_path))
+
+    def failing_render(layers, png_path, telemetry=None):
+        raise RuntimeError("no preview")
+
+    monkeypatch.setattr(VolumeComparison, "_render_boxes_png", failing_render)
+    g = _box_test_globals()
+    for _ in range(2):
+        d = VolumeComparison._compare_boxes(0, 0, None, g, "module result(){cube(1);}", "ref", "")
+        assert d["score"] == 1.0
+        assert d["output_image"] is None and d["reference_image"] is None
+        assert "cached" not in d["scoreExplantion"]
+
+
+def test_box_cache_hit_with_missing_images(tmp_path, monkeypatch):
+    monkeypatch.setattr(VolumeComparison.tempfile, "tempdir", str(tmp_path))
+    key = VolumeComparison._compute_cache_key("module result(){cube(1);}", "ref", "", "boxes")
+    cacheDir = tmp_path / "mesh_benchmark_cache" / key
+    cacheDir.mkdir(parents=True)
+    _write_json(cacheDir / "cache_meta.json", {
+        "score": 1.0,
+        "output_image": None,
+        "output_mouseover_image": None,
+        "reference_image": None,
+        "scoreExplantion": "",
+    })
+    d = VolumeComparison._compare_boxes(0, 0, None, _box_test_globals(), "module result(){cube(1);}", "ref", "")
+    assert d["score"] == 1.0 and "cached" in d["scoreExplantion"]
+
+
+def test_cache_hit_needs_no_openscad(tmp_path, monkeypatch):
+    monkeypatch.setattr(VolumeComparison.tempfile, "tempdir", str(tmp_path))
+    monkeypatch.setattr(VolumeComparison, "openScadPath", str(tmp_path / "no-openscad"))
+    monkeypatch.setattr(VolumeComparison, "_openscadInfo", None)
+    g = {"resultToScad": lambda r: "module result(){cube(1);}", "referenceScad": "module reference(){cube(1);}"}
+    key = VolumeComparison._compute_cache_key(
+        "module result(){cube(1);}", "module reference(){cube(1);}", "", VolumeComparison.openscadBackendSetting.lower()
+    )
+    cacheDir = tmp_path / "mesh_benchmark_cache" / key
+    cacheDir.mkdir(parents=True)
+    _write_json(cacheDir / "cache_meta.json", {"score": 0.75, "output_image": None, "scoreExplantion": ""})
+    assert VolumeComparison.compareVolumeAgainstOpenScad(0, 0, None, g)["score"] == 0.75
+
+
+def test_mesh_preview_failure_is_reported_not_raised(tmp_path, monkeypatch):
+    import meshgen
+
+    stl = str(tmp_path / "output.stl")
+    verts, faces, _ = meshgen.cube_grid(1)
+    meshgen.write_binary_stl(stl, verts, faces)
+
+    def broken(*args, **kwargs):
+        raise RuntimeError("rasterizer broke")
+
+    def no_openscad(*args, **kwargs):
+        raise FileNotFoundError("OpenSCAD executable not found")
+
+    monkeypatch.setattr(VolumeComparison.MeshRasterizer, "render_png", broken)
+    monkeypatch.setattr(VolumeComparison, "_render_png", no_openscad)
+    err = VolumeComparison._render_mesh_png([stl], str(tmp_path / "output.png"), 'import("output.stl");')
+    assert "OpenSCAD executable not found" in err
+
+
+def test_unreadable_mesh_fails_the_subpass(tmp_path, monkeypatch):
+    monkeypatch.setattr(VolumeComparison.tempfile, "tempdir", str(tmp_path))
+    monkeypatch.setattr(VolumeComparison, "referenceCacheDir", str(tmp_path / "reference"))
+    monkeypatch.setattr(VolumeComparison, "openScadPath", str(tmp_path / "no-openscad"))
+    monkeypatch.setattr(VolumeComparison, "meshExportFormat", "off")
+    monkeypatch.setattr(VolumeComparison, "_select_backend", lambda testGlobals: None)
+
+    def fake_openscad(input_scad, output_file, **kwargs):
+        with open(output_file, "w", encoding="utf-8") as f:
+            if os.path.basename(input_scad) == "reference.scad":
+                f.write("OFF\n4 4 0\n0 0 0\n1 0 0\n0 1 0\n0 0 1\n3 0 2 1\n3 0 1 3\n3 0 3 2\n3 1 2 3\n")
+            else:
+                f.write("OFF\n3 1 0\n0 0 0\n1 0 0\n")
+        return None
+
+    monkeypatch.setattr(VolumeComparison, "_run_openscad", fake_openscad)
+    g = {"resultToScad": lambda r: "module result(){cube(2);}", "referenceScad": "module reference(){cube(1);}"}
+    d = VolumeComparison.compareVolumeAgainstOpenScad(0, 0, None, g)
+    assert d["score"] == 0
+    assert "Malformed OFF file" in d["meshFailure"]
+    assert "could not be measured" in d["scoreExplantion"]
+
+
+_TETRAHEDRON_OFF = "OFF\n4 4 0\n0 0 0\n1 0 0\n0 1 0\n0 0 1\n3 0 2 1\n3 0 1 3\n3 0 3 2\n3 1 2 3\n"
+
+
+def test_dead_pool_worker_is_retried_on_a_fresh_pool(tmp_path):
+    path = str(tmp_path / "tetrahedron.off")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(_TETRAHEDRON_OFF)
+    job = StlVolume._get_pool(None).submit(os._exit, 1)
+    report = VolumeComparison._pool_report(job, path)
+    assert abs(report.volume - 1.0 / 6.0) < 1e-12
+
+
+def test_mesh_that_kills_its_pool_worker_fails_the_subpass(tmp_path, monkeypatch):
+    monkeypatch.setattr(VolumeComparison.tempfile, "tempdir", str(tmp_path))
+    monkeypatch.setattr(VolumeComparison, "referenceCacheDir", str(tmp_path / "reference"))
+    monkeypatch.setattr(VolumeComparison, "openScadPath", str(tmp_path / "no-openscad"))
+    monkeypatch.setattr(VolumeComparison, "meshExportFormat", "off")
+    monkeypatch.setattr(VolumeComparison, "_select_backend", lambda testGlobals: None)
+
+    def fake_openscad(input_scad, output_file, **kwargs):
+        with open(output_file, "w", encoding="utf-8") as f:
+            f.write(_TETRAHEDRON_OFF)
+        return None
+
+    submit_analyze = StlVolume.submit_analyze
+
+    def dying_submit_analyze(path, **kwargs):
+        # The answer's mesh takes its worker down every time it is measured.
+        if os.path.basename(path).startswith("output."):
+            return StlVolume._get_pool(None).submit(os._exit, 1)
+        return submit_analyze(path, **kwargs)
+
+    monkeypatch.setattr(VolumeComparison, "_run_openscad", fake_openscad)
+    monkeypatch.setattr(StlVolume, "submit_analyze", dying_submit_analyze)
+    g = {"resultToScad": lambda r: "module result(){cube(2);}", "referenceScad": "module reference(){cube(1);}"}
+    d = VolumeComparison.compareVolumeAgainstOpenScad(0, 0, None, g)
+    assert d["score"] == 0
+    assert "meshFailure" in d
+    assert "could not be measured" in d["scoreExplantion"]
+
+
+def test_openscad_probe_runs_under_limits(monkeypatch):
+    calls = []
+
+    def fake_run(command, timeout=None, cwd=None, limits=None):
+        calls.append((command, limits))
+        if command[1] == "--version":
+            return VolumeComparison.OpenScadProcess.ProcessResult(0, "", "OpenSCAD version 2025.01.01\n", False, 0.1)
+        return VolumeComparison.OpenScadProcess.ProcessResult(-9, "", "", True, 60.0, failure="timeout")
+
+    monkeypatch.setattr(VolumeComparison.OpenScadProcess, "run", fake_run)
+    info = VolumeComparison._probe_openscad("openscad")
+    assert info["version"] == "2025.01.01" and info["backends"] == []
+    assert [command for command, _ in calls] == [["openscad", "--version"], ["openscad", "--help"]]
+    for _, limits in calls:
+        assert limits.wallSeconds == 60
+        assert limits.cpuSeconds == VolumeComparison.openscadCpuSeconds
+        assert limits.memoryBytes == VolumeComparison.openscadMemoryMb * 1024 * 1024
+
+
+def test_invocations_of_indexed_exports_record_facets(tmp_path):
+    # A unit cube with quad faces, which count as two triangles each.
+    off = tmp_path / "output.off"
+    corners = "".join(f"{x} {y} {z}\n" for x in (0, 1) for y in (0, 1) for z in (0, 1))
+    quads = ("0 1 3 2", "4 6 7 5", "0 4 5 1", "2 3 7 6", "0 2 6 4", "1 5 7 3")
+    off.write_text("OFF\n8 6 0\n" + corners + "".join(f"4 {q}\n" for q in quads), encoding="utf-8")
+    png = tmp_path / "output.png"
+    png.write_bytes(b"\x89PNG\r\n")
+    result = VolumeComparison.OpenScadProcess.ProcessResult(0, "", "", False, 0.1)
+    telemetry = []
+    VolumeComparison._record_invocation(telemetry, "result.scad", str(off), None, result)
+    VolumeComparison._record_invocation(telemetry, "result.scad", str(png), None, result)
+    assert [record["facets"] for record in telemetry] == [12, None]
+
+
+def test_profiled_measurement_stays_off_the_scheduler(tmp_path, monkeypatch):
+    monkeypatch.setattr(VolumeComparison.tempfile, "tempdir", str(tmp_path))
+    monkeypatch.setattr(VolumeComparison, "referenceCacheDir", str(tmp_path / "reference"))
+    monkeypatch.setattr(VolumeComparison, "openScadPath", str(tmp_path / "no-openscad"))
+    monkeypatch.setattr(VolumeComparison, "meshExportFormat", "off")
+    monkeypatch.setattr(VolumeComparison, "profileMeshes", True)
+    monkeypatch.setattr(VolumeComparison, "_select_backend", lambda testGlobals: None)
+
+    def fake_openscad(input_scad, output_file, **kwargs):
+        with open(output_file, "w", encoding="utf-8") as f:
+            f.write(_TETRAHEDRON_OFF)
+        return None
+
+    threads = []
+
+    class RecordingProfiler(StlVolume.StageProfiler):
+        def __init__(self):
+            super().__init__()
+            threads.append(VolumeComparison.threading.current_thread())
+
+    monkeypatch.setattr(VolumeComparison, "_run_openscad", fake_openscad)
+    monkeypatch.setattr(StlVolume, "StageProfiler", RecordingProfiler)
+    g = {"resultToScad": lambda r: "module result(){cube(2);}", "referenceScad": "module reference(){cube(1);}"}
+    d = VolumeComparison.compareVolumeAgainstOpenScad(0, 0, None, g)
+    assert abs(d["intersectionVolume"] - 1.0 / 6.0) < 1e-12
+    # The result and intersection, each measured on the comparison's thread.
+    assert threads == [VolumeComparison.threading.current_thread()] * 2
+    assert "<pre>" in d["scoreExplantion"]